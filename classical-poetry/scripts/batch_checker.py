@@ -0,0 +1,188 @@
+"""
+整部诗词集的批量格律校验。
+逐首读入纯文本或 JSONL 诗集，自动判别诗、词，在常驻的进程池中校验，按输入顺序逐行写出 JSONL 结果。
+同时在途的批次数有上限：读入只比写出领先若干批，处理数万首的全集时内存占用不随诗集大小增长。
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from poem_source import INPUT_FORMATS, read_poems, resolve_format
+from poetry_checker import _warm_up, run_job
+
+DEFAULT_CHUNK = 16
+# 每首诗可以自带的任务字段，其余字段（进程数、引擎、韵书等）只由命令行决定
+POEM_FIELDS = ("text", "mode", "ci_pai", "ci_pu", "ci_format", "trad")
+BATCH_MODES = ("shi", "ci")
+
+
+def detect_mode(text):
+    """
+    判别诗或词：各句字数相同且都为五言或七言、句数为偶数且不少于四句时视为诗，否则视为词。
+    五言八句的生查子等会被判为诗，这类作品应在 JSONL 中给出 mode。
+    Args:
+        text: 一首诗词的原文
+    Returns:
+        'shi' 或 'ci'
+    """
+    from yun.common.text_proceed import process_text
+
+    cleaned, positions = process_text(text)
+    bounds = [pos for pos in positions if pos >= 0]
+    if not bounds or bounds[-1] != len(cleaned) - 1:
+        bounds.append(len(cleaned) - 1)
+    lengths = {end - start for start, end in zip([-1] + bounds, bounds)}
+    if len(lengths) == 1 and lengths <= {5, 7} and len(bounds) >= 4 and len(bounds) % 2 == 0:
+        return "shi"
+    return "ci"
+
+
+def check_poem(index, poem, defaults):
+    """
+    校验一首诗词并计时。
+    Args:
+        index: 在诗集中的序号，从 0 开始
+        poem: 诗词及其任务字段，只取 POEM_FIELDS 中的字段
+        defaults: 命令行给出的默认任务字段
+    Returns:
+        一条结果记录
+    """
+    record = {"index": index}
+    job = dict(defaults)
+    start = time.perf_counter()
+    try:  # 单首出错不影响整批，字段不合规的记录也在此转为出错记录
+        for key in ("id", "title"):
+            if key in poem:
+                record[key] = poem[key]
+        if "error" in poem:
+            record.update({"mode": None, "elapsed_ms": 0.0, "result": {"error": poem["error"]}})
+            return record
+        job.update({key: poem[key] for key in POEM_FIELDS if key in poem})
+        job["output_format"] = "json"
+        job["workers"] = 0  # 已在批量的进程池中，不再为一首词另起进程池
+        job["mode"] = job.get("mode") or detect_mode(job["text"])
+        if job["mode"] not in BATCH_MODES:
+            raise ValueError(f"批量校验只支持 {'、'.join(BATCH_MODES)}，不支持 mode={job['mode']}")
+        result = run_job(job)
+    except Exception as exc:
+        result = {"error": f"{type(exc).__name__}: {exc}"}
+    record["mode"] = job.get("mode")
+    record["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    record["result"] = result
+    return record
+
+
+def _warm_worker():
+    """子进程启动时预先加载韵表、词谱与诗的校验模块，每首诗的计时不含这些开销。"""
+    import yun.shi.shi_rhythm  # noqa: F401
+
+    _warm_up()
+
+
+def check_chunk(start, poems, defaults):
+    """在子进程中校验一批连续的诗词。"""
+    return [check_poem(start + offset, poem, defaults) for offset, poem in enumerate(poems)]
+
+
+def _chunks(poems, size):
+    batch = []
+    start = 0
+    for poem in poems:
+        batch.append(poem)
+        if len(batch) == size:
+            yield start, batch
+            start += size
+            batch = []
+    if batch:
+        yield start, batch
+
+
+def check_stream(poems, defaults, out, workers=0, chunk_size=DEFAULT_CHUNK, max_pending=None):
+    """
+    校验诗词流并逐行写出结果，输出顺序与输入一致。
+    Args:
+        poems: 逐首产生诗词任务字典的可迭代对象
+        defaults: 默认任务字段
+        out: 写入 JSONL 的文本流
+        workers: 进程数，不大于 1 时在本进程内校验
+        chunk_size: 每次交给子进程的首数
+        max_pending: 同时在途的最多批次数，默认为进程数的两倍
+    Returns:
+        统计信息字典：总首数、出错首数、各体首数
+    """
+    stats = {"poems": 0, "errors": 0, "shi": 0, "ci": 0}
+
+    def emit(records):
+        for record in records:
+            stats["poems"] += 1
+            if isinstance(record["result"], dict) and "error" in record["result"]:
+                stats["errors"] += 1
+            if record["mode"] in ("shi", "ci"):
+                stats[record["mode"]] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    if workers <= 1:
+        _warm_worker()
+        for start, batch in _chunks(poems, chunk_size):
+            emit(check_chunk(start, batch, defaults))
+        return stats
+
+    max_pending = max_pending or workers * 2
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        for start, batch in _chunks(poems, chunk_size):
+            if len(pending) >= max_pending:  # 最早的一批写出后才继续读入
+                emit(pending.popleft().result())
+            pending.append(pool.submit(check_chunk, start, batch, defaults))
+        while pending:
+            emit(pending.popleft().result())
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量校验诗词集，输出 JSONL")
+    parser.add_argument("input", help="诗集文件，- 表示标准输入")
+    parser.add_argument("--output", default="-", help="结果文件，默认标准输出")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="auto",
+                        help="auto 时按扩展名 .jsonl 判断")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK)
+    parser.add_argument("--yun-shu", type=int, default=1)
+    parser.add_argument("--trad", action="store_true")
+    parser.add_argument("--ci-pu", type=int, default=1)
+    parser.add_argument("--fuzzy-k", type=int, default=0)
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python")
+    args = parser.parse_args()
+
+    defaults = {key: getattr(args, key) for key in ("yun_shu", "trad", "ci_pu", "fuzzy_k", "engine")}
+    input_format = resolve_format(args.input, args.input_format)
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    poems = read_poems(source, input_format)
+    start = time.perf_counter()
+    try:
+        stats = check_stream(poems, defaults, out, args.workers, args.chunk_size)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = stats["poems"] / elapsed if elapsed else 0.0
+    print(f"共 {stats['poems']} 首（诗 {stats['shi']}，词 {stats['ci']}），出错 {stats['errors']} 首，"
+          f"用时 {elapsed:.1f}s，每秒 {rate:.1f} 首", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
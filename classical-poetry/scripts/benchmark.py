@@ -0,0 +1,207 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+SAMPLE_TEXT = (
+    "风急天高猿啸哀渚清沙白鸟飞回无边落木萧萧下不尽长江滚滚来"
+    "万里悲秋常作客百年多病独登台艰难苦恨繁霜鬓潦倒新停浊酒杯"
+)
+
+
+def _time_per_call(func, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            func(item)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeat * len(items))
+
+
+def _report(name, before, after):
+    speedup = before / after if after else float("inf")
+    return f"{name}: before {before * 1e6:.2f} us/lookup, after {after * 1e6:.2f} us/lookup, x{speedup:.1f}"
+
+
+def bench_pingshui(repeat):
+    from yun.rhythm import pingshui_rhythm as ps
+
+    ps.traverse_lists_and_find(SAMPLE_TEXT[0])  # 预先构建索引，不计入单次查询
+    before = _time_per_call(ps.scan_hanzi_class, SAMPLE_TEXT, repeat)
+    after = _time_per_call(ps.traverse_lists_and_find, SAMPLE_TEXT, repeat)
+    return [_report("pingshui lookup", before, after)]
+
+
+def bench_cold_start(repeat):
+    cmd = [
+        sys.executable,
+        os.path.join(SCRIPT_DIR, "poetry_checker.py"),
+        "--mode",
+        "shi",
+        "--yun-shu",
+        "2",
+        "--text",
+        SAMPLE_TEXT,
+    ]
+    runs = max(1, repeat // 4)
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+    elapsed = (time.perf_counter() - start) / runs
+    return [f"cold start: {elapsed * 1e3:.1f} ms/run"]
+
+
+def bench_pingze(repeat):
+    from yun.common.common import pingze_string
+    from yun.rhythm.pingshui_rhythm import hanzi_rhythm
+    import yun.rhythm.new_rhythm as nw
+
+    lines = []
+    for yun_shu in (1, 2):
+        if yun_shu == 1:
+            def per_char(text):
+                return "".join(hanzi_rhythm(ch, False, only_ping_ze=True) for ch in text)
+        else:
+            def per_char(text):
+                return "".join(nw.new_ping_ze(nw.get_new_yun(ch)) for ch in text)
+
+        pingze_string(SAMPLE_TEXT, yun_shu)
+        before = _time_per_call(per_char, [SAMPLE_TEXT], repeat) / len(SAMPLE_TEXT)
+        after = _time_per_call(lambda text: pingze_string(text, yun_shu), [SAMPLE_TEXT], repeat) / len(SAMPLE_TEXT)
+        lines.append(_report(f"pingze yun_shu={yun_shu}", before, after))
+    return lines
+
+
+def bench_convert_yun(repeat):
+    import yun.rhythm.new_rhythm as nw
+
+    table = nw.pinyin_table()
+    readings = list(table.values())
+    runs = max(1, repeat // 4)
+    lines = []
+    for name, rhyme_dict in (("xin", nw.xin_yun), ("tong", nw.tong_yun)):
+        before = _time_per_call(lambda yun_list: nw.scan_convert_yun(yun_list, rhyme_dict), readings, runs)
+        after = _time_per_call(lambda yun_list: nw.convert_yun(yun_list, rhyme_dict), readings, runs)
+        lines.append(_report(f"convert_yun {name} (full pinyin_dict)", before, after))
+        nw.convert_yun_batch(table, rhyme_dict)  # 整表批量转换一次，之后逐字查询只读缓存
+        memo = _time_per_call(lambda hanzi: nw.hanzi_categories(hanzi, rhyme_dict), list(table), runs)
+        lines.append(_report(f"convert_yun {name} -> per-char memo", before, memo))
+    return lines
+
+
+def bench_meter(repeat):
+    from yun.shi.shi_meter import np
+    from yun.shi.shi_rhythm import ShiRhythm
+
+    if np is None:
+        return ["meter: numpy 未安装，跳过"]
+    pai_lyu = SAMPLE_TEXT * 5  # 四十句的七言排律
+
+    def check(engine):
+        return lambda text: ShiRhythm(1, text, [], False, engine).main_shi()
+
+    before = _time_per_call(check("python"), [pai_lyu], max(1, repeat // 4))
+    after = _time_per_call(check("numpy"), [pai_lyu], max(1, repeat // 4))
+    return [_report("meter python -> numpy (per poem)", before, after)]
+
+
+def bench_ci_forms(repeat):
+    from yun.ci.ci_rhythm import CiRhythm
+    from yun.ci.ci_search import ci_type_extraction, form_store, search_ci
+    from yun.common.text_proceed import process_text
+
+    sample = ci_type_extraction(search_ci("水调歌头", 1), 1)[0]["ci_sep"]
+    processed, comma_pos = process_text("".join(part.replace("\u3000", "，") + "。" for part in sample))
+
+    def check(text):
+        return CiRhythm(1, "", text, comma_pos, "", 1, False).main_ci()
+
+    def cold(text):
+        form_store.clear()
+        return check(text)
+
+    runs = max(1, repeat // 4)
+    before = _time_per_call(cold, [processed], runs)
+    form_store.clear()
+    after = _time_per_call(check, [processed], runs)
+    stats = form_store.stats()
+    return [
+        _report("ci forms uncached -> cached (per check)", before, after),
+        f"ci form store: {stats['hits']} hits, {stats['misses']} misses",
+    ]
+
+
+def bench_ci_parallel(repeat):
+    from yun.ci.ci_rhythm import CiRhythm
+    from yun.ci.ci_search import ci_type_extraction, search_ci
+    from yun.common.text_proceed import process_text
+
+    origin = ci_type_extraction(search_ci("水龙吟", 1), 1)[0]["origin"]
+    processed, comma_pos = process_text(origin)
+    workers = max(2, os.cpu_count() or 1)
+
+    def check(count):
+        return lambda text: CiRhythm(1, "", text, comma_pos, "", 1, False, count).main_ci()
+
+    check(workers)(processed)  # 启动进程池，不计入单次校验
+    runs = max(1, repeat // 4)
+    before = _time_per_call(check(0), [processed], runs)
+    after = _time_per_call(check(workers), [processed], runs)
+    return [_report(f"ci serial -> {workers} workers (per check)", before, after)]
+
+
+def bench_shi_session(repeat):
+    from poetry_checker import check_shi, recheck_shi, shi_session
+
+    text = "".join(SAMPLE_TEXT[i:i + 7] + ("，" if i % 14 == 0 else "。") for i in range(0, len(SAMPLE_TEXT), 7)) * 5
+    edits = [(pos, ch) for pos, ch in enumerate(text) if ch not in "，。"][::7]  # 四十句排律中逐句改一个字
+    session = shi_session(text, 1, False)
+    recheck_shi(session)
+
+    def full(edit):
+        pos, ch = edit
+        return check_shi(text[:pos] + "东" + text[pos + 1:], 1, False)
+
+    def incremental(edit):
+        pos, ch = edit
+        session.replace(pos, "东")
+        result = recheck_shi(session)
+        session.replace(pos, ch)
+        return result
+
+    before = _time_per_call(full, edits, max(1, repeat // 4))
+    after = _time_per_call(incremental, edits, max(1, repeat // 4))
+    return [_report("shi full -> incremental recheck (per edit)", before, after)]
+
+
+CASES = {
+    "ci_forms": bench_ci_forms,
+    "ci_parallel": bench_ci_parallel,
+    "cold_start": bench_cold_start,
+    "convert_yun": bench_convert_yun,
+    "meter": bench_meter,
+    "pingshui": bench_pingshui,
+    "pingze": bench_pingze,
+    "shi_session": bench_shi_session,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--case", choices=sorted(CASES) + ["all"], default="all")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    names = sorted(CASES) if args.case == "all" else [args.case]
+    for name in names:
+        for line in CASES[name](args.repeat):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from yun import CIPAI_DB
+from yun.ci.cipai_db import build_cipai_db, check_cipai_db, check_length_index, write_length_index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=CIPAI_DB)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatched = check_cipai_db(args.out) + check_length_index(db_path=args.out)
+        if mismatched:
+            print(f"词谱与源数据不一致：{'、'.join(mismatched[:50])}")
+            sys.exit(1)
+        print("词谱与源数据一致。")
+        return
+
+    count = build_cipai_db(args.out)
+    print(f"已写入 {args.out}（{count} 个格式，{os.path.getsize(args.out)} 字节）")
+    count = write_length_index()
+    print(f"已写入字数索引（{count} 个字数）")
+
+
+if __name__ == "__main__":
+    main()
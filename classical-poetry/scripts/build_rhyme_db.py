@@ -0,0 +1,32 @@
+import argparse
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from yun import RHYME_DB
+from yun.hanzi.rhyme_db import build_rhyme_db, check_rhyme_db
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=RHYME_DB)
+    parser.add_argument("--check", action="store_true")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatched = check_rhyme_db(args.out)
+        if mismatched:
+            print(f"韵表与源数据不一致：{''.join(mismatched[:50])}")
+            sys.exit(1)
+        print("韵表与源数据一致。")
+        return
+
+    size = build_rhyme_db(args.out)
+    print(f"已写入 {args.out}（{size} 字节）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+格律校验守护进程的本地套接字协议。
+客户端每行发送一个 JSON 任务，服务端每行返回一个 JSON 结果：{"ok": true, "result": ...} 或 {"ok": false, "error": ...}。
+每个任务带上客户端的代码版本（version 字段），与守护进程启动时的版本不同时守护进程拒绝执行，客户端改在本进程内校验，
+避免更新代码后仍由旧的守护进程作答。
+套接字放在只有当前用户可以访问的目录（$XDG_RUNTIME_DIR 或 ~/.cache 下，权限 0700），其他用户无法冒充守护进程。
+本模块只依赖标准库，客户端在连接守护进程时不必加载韵表。
+"""
+
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SOCKET_DIR = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache"), "classical-poetry"
+)
+DEFAULT_SOCKET = os.path.join(SOCKET_DIR, "poetry_checker.sock")
+CONNECT_TIMEOUT = 0.2
+REPLY_TIMEOUT = 30.0
+CODE_SUFFIXES = (".py", ".db", ".bin")
+# 只含数据的目录：词谱的数千个 JSON 文件已编入 cipai.db，由它的大小与修改时间代表，不必逐个遍历
+DATA_DIRS = ("ci_pu",)
+
+_versions = {}
+
+
+def code_version(root=SCRIPT_DIR):
+    """
+    代码版本：脚本目录下 .py 与预编译数据文件（.db、.bin）的相对路径、大小与修改时间的摘要。
+    只读取文件属性，不读内容，也不进入词谱 JSON 所在的子目录，只需读取数十个文件的属性（不到一毫秒）；同一进程内只计算一次。
+    """
+    root = os.path.abspath(root)
+    if root in _versions:
+        return _versions[root]
+    digest = hashlib.sha256(root.encode("utf-8"))
+    for current, dirs, files in os.walk(root):
+        if os.path.basename(current) in DATA_DIRS:
+            dirs[:] = []
+        else:
+            dirs[:] = sorted(name for name in dirs if name != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(CODE_SUFFIXES):
+                path = os.path.join(current, name)
+                info = os.stat(path)
+                digest.update(f"{os.path.relpath(path, root)}:{info.st_size}:{info.st_mtime_ns};".encode("utf-8"))
+    _versions[root] = digest.hexdigest()[:16]
+    return _versions[root]
+
+
+def _private_dir(path):
+    """套接字所在目录是否只有当前用户可以访问。"""
+    try:
+        info = os.stat(path)
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):  # Windows 上没有属主与权限位，只检查是目录
+        return stat.S_ISDIR(info.st_mode)
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == os.getuid() and not info.st_mode & 0o077
+
+
+def _ensure_private_dir(path):
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not _private_dir(path):
+        os.chmod(path, 0o700)  # 已存在的目录收紧权限；不属于当前用户时下面仍会拒绝
+    if not _private_dir(path):
+        raise RuntimeError(f"{path} 不属于当前用户或其他用户可以访问，不能在其中放置套接字")
+
+
+def _address(socket_path, port):
+    if port:
+        return socket.AF_INET, ("127.0.0.1", port)
+    return getattr(socket, "AF_UNIX", None), socket_path
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            try:
+                job = json.loads(raw)
+                version = job.pop("version", None)
+                if version != self.server.version:
+                    reply = {"ok": False, "version": self.server.version,
+                             "error": f"守护进程的代码版本 {self.server.version} 与客户端的 {version} 不同，请重启守护进程"}
+                else:
+                    reply = {"ok": True, "result": self.server.run_job(job)}
+            except Exception as exc:  # 单个任务出错不影响守护进程
+                reply = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+def serve(run_job, socket_path=DEFAULT_SOCKET, port=None):
+    """
+    启动守护进程，每个连接一个线程，直到被中断。
+    Args:
+        run_job: 处理单个任务字典并返回结果的函数
+        socket_path: Unix 套接字路径，所在目录须只有当前用户可以访问，不存在时以 0700 权限创建
+        port: 若给定，改为监听 127.0.0.1 的该端口
+    """
+    family, address = _address(socket_path, port)
+    if family is None:
+        raise RuntimeError("当前系统不支持 Unix 套接字，请改用 --port")
+    if family != socket.AF_INET:
+        _ensure_private_dir(os.path.dirname(os.path.abspath(socket_path)))
+        if os.path.exists(socket_path):
+            reply = send_job({"mode": "ping"}, socket_path)
+            if reply is not None:
+                stale = "（运行的是旧版本的代码，请先停止它）" if "version" in reply else ""
+                raise RuntimeError(f"{socket_path} 上已有守护进程在运行{stale}")
+            os.unlink(socket_path)  # 上次异常退出遗留的套接字文件
+        server = _UnixServer(address, _JobHandler)
+    else:
+        server = _TCPServer(address, _JobHandler)
+    server.run_job = run_job
+    server.version = code_version()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # 被 kill 时同样清理套接字文件
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if family != socket.AF_INET and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def send_job(job, socket_path=DEFAULT_SOCKET, port=None):
+    """
+    把任务发给守护进程。
+    Args:
+        job: 任务字典
+        socket_path: Unix 套接字路径
+        port: 若给定，改为连接 127.0.0.1 的该端口
+    Returns:
+        守护进程返回的结果字典，代码版本不同时 ok 为 false；
+        没有守护进程在运行、套接字所在目录其他用户可以访问、或回复不是合法的 JSON 时返回 None
+    """
+    family, address = _address(socket_path, port)
+    if family is None:
+        return None
+    if family != socket.AF_INET and not _private_dir(os.path.dirname(os.path.abspath(socket_path))):
+        return None
+    job = dict(job, version=code_version())
+    try:
+        with socket.socket(family, socket.SOCK_STREAM) as conn:
+            conn.settimeout(CONNECT_TIMEOUT)
+            conn.connect(address)
+            conn.settimeout(REPLY_TIMEOUT)
+            conn.sendall(json.dumps(job, ensure_ascii=False).encode("utf-8") + b"\n")
+            with conn.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError:
+        return None
+    if not line:
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:  # 守护进程中途退出或对端不是守护进程，回复不完整
+        return None
@@ -0,0 +1,342 @@
+"""
+本地诗词语料库，作为 reference_builder 的离线数据源。
+把 JSONL 或纯文本诗集切分为句，打包为单个 SQLite 文件：每句的内容与所属的诗，每首诗的题目、作者、朝代、体裁、韵部，
+以及由单字与二字组到句子编号的倒排表。题目与作者另有到诗的编号的倒排表，朝代、体裁、韵部各值也记下所属的诗。
+查询时按关键词取倒排表求交集，再与朝代、体裁、韵部所属诗的交集比对；句子与诗的信息在第一次查询时整表读入内存，
+之后每次查询只需读取关键词与筛选条件所涉的几条倒排表。
+
+表结构：
+    meta      键值对，记录版本号
+    poem      编号、题目、作者、朝代、体裁、韵部
+    clause    编号、所属诗的编号、去掉标点后的句子
+    posting   单字或二字组、按编号升序排列的句子编号（小端序 uint32 数组）
+    field     title 或 author、单字或二字组、按编号升序排列的诗的编号
+    facet     dynasty（小写）、type 或 rhyme、取值、按编号升序排列的诗的编号
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import threading
+from array import array
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from poem_source import INPUT_FORMATS, read_poems, resolve_format
+from reference_builder import CJK_RE
+
+VERSION = "2"
+DEFAULT_CORPUS = os.environ.get("POETRY_CORPUS") or os.path.join(
+    os.path.expanduser("~"), ".cache", "classical-poetry", "corpus.db"
+)
+SCOPES = ["All", "Sentence", "Title", "Author"]
+CLAUSE_SPLIT = re.compile(r"[，。？！；：、,.?!;:\s]+")
+# 五、七言四句与八句的诗按搜韵的 type 取值标注体裁
+SHI_TYPES = {(5, 4): "WuJue", (7, 4): "QiJue", (5, 8): "WuLv", (7, 8): "QiLv"}
+TEXT_FIELDS = ("text", "content", "paragraphs")
+POSTING_MEMO_LIMIT = 4096
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE poem (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    dynasty TEXT NOT NULL,
+    type TEXT NOT NULL,
+    rhyme TEXT NOT NULL
+);
+CREATE TABLE clause (id INTEGER PRIMARY KEY, poem INTEGER NOT NULL, text TEXT NOT NULL);
+CREATE TABLE posting (term TEXT PRIMARY KEY, ids BLOB NOT NULL);
+CREATE TABLE field (name TEXT NOT NULL, term TEXT NOT NULL, ids BLOB NOT NULL, PRIMARY KEY (name, term));
+CREATE TABLE facet (name TEXT NOT NULL, value TEXT NOT NULL, ids BLOB NOT NULL, PRIMARY KEY (name, value));
+"""
+
+_loaded = {}
+
+
+def _clause_texts(text):
+    clauses = []
+    for part in CLAUSE_SPLIT.split(text):
+        cleaned = "".join(CJK_RE.findall(part))
+        if cleaned:
+            clauses.append(cleaned)
+    return clauses
+
+
+def _terms(text):
+    """一句中出现的单字与二字组，各只取一次。"""
+    terms = set(text)
+    terms.update(text[i:i + 2] for i in range(len(text) - 1))
+    return terms
+
+
+def _to_blob(ids):
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids.tobytes()
+
+
+def _from_blob(blob):
+    ids = array("I")
+    ids.frombytes(blob)
+    if sys.byteorder == "big":
+        ids.byteswap()
+    return ids
+
+
+def _shi_type(clauses):
+    lengths = {len(clause) for clause in clauses}
+    if len(lengths) != 1:
+        return ""
+    return SHI_TYPES.get((lengths.pop(), len(clauses)), "")
+
+
+def _rhyme_name(clauses):
+    """以末句末字所在的平水韵部的韵目字作为全诗的韵部，末字多属时不标。"""
+    from yun.common.common import hanzi_to_yun
+    from yun.rhythm.rhyme_index import rhyme_index
+
+    if not clauses:
+        return ""
+    groups = hanzi_to_yun(clauses[-1][-1], 1, False)
+    if len(groups) != 1 or groups[0] == 107:
+        return ""
+    return rhyme_index("pingshui").group_name(groups[0])[-1]
+
+
+def _field(record, name):
+    value = record.get(name)
+    if value is None:
+        value = record.get(name.capitalize(), "")
+    return str(value)
+
+
+def build_corpus(inputs, path=DEFAULT_CORPUS, input_format="auto"):
+    """
+    把诗集打包为语料库文件，先写临时文件再替换，避免读到半个文件；出错时删除临时文件。
+    Args:
+        inputs: 诗集文件路径列表
+        path: 输出文件路径
+        input_format: auto、jsonl 或 text，auto 时按扩展名 .jsonl 判断
+    Returns:
+        返回三个值：
+            诗的首数
+            句子数
+            跳过的不合规记录（文件名与原因）列表
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+    postings = {}
+    fields = {}
+    facets = {}
+    skipped = []
+    poem_id = clause_id = 0
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (VERSION,))
+        for input_path in inputs:
+            with open(input_path, encoding="utf-8") as handle:
+                for record in read_poems(handle, resolve_format(input_path, input_format)):
+                    if "error" in record:
+                        skipped.append((input_path, record["error"]))
+                        continue
+                    body = next((record[name] for name in TEXT_FIELDS if record.get(name)), "")
+                    if isinstance(body, list):
+                        body = "\n".join(map(str, body))
+                    clauses = _clause_texts(str(body))
+                    if not clauses:
+                        continue
+                    title, author = _field(record, "title"), _field(record, "author")
+                    dynasty = _field(record, "dynasty")
+                    kind = _field(record, "type") or _shi_type(clauses)
+                    rhyme = _field(record, "rhyme") or _rhyme_name(clauses)
+                    conn.execute("INSERT INTO poem VALUES (?, ?, ?, ?, ?, ?)",
+                                 (poem_id, title, author, dynasty, kind, rhyme))
+                    for name, value in (("title", title), ("author", author)):
+                        for term in _terms(value):
+                            fields.setdefault((name, term), array("I")).append(poem_id)
+                    for name, value in (("dynasty", dynasty.lower()), ("type", kind), ("rhyme", rhyme)):
+                        if value:
+                            facets.setdefault((name, value), array("I")).append(poem_id)
+                    for clause in clauses:
+                        conn.execute("INSERT INTO clause VALUES (?, ?, ?)", (clause_id, poem_id, clause))
+                        for term in _terms(clause):
+                            postings.setdefault(term, array("I")).append(clause_id)
+                        clause_id += 1
+                    poem_id += 1
+        for term, ids in postings.items():
+            conn.execute("INSERT INTO posting VALUES (?, ?)", (term, _to_blob(ids)))
+        for (name, term), ids in fields.items():
+            conn.execute("INSERT INTO field VALUES (?, ?, ?)", (name, term, _to_blob(ids)))
+        for (name, value), ids in facets.items():
+            conn.execute("INSERT INTO facet VALUES (?, ?, ?)", (name, value, _to_blob(ids)))
+        conn.commit()
+        conn.execute("VACUUM")
+        conn.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        conn.close()
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    _loaded.pop(path, None)
+    return poem_id, clause_id, skipped
+
+
+class LocalCorpus:
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"找不到本地语料库 {path}，请先用 local_corpus.py 由诗集生成")
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro&immutable=1", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()  # 批量审校时多线程共用一个只读连接
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != VERSION:
+            raise ValueError(f"{path} 不是可识别的语料库文件，或由旧版生成，请用 local_corpus.py 重新生成")
+        self._clauses = None
+        self._clause_poem = None
+        self._poem_start = None
+        self._poems = None
+        self._postings = {}
+
+    def _load(self):
+        with self._lock:
+            if self._clauses is None:
+                self._poems = self._conn.execute(
+                    "SELECT title, author, dynasty, type, rhyme FROM poem ORDER BY id"
+                ).fetchall()
+                rows = self._conn.execute("SELECT poem, text FROM clause ORDER BY id").fetchall()
+                clause_poem = array("I", (poem for poem, _ in rows))
+                # 一首诗的句子编号连续，记下每首诗第一句的编号，末尾补上句子总数
+                poem_start = array("I", [0]) * (len(self._poems) + 1)
+                for idx in range(len(clause_poem) - 1, -1, -1):
+                    poem_start[clause_poem[idx]] = idx
+                poem_start[-1] = len(clause_poem)
+                self._poem_start = poem_start
+                self._clause_poem = clause_poem
+                self._clauses = [text for _, text in rows]
+
+    def _read_ids(self, sql, params):
+        """读取一条倒排表，读过的留在内存中；取值、读库与写入备忘都在锁内，多线程共用时不会互相清掉。"""
+        with self._lock:
+            ids = self._postings.get(params)
+            if ids is None:
+                row = self._conn.execute(sql, params[1:]).fetchone()
+                ids = _from_blob(row[0]) if row is not None else array("I")
+                if len(self._postings) >= POSTING_MEMO_LIMIT:
+                    self._postings.clear()
+                self._postings[params] = ids
+            return ids
+
+    def _posting(self, term):
+        return self._read_ids("SELECT ids FROM posting WHERE term = ?", ("posting", term))
+
+    def _field_posting(self, name, term):
+        return self._read_ids("SELECT ids FROM field WHERE name = ? AND term = ?", ("field", name, term))
+
+    def _facet(self, name, value):
+        return self._read_ids("SELECT ids FROM facet WHERE name = ? AND value = ?", ("facet", name, value))
+
+    @staticmethod
+    def _intersect(lookup, keyword):
+        """单字直接取倒排表，多字取各二字组倒排表的交集，交集中的编号还需调用方核对原文。"""
+        if len(keyword) == 1:
+            return set(lookup(keyword))
+        lists = sorted((lookup(keyword[i:i + 2]) for i in range(len(keyword) - 1)), key=len)
+        ids = set(lists[0])
+        for other in lists[1:]:
+            ids.intersection_update(other)
+            if not ids:
+                break
+        return ids
+
+    def _sentence_ids(self, keyword):
+        """含关键词的句子编号。"""
+        clauses = self._clauses
+        return [idx for idx in self._intersect(self._posting, keyword) if keyword in clauses[idx]]
+
+    def _poem_ids(self, keyword, field):
+        """题目（field 为 0）或作者（field 为 1）含关键词的诗的编号。"""
+        name = ("title", "author")[field]
+        poems = self._poems
+        ids = self._intersect(lambda term: self._field_posting(name, term), keyword)
+        return {idx for idx in ids if keyword in poems[idx][field]}
+
+    def _facet_poems(self, dynasty, poem_type, rhyme):
+        """同时满足各筛选条件的诗的编号，没有筛选条件时返回 None。"""
+        poems = None
+        for name, value in (("dynasty", dynasty.lower() if dynasty else None), ("type", poem_type), ("rhyme", rhyme)):
+            if not value:
+                continue
+            ids = self._facet(name, value)
+            poems = set(ids) if poems is None else poems.intersection(ids)
+        return poems
+
+    def clauses(self, keyword, scope="All", dynasty=None, poem_type=None, rhyme=None):
+        """
+        查询句子。
+        Args:
+            keyword: 关键词
+            scope: Sentence 句中含关键词，Title、Author 题目、作者含关键词的诗的全部句子，All 三者合并
+            dynasty: 只取该朝代（不分大小写）
+            poem_type: 只取该体裁，如 QiLv
+            rhyme: 只取押该韵部的诗，如 江
+        Returns:
+            按语料顺序排列的句子列表
+        """
+        if scope not in SCOPES:
+            raise ValueError(f"未知的 scope：{scope}，可选 {'、'.join(SCOPES)}")
+        self._load()
+        allowed = self._facet_poems(dynasty, poem_type, rhyme)
+        if allowed is not None and not allowed:
+            return []
+        ids = set()
+        text = "".join(CJK_RE.findall(keyword))
+        if text and scope in ("All", "Sentence"):
+            ids.update(self._sentence_ids(text))
+        poems = set()
+        if keyword and scope in ("All", "Title"):
+            poems |= self._poem_ids(keyword, 0)
+        if keyword and scope in ("All", "Author"):
+            poems |= self._poem_ids(keyword, 1)
+        if allowed is not None:
+            poems &= allowed
+            clause_poem = self._clause_poem
+            ids = {idx for idx in ids if clause_poem[idx] in allowed}
+        poem_start = self._poem_start
+        for poem in poems:
+            ids.update(range(poem_start[poem], poem_start[poem + 1]))
+        clauses = self._clauses
+        return [clauses[idx] for idx in sorted(ids)]
+
+
+def open_corpus(path=None):
+    """打开本地语料库，同一路径只打开一次；path 为空时取环境变量 POETRY_CORPUS 或默认路径。"""
+    path = path or DEFAULT_CORPUS
+    if path not in _loaded:
+        _loaded[path] = LocalCorpus(path)
+    return _loaded[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="由诗集生成本地语料库")
+    parser.add_argument("inputs", nargs="+", help="JSONL 或纯文本诗集")
+    parser.add_argument("--out", default=DEFAULT_CORPUS)
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="auto")
+    args = parser.parse_args()
+
+    poems, clauses, skipped = build_corpus(args.inputs, args.out, args.input_format)
+    for input_path, error in skipped:
+        print(f"{input_path}：{error}，已跳过", file=sys.stderr)
+    print(f"已写入 {args.out}（{poems} 首，{clauses} 句，{os.path.getsize(args.out)} 字节）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+诗集的读入，供 batch_checker 与 local_corpus 共用。
+纯文本诗集以空行分隔各首，JSONL 诗集每行一个对象或一个字符串；不合规的行产生带 error 字段的记录，由调用方决定报错或跳过。
+本模块只依赖标准库。
+"""
+
+import json
+
+SENTENCE_MARKS = set("，。？！；、,.?!;")
+INPUT_FORMATS = ["auto", "text", "jsonl"]
+
+
+def split_text_poems(lines):
+    """
+    把纯文本诗集按空行切分为一首首诗；一首诗的首行若不含标点、且不像是不加标点的诗句，视为标题。
+    Args:
+        lines: 逐行读入的文本
+    Returns:
+        逐首产生 {"title": ..., "text": ...}
+    """
+    block = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            block.append(line)
+            continue
+        if block:
+            yield _text_poem(block)
+            block = []
+    if block:
+        yield _text_poem(block)
+
+
+def _has_marks(line):
+    return any(ch in SENTENCE_MARKS for ch in line)
+
+
+def _text_poem(block):
+    # 不加标点、一句一行的诗，首行与次行等长，不当作标题
+    if len(block) > 1 and not _has_marks(block[0]) and (_has_marks(block[1]) or len(block[0]) != len(block[1])):
+        return {"title": block[0], "text": "\n".join(block[1:])}
+    return {"text": "\n".join(block)}
+
+
+def jsonl_poems(lines):
+    """
+    逐行解析 JSONL 诗集。
+    Args:
+        lines: 逐行读入的文本，每行一个对象，或一个字符串（视为 text）
+    Returns:
+        逐首产生诗的字典；不是合法 JSON、或既不是对象也不是字符串的行产生 {"text": "", "error": ...}
+    """
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            poem = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield {"text": "", "error": f"第{line_no}行不是合法的 JSON：{exc}"}
+            continue
+        if isinstance(poem, str):
+            poem = {"text": poem}
+        elif not isinstance(poem, dict):
+            poem = {"text": "", "error": f"第{line_no}行应为对象或字符串，实为 {type(poem).__name__}"}
+        yield poem
+
+
+def resolve_format(name, input_format="auto"):
+    """auto 时按扩展名 .jsonl 判断诗集格式。"""
+    if input_format == "auto":
+        return "jsonl" if name.endswith(".jsonl") else "text"
+    return input_format
+
+
+def read_poems(lines, input_format):
+    """
+    按格式逐首读入诗集。
+    Args:
+        lines: 逐行读入的文本
+        input_format: text 或 jsonl
+    Returns:
+        逐首产生诗的字典
+    """
+    return jsonl_poems(lines) if input_format == "jsonl" else split_text_poems(lines)
@@ -1,4 +1,6 @@
 import argparse
+import functools
+import json
 import os
 import sys
 from typing import cast
@@ -7,11 +9,9 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 if SCRIPT_DIR not in sys.path:
     sys.path.insert(0, SCRIPT_DIR)
 
-from yun.common.text_proceed import process_text
-from yun.common.common import hanzi_to_pingze
-from yun.shi.shi_rhythm import ShiRhythm
-from yun.ci.ci_rhythm import CiRhythm
-from souyun_api import couplet_words
+from checker_daemon import DEFAULT_SOCKET, send_job, serve
+
+# 格律模块在用到时才导入：守护进程在线时，客户端无需加载韵表即可得到结果。
 
 REFERENCES_DIR = os.path.abspath(os.path.join(SCRIPT_DIR, os.pardir, "references"))
 
@@ -31,11 +31,15 @@ def _split_by_positions(text, positions):
 
 
 def _clean_text(text):
+    from yun.common.text_proceed import process_text
+
     cleaned, _ = process_text(text)
     return cleaned
 
 
 def _split_lines(text):
+    from yun.common.text_proceed import process_text
+
     raw_lines = [line.strip() for line in text.splitlines() if line.strip()]
     if raw_lines:
         return [_clean_text(line) for line in raw_lines]
@@ -43,27 +47,82 @@ def _split_lines(text):
     return _split_by_positions(cleaned, positions)
 
 
-def check_shi(text, yun_shu, is_trad):
+def _output(result, output_format):
+    """把结构化的校验结果按输出格式转换；错误信息在 json 格式下包装为 {"error": ...}。"""
+    if isinstance(result, str):
+        return {"error": result} if output_format == "json" else result
+    if output_format == "json":
+        return result.to_dict()
+    return result.render().lstrip()
+
+
+def _with_suggestions(result, output_format, items, is_trad):
+    """把替换建议附在结果之后：文本追加在报告末尾，json 放入 suggestions 字段。"""
+    from yun.common.suggest import render_suggestions
+
+    if output_format == "json":
+        return {**result, "suggestions": items}
+    text = render_suggestions(items, is_trad)
+    return f"{result.rstrip()}\n\n{text}\n" if text else result
+
+
+def check_shi(text, yun_shu, is_trad, engine="python", output_format="text", suggest_fix=False):
+    from yun.common.text_proceed import process_text
+    from yun.shi.shi_rhythm import ShiRhythm
+
     processed, comma_pos = process_text(text)
+    if not _shi_length_ok(processed):
+        return _shi_output(processed, None, output_format)
+    process = ShiRhythm(yun_shu, processed, comma_pos, is_trad, engine)
+    return _shi_output(processed, process.check(), output_format, yun_shu if suggest_fix else None)
+
+
+def shi_session(text, yun_shu, is_trad):
+    """为编辑器创建增量校验会话，之后按字调用 replace/insert/delete，再用 recheck_shi 取结果。"""
+    from yun.shi.shi_session import ShiSession
+
+    return ShiSession(text, yun_shu, is_trad)
+
+
+def recheck_shi(session, output_format="text", suggest_fix=False):
+    """校验会话中当前的诗，结果与对当前原文调用 check_shi 相同。"""
+    if not _shi_length_ok(session.poem):
+        return _shi_output(session.poem, None, output_format)
+    return _shi_output(session.poem, session.check(), output_format, session.yun_shu if suggest_fix else None)
+
+
+def _shi_length_ok(processed):
     length = len(processed)
-    if (length % 10 != 0 and length % 14 != 0) or length < 20:
-        return f"诗的字数不正确，可能有不能识别的生僻字，你输入了{length}字"
-    process = ShiRhythm(yun_shu, processed, comma_pos, is_trad)
-    res = process.main_shi()
+    return (length % 10 == 0 or length % 14 == 0) and length >= 20
+
+
+def _shi_output(processed, res, output_format, suggest_yun_shu=None):
+    if res is None:
+        return _output(f"诗的字数不正确，可能有不能识别的生僻字，你输入了{len(processed)}字", output_format)
     msgs = {
         1: "一句的长短不符合律诗的标准！请检查标点及字数。",
         2: "你输入的每一个韵脚都不在韵书里面，无法分析。",
     }
-    if isinstance(res, int) and res in msgs:
-        return msgs[res]
-    return res
+    if isinstance(res, int):
+        return _output(msgs.get(res, str(res)), output_format)
+    if suggest_yun_shu is not None:
+        from yun.common.suggest import suggest_replacements
+
+        items = suggest_replacements(res, suggest_yun_shu)
+        return _with_suggestions(_output(res, output_format), output_format, items, res.is_trad)
+    return _output(res, output_format)
+
 
+def check_ci(
+    text, yun_shu, ci_pai, ci_pu, ci_format, is_trad, output_format="text", workers=0, fuzzy_k=0, suggest_fix=False
+):
+    from yun.common.text_proceed import process_text
+    from yun.ci.ci_rhythm import CiRhythm
 
-def check_ci(text, yun_shu, ci_pai, ci_pu, ci_format, is_trad):
     processed, comma_pos = process_text(text)
     comma_pos = cast(str, comma_pos)
-    process = CiRhythm(yun_shu, ci_pai, processed, comma_pos, ci_format, ci_pu, is_trad)
-    res = process.main_ci()
+    process = CiRhythm(yun_shu, ci_pai, processed, comma_pos, ci_format, ci_pu, is_trad, workers, fuzzy_k)
+    res = process.check()
     length = len(processed)
     msgs = {
         0: "不能找到你输入的词牌。",
@@ -72,9 +131,14 @@ def check_ci(text, yun_shu, ci_pai, ci_pu, ci_format, is_trad):
         3: f"输入内容无法匹配已有词牌，请检查内容或将词谱更换为钦谱，你输入了{length}字。",
         4: "龙谱中没有该词谱，请切换为钦谱。",
     }
-    if isinstance(res, int) and res in msgs:
-        return msgs[res]
-    return res
+    if isinstance(res, int):
+        return _output(msgs.get(res, str(res)), output_format)
+    result = res.to_dict() if output_format == "json" else res.render()
+    if suggest_fix:
+        from yun.common.suggest import suggest_replacements
+
+        return _with_suggestions(result, output_format, suggest_replacements(res, yun_shu), is_trad)
+    return result
 
 
 def _normalize_pattern(pattern):
@@ -85,6 +149,7 @@ def _normalize_pattern(pattern):
     return ["".join(ch for ch in line if ch in "平仄中") for line in lines]
 
 
+@functools.lru_cache(maxsize=None)
 def _load_qu_patterns():
     path = os.path.join(REFERENCES_DIR, "qu_patterns.md")
     if not os.path.exists(path):
@@ -127,38 +192,25 @@ def _pick_qu_pattern(qu_pai):
     return ""
 
 
-def _extract_words(payload):
-    if isinstance(payload, list):
-        if payload and isinstance(payload[0], str):
-            return payload
-        items = []
-        for item in payload:
-            items.extend(_extract_words(item))
-        return items
-    if isinstance(payload, dict):
-        for value in payload.values():
-            words = _extract_words(value)
-            if words:
-                return words
-    return []
-
+def check_qu(text, pattern, yun_shu, is_trad, qu_pai, output_format="text", suggest_fix=False):
+    from yun.common.common import pingze_string
 
-def check_qu(text, pattern, yun_shu, is_trad, qu_pai):
     if not pattern:
         pattern = _pick_qu_pattern(qu_pai)
     if not pattern:
-        return "缺少曲格 pattern。请提供由平/仄/中组成的格律。"
+        return _output("缺少曲格 pattern。请提供由平/仄/中组成的格律。", output_format)
     pattern_lines = _normalize_pattern(pattern)
     text_lines = _split_lines(text)
     if len(pattern_lines) != len(text_lines):
-        return f"曲格行数不匹配：pattern {len(pattern_lines)} 行，文本 {len(text_lines)} 行。"
+        return _output(f"曲格行数不匹配：pattern {len(pattern_lines)} 行，文本 {len(text_lines)} 行。", output_format)
+    lines = []
     report_lines = []
+    suggestions = []
     for line_idx, (pat, line) in enumerate(zip(pattern_lines, text_lines), start=1):
         if len(pat) != len(line):
-            return f"第{line_idx}行字数不匹配：pattern {len(pat)} 字，文本 {len(line)} 字。"
+            return _output(f"第{line_idx}行字数不匹配：pattern {len(pat)} 字，文本 {len(line)} 字。", output_format)
         marks = []
-        for ch, rule in zip(line, pat):
-            pz = hanzi_to_pingze(ch, yun_shu, is_trad)
+        for pz, rule in zip(pingze_string(line, yun_shu), pat):
             if pz == "0":
                 marks.append("◎")
             elif pz == "3":
@@ -169,24 +221,42 @@ def check_qu(text, pattern, yun_shu, is_trad, qu_pai):
                 marks.append("〇" if pz == "1" else "●")
             elif rule == "仄":
                 marks.append("〇" if pz == "2" else "●")
+        lines.append({"rule": pat, "text": line, "marks": "".join(marks)})
+        if suggest_fix:
+            from yun.common.suggest import suggest_line
+
+            for item in suggest_line(pat, line, "".join(marks), yun_shu, is_trad):
+                suggestions.append({"line": line_idx - 1, **item})
         report_lines.append(pat)
         report_lines.append(line)
         report_lines.append("".join(marks))
         report_lines.append("")
-    return "\n".join(report_lines).rstrip()
+    report = "\n".join(report_lines).rstrip()
+    if output_format == "json":
+        result = {"kind": "qu", "title": qu_pai, "lines": lines, "report": report}
+    else:
+        result = report
+    if suggest_fix:
+        return _with_suggestions(result, output_format, suggestions, is_trad)
+    return result
 
 
-def check_couplet(upper, lower, yun_shu, is_trad, auto_suggest):
+def check_couplet(upper, lower, yun_shu, is_trad, auto_suggest, output_format="text", suggest_fix=False):
+    from yun.common.common import hanzi_to_pingze
+    from yun.common.suggest import suggest_index, suggest_line
+
     upper_clean = _clean_text(upper)
     lower_clean = _clean_text(lower)
     if len(upper_clean) != len(lower_clean):
-        return f"上下联字数不一致：上联{len(upper_clean)}字，下联{len(lower_clean)}字。"
+        return _output(f"上下联字数不一致：上联{len(upper_clean)}字，下联{len(lower_clean)}字。", output_format)
     marks = []
     issues = []
+    lower_rule = []  # 下联各字应有的平仄：与上联相反
     auto_lower = list(lower_clean)
     for idx, (up, low) in enumerate(zip(upper_clean, lower_clean), start=1):
         up_pz = hanzi_to_pingze(up, yun_shu, is_trad)
         low_pz = hanzi_to_pingze(low, yun_shu, is_trad)
+        lower_rule.append({"1": "仄", "2": "平"}.get(up_pz, "中"))
         if "3" in (up_pz, low_pz):
             marks.append("�")
             continue
@@ -199,15 +269,12 @@ def check_couplet(upper, lower, yun_shu, is_trad, auto_suggest):
             marks.append("●")
             issues.append(f"第{idx}字平仄未对。")
             if auto_suggest:
-                candidates = _extract_words(couplet_words(up))
                 target = "2" if up_pz == "1" else "1"
-                for cand in candidates:
-                    if len(cand) != 1:
-                        continue
-                    cand_pz = hanzi_to_pingze(cand, yun_shu, is_trad)
-                    if cand_pz == target:
-                        auto_lower[idx - 1] = cand
-                        break
+                candidates = suggest_index(yun_shu, is_trad).candidates(
+                    target, exclude=upper_clean + "".join(auto_lower), limit=1
+                )
+                if candidates:
+                    auto_lower[idx - 1] = candidates[0]
     last_up = hanzi_to_pingze(upper_clean[-1], yun_shu, is_trad)
     last_low = hanzi_to_pingze(lower_clean[-1], yun_shu, is_trad)
     if last_up == "1":
@@ -222,12 +289,167 @@ def check_couplet(upper, lower, yun_shu, is_trad, auto_suggest):
         report.append("问题：" + " ".join(issues))
     if auto_suggest and auto_lower != list(lower_clean):
         report.append("自动替换：" + "".join(auto_lower))
-    return "\n".join(report)
+    suggestions = []
+    if suggest_fix:
+        suggestions = suggest_line("".join(lower_rule), lower_clean, "".join(marks), yun_shu, is_trad)
+    if output_format == "json":
+        result = {
+            "kind": "couplet",
+            "upper": upper_clean,
+            "lower": lower_clean,
+            "marks": "".join(marks),
+            "issues": issues,
+            "auto_lower": "".join(auto_lower) if auto_suggest else None,
+            "report": "\n".join(report),
+        }
+    else:
+        result = "\n".join(report)
+    if suggest_fix:
+        return _with_suggestions(result, output_format, suggestions, is_trad)
+    return result
+
+
+def list_rhymes(book, group, yun_shu, is_trad, tone="", page=1, page_size=200, output_format="text"):
+    """
+    由韵部查字，不给韵部时列出整部韵书的韵部。
+    Args:
+        book: pingshui、cilin、xin、tong 之一，为空时按 yun_shu 取平水韵、新韵或通韵
+        group: 韵部编号或写法，如“一东”“下平一先”“十一庚”“第七部”
+    """
+    from yun.rhythm.rhyme_index import (
+        YUN_SHU_BOOKS, render_rhyme_groups, render_rhyme_list, rhyme_groups, rhyme_list,
+    )
+
+    book = book or YUN_SHU_BOOKS.get(yun_shu, "pingshui")
+    try:
+        if not group:
+            groups = rhyme_groups(book, is_trad)
+            if output_format == "json":
+                return {"book": book, "groups": groups}
+            return render_rhyme_groups(groups, book, is_trad)
+        listing = rhyme_list(book, group, tone or None, page, page_size, is_trad)
+    except ValueError as exc:
+        return _output(str(exc), output_format)
+    return listing if output_format == "json" else render_rhyme_list(listing, is_trad)
+
+
+JOB_DEFAULTS = {
+    "text": "",
+    "yun_shu": 1,
+    "trad": False,
+    "ci_pai": "",
+    "ci_pu": 1,
+    "ci_format": "",
+    "pattern": "",
+    "qu_pai": "",
+    "upper": "",
+    "lower": "",
+    "auto_suggest": False,
+    "engine": "python",
+    "output_format": "text",
+    "workers": 0,
+    "fuzzy_k": 0,
+    "suggest_fix": False,
+    "rhyme_book": "",
+    "group": "",
+    "tone": "",
+    "page": 1,
+    "page_size": 200,
+}
+
+
+def run_job(job):
+    """
+    按任务字典执行一次校验，字段名与命令行参数一致（如 yun_shu、ci_pai）。
+    output_format 为 text 时返回校验文本，为 json 时返回结构化结果字典。
+    """
+    mode = job.get("mode")
+    if mode == "ping":
+        return "pong"
+    args = dict(JOB_DEFAULTS)
+    args.update({key: value for key, value in job.items() if key in JOB_DEFAULTS})
+    if mode == "suggest_cipai":
+        from yun.ci.ci_search import suggest_cipai
+
+        return suggest_cipai(args["text"], job.get("limit", 10), args["trad"])
+    if mode == "shi":
+        return check_shi(
+            args["text"], args["yun_shu"], args["trad"], args["engine"], args["output_format"], args["suggest_fix"]
+        )
+    if mode == "ci":
+        return check_ci(
+            args["text"],
+            args["yun_shu"],
+            args["ci_pai"],
+            args["ci_pu"],
+            args["ci_format"],
+            args["trad"],
+            args["output_format"],
+            args["workers"],
+            args["fuzzy_k"],
+            args["suggest_fix"],
+        )
+    if mode == "qu":
+        return check_qu(
+            args["text"],
+            args["pattern"],
+            args["yun_shu"],
+            args["trad"],
+            args["qu_pai"],
+            args["output_format"],
+            args["suggest_fix"],
+        )
+    if mode == "couplet":
+        return check_couplet(
+            args["upper"],
+            args["lower"],
+            args["yun_shu"],
+            args["trad"],
+            args["auto_suggest"],
+            args["output_format"],
+            args["suggest_fix"],
+        )
+    if mode == "rhyme-list":
+        return list_rhymes(
+            args["rhyme_book"],
+            args["group"],
+            args["yun_shu"],
+            args["trad"],
+            args["tone"],
+            args["page"],
+            args["page_size"],
+            args["output_format"],
+        )
+    raise ValueError(f"未知的 mode：{mode}")
+
+
+def _warm_up():
+    """守护进程启动时预先加载韵表、词谱索引、全部词牌格式与曲格，之后的请求不再付出导入与解析开销。"""
+    import yun.ci.ci_rhythm  # noqa: F401  词牌索引在导入时读取
+    from yun.ci.ci_search import form_store, name_index
+    import souyun_api  # noqa: F401
+    from yun.common.common import hanzi_to_pingze, hanzi_to_yun
+
+    for yun_shu in (1, 2, 3):
+        hanzi_to_pingze("东", yun_shu, False)
+        hanzi_to_yun("东", yun_shu, False, ci_lin=True)
+    _load_qu_patterns()
+    form_store.preload()
+    name_index()
+
+
+def _print_result(result):
+    if isinstance(result, list):
+        print("\n".join(result))
+    elif isinstance(result, dict):
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print(result)
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["shi", "ci", "qu", "couplet"], required=True)
+    parser.add_argument("--mode", choices=["shi", "ci", "qu", "couplet", "rhyme-list"])
     parser.add_argument("--text", default="")
     parser.add_argument("--yun-shu", type=int, default=1)
     parser.add_argument("--trad", action="store_true")
@@ -239,39 +461,52 @@ def main():
     parser.add_argument("--upper", default="")
     parser.add_argument("--lower", default="")
     parser.add_argument("--suggest", default="")
+    parser.add_argument("--suggest-cipai", default="")
     parser.add_argument("--auto-suggest", action="store_true")
+    parser.add_argument("--suggest-fix", action="store_true")
+    parser.add_argument("--engine", choices=["python", "numpy"], default="python")
+    parser.add_argument("--format", dest="output_format", choices=["text", "json"], default="text")
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--fuzzy-k", type=int, default=0)
+    parser.add_argument("--rhyme-book", choices=["pingshui", "cilin", "xin", "tong"], default="")
+    parser.add_argument("--group", default="")
+    parser.add_argument("--tone", choices=["平", "仄"], default="")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--no-daemon", action="store_true")
+    parser.add_argument("--offline", action="store_true")
     args = parser.parse_args()
 
+    if args.serve:
+        _warm_up()
+        serve(run_job, args.socket, args.port)
+        return
+
     if args.suggest:
+        from souyun_api import configure, couplet_words
+
+        if args.offline:
+            configure(cache_mode="offline")
         suggestions = couplet_words(args.suggest)
         print(suggestions)
         return
 
-    if args.mode == "shi":
-        print(check_shi(args.text, args.yun_shu, args.trad))
-        return
-    if args.mode == "ci":
-        print(
-            check_ci(
-                args.text,
-                args.yun_shu,
-                args.ci_pai,
-                args.ci_pu,
-                args.ci_format,
-                args.trad,
-            )
-        )
-        return
-    if args.mode == "qu":
-        print(check_qu(args.text, args.pattern, args.yun_shu, args.trad, args.qu_pai))
-        return
-    if args.mode == "couplet":
-        print(
-            check_couplet(
-                args.upper, args.lower, args.yun_shu, args.trad, args.auto_suggest
-            )
-        )
-        return
+    if args.suggest_cipai:
+        job = {"mode": "suggest_cipai", "text": args.suggest_cipai, "trad": args.trad}
+    elif args.mode:
+        job = {"mode": args.mode}
+        job.update({key: getattr(args, key) for key in JOB_DEFAULTS})
+    else:
+        parser.error("the following arguments are required: --mode")
+    if not args.no_daemon:
+        reply = send_job(job, args.socket, args.port)
+        if reply is not None and reply.get("ok"):
+            _print_result(reply["result"])
+            return
+    _print_result(run_job(job))
 
 
 if __name__ == "__main__":
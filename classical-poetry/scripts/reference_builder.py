@@ -1,10 +1,13 @@
 import argparse
 import json
 import re
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 
-from souyun_api import poem
+from souyun_api import DEFAULT_BURST, add_client_arguments, configure_from_args, poem
 
+DEFAULT_WORKERS = 4
+SOURCES = ["souyun", "local"]
 
 CJK_RE = re.compile(r"[\u4e00-\u9fff]")
 STOP_CHARS = set(
@@ -44,35 +47,65 @@ def _build_bigrams(text):
     return grams
 
 
-def build_reference(keyword, pages, scope, dynasty, poem_type, rhyme, topn):
-    all_clauses = []
-    for page in range(pages):
-        data = poem(
-            key=keyword,
-            dynasty=dynasty,
-            scope=scope,
-            poem_type=poem_type,
-            rhyme=rhyme,
-            page=page,
-            json_type=True,
-        )
-        all_clauses.extend(_extract_clauses(data))
-
-    cleaned_lines = []
-    for clause in all_clauses:
-        cleaned = _clean_text(clause)
-        if cleaned:
-            cleaned_lines.append(cleaned)
-
+def _fetch_pages(pages, workers, **query):
+    """
+    按页序逐页产生搜韵的响应。workers 大于 1 时各页在线程池中同时请求，调用方处理前一页时后面的页仍在下载。
+    同时在途的请求不超过 workers，共用 souyun_api 的长连接池与限速。
+    总速度受限速（默认每秒 10 个请求、令牌桶容量 8）约束：前 8 页可以立即发出，之后每秒至多 10 页，
+    单页耗时 0.3 秒左右时默认的 4 个 workers 可以同时在途。
+    """
+    if workers <= 1 or pages <= 1:
+        for page in range(pages):
+            yield poem(page=page, json_type=True, **query)
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, pages)) as pool:
+        pending = deque()
+        next_page = 0
+        while next_page < pages or pending:
+            while next_page < pages and len(pending) < workers:
+                pending.append(pool.submit(poem, page=next_page, json_type=True, **query))
+                next_page += 1
+            yield pending.popleft().result()
+
+
+def _souyun_clauses(keyword, pages, scope, dynasty, poem_type, rhyme, workers):
+    for data in _fetch_pages(
+        pages, workers, key=keyword, dynasty=dynasty, scope=scope, poem_type=poem_type, rhyme=rhyme
+    ):
+        yield from _extract_clauses(data)
+
+
+def _local_clauses(keyword, scope, dynasty, poem_type, rhyme, corpus):
+    from local_corpus import open_corpus
+
+    return open_corpus(corpus).clauses(keyword, scope, dynasty, poem_type, rhyme)
+
+
+def build_reference(keyword, pages, scope, dynasty, poem_type, rhyme, topn, workers=DEFAULT_WORKERS,
+                    source="souyun", corpus=None):
+    """
+    统计与关键词相关的诗句中的高频字与二字组。
+    source 为 souyun 时联网逐页查询搜韵；为 local 时查询本地语料库（见 local_corpus），不受 pages 限制，
+    corpus 为语料库路径，为空时取默认路径。
+    """
+    if source == "local":
+        clauses = _local_clauses(keyword, scope, dynasty, poem_type, rhyme, corpus)
+    else:
+        clauses = _souyun_clauses(keyword, pages, scope, dynasty, poem_type, rhyme, workers)
+    source_lines = 0
     char_counter = Counter()
     bigram_counter = Counter()
-    for line in cleaned_lines:
+    for clause in clauses:
+        line = _clean_text(clause)
+        if not line:
+            continue
+        source_lines += 1
         char_counter.update([ch for ch in line if ch not in STOP_CHARS])
         bigram_counter.update(_build_bigrams(line))
 
     return {
         "keyword": keyword,
-        "source_lines": len(cleaned_lines),
+        "source_lines": source_lines,
         "top_chars": [item for item, _ in char_counter.most_common(topn)],
         "top_bigrams": [item for item, _ in bigram_counter.most_common(topn)],
     }
@@ -87,8 +120,15 @@ def main():
     parser.add_argument("--type", dest="poem_type", default=None)
     parser.add_argument("--rhyme", default=None)
     parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--source", choices=SOURCES, default="souyun", help="local 为查询本地语料库，不联网")
+    parser.add_argument("--corpus", default=None, help="本地语料库路径，默认取 POETRY_CORPUS 或 ~/.cache 下的 corpus.db")
     parser.add_argument("--out", default="")
+    add_client_arguments(parser)
     args = parser.parse_args()
+    if args.source == "souyun" and args.burst is None and args.workers > DEFAULT_BURST:
+        args.burst = args.workers  # 令牌桶容量不小于并行页数，首批请求可以同时发出
+    configure_from_args(args)
 
     result = build_reference(
         keyword=args.keyword,
@@ -98,6 +138,9 @@ def main():
         poem_type=args.poem_type,
         rhyme=args.rhyme,
         topn=args.top,
+        workers=args.workers,
+        source=args.source,
+        corpus=args.corpus,
     )
 
     payload = json.dumps(result, ensure_ascii=False, indent=2)
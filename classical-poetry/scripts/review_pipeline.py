@@ -2,9 +2,11 @@ import argparse
 import json
 import re
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import cast
 
-from reference_builder import build_reference
+from reference_builder import SOURCES, build_reference
+from souyun_api import add_client_arguments, configure_from_args
 from yun.common.text_proceed import process_text
 from yun.shi.shi_rhythm import ShiRhythm
 from yun.ci.ci_rhythm import CiRhythm
@@ -151,6 +153,38 @@ def _render_markdown(text, form, meter_ok, meter_report, theme_review):
     return "\n".join(lines)
 
 
+def review(
+    text,
+    theme,
+    mode="shi",
+    form="qilv",
+    yun_shu=1,
+    is_trad=False,
+    pages=2,
+    scope="Sentence",
+    dynasty=None,
+    poem_type=None,
+    rhyme=None,
+    ci_pai="",
+    ci_pu=1,
+    ci_format="",
+    source="souyun",
+    corpus=None,
+):
+    """校验格律并按主题参考诗句评估意境，返回 Markdown 报告。"""
+    # 参考诗句在后台下载，同时进行格律校验
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        ref_future = pool.submit(build_reference, theme, pages, scope, dynasty, poem_type, rhyme, 40,
+                                 source=source, corpus=corpus)
+        if mode == "ci":
+            meter_ok, meter_report = _check_ci(text, yun_shu, ci_pai, ci_pu, ci_format, is_trad)
+        else:
+            meter_ok, meter_report = _check_shi(text, yun_shu, is_trad)
+        ref = ref_future.result()
+    theme_review = _theme_review(text, ref)
+    return _render_markdown(text, form, meter_ok, meter_report, theme_review)
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--text", required=True)
@@ -167,22 +201,31 @@ def main():
     parser.add_argument("--ci-pai", default="")
     parser.add_argument("--ci-pu", type=int, default=1)
     parser.add_argument("--ci-format", default="")
+    parser.add_argument("--source", choices=SOURCES, default="souyun")
+    parser.add_argument("--corpus", default=None)
     parser.add_argument("--out", default="")
+    add_client_arguments(parser)
     args = parser.parse_args()
-
-    ref = build_reference(
-        args.theme, args.pages, args.scope, args.dynasty, args.poem_type, args.rhyme, 40
+    configure_from_args(args)
+
+    md = review(
+        args.text,
+        args.theme,
+        args.mode,
+        args.form,
+        args.yun_shu,
+        args.trad,
+        args.pages,
+        args.scope,
+        args.dynasty,
+        args.poem_type,
+        args.rhyme,
+        args.ci_pai,
+        args.ci_pu,
+        args.ci_format,
+        args.source,
+        args.corpus,
     )
-    theme_review = _theme_review(args.text, ref)
-
-    if args.mode == "ci":
-        meter_ok, meter_report = _check_ci(
-            args.text, args.yun_shu, args.ci_pai, args.ci_pu, args.ci_format, args.trad
-        )
-    else:
-        meter_ok, meter_report = _check_shi(args.text, args.yun_shu, args.trad)
-
-    md = _render_markdown(args.text, args.form, meter_ok, meter_report, theme_review)
     if args.out:
         with open(args.out, "w", encoding="utf-8") as handle:
             handle.write(md)
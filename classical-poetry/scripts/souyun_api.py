@@ -1,17 +1,343 @@
+"""
+搜韵开放接口的客户端。
+所有请求经同一个会话发出：按主机保留长连接池，设有超时；遇到网络错误与 429、5xx 时按指数退避加随机抖动重试，
+并以令牌桶限制请求速率。每个接口的请求数、出错数、重试数与耗时可由 endpoint_stats() 查看。
+请求前先查磁盘缓存（souyun_cache），缓存模式：
+    on       先用未过期的缓存，未命中时联网并写入；联网失败时退回过期的缓存
+    off      不读写缓存
+    offline  只用缓存（含过期的），未命中时报错，不联网
+    record   总是联网并写入缓存，用于录制测试与基准所用的响应
+    replay   与 offline 相同，配合录制的目录使测试、基准不依赖网络
+接口根地址、缓存目录与模式的默认值可由环境变量 SOUYUN_BASE_URL、SOUYUN_CACHE_DIR、SOUYUN_CACHE_MODE 给出。
+本模块只依赖标准库。
+"""
+
+import http.client
 import json
-from urllib.parse import urlencode
-from urllib.request import urlopen
+import os
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from souyun_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, DEFAULT_TTL, ResponseCache
 
 BASE_URL = "https://api.sou-yun.cn/open"
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # 第一次重试前的退避秒数，之后逐次翻倍
+MAX_BACKOFF = 8.0
+DEFAULT_RATE = 10.0  # 每秒请求数，不大于 0 时不限速
+DEFAULT_BURST = 8  # 约为 reference_builder 默认并行页数的两倍，单页耗时 0.3 秒左右时四页可以同时在途
+DEFAULT_POOL_SIZE = 8
+RETRY_STATUS = {429, 500, 502, 503, 504}
+CACHE_MODES = ["on", "off", "offline", "record", "replay"]
+# 复用的长连接已被服务端关闭时出现的错误，换新连接立即重发，不计为重试
+_STALE_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class SouyunError(OSError):
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            burst: 桶的容量，即允许的瞬时并发请求数
+        """
+        self.rate = rate
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取一个令牌，桶空时等待到补充出一个为止。"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0  # 联网请求中成功与最终失败的调用数
+        self.cache_hits = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "cache_hits": self.cache_hits,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(self.total_ms / self.requests, 3) if self.requests else 0.0,
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class SouyunSession:
+    def __init__(
+        self,
+        base_url=None,
+        timeout=DEFAULT_TIMEOUT,
+        retries=DEFAULT_RETRIES,
+        backoff=DEFAULT_BACKOFF,
+        rate=DEFAULT_RATE,
+        burst=DEFAULT_BURST,
+        pool_size=DEFAULT_POOL_SIZE,
+        cache_mode=None,
+        cache_dir=None,
+        cache_ttl=DEFAULT_TTL,
+        cache_max_bytes=DEFAULT_MAX_BYTES,
+    ):
+        """
+        Args:
+            base_url: 接口根地址，http 或 https，默认取环境变量 SOUYUN_BASE_URL（如指向本地的 souyun_stub），再默认 BASE_URL
+            timeout: 连接与读取的超时秒数
+            retries: 出错后最多重试的次数
+            backoff: 第一次重试前的退避秒数
+            rate: 每秒最多发出的请求数，不大于 0 时不限速
+            burst: 令牌桶容量
+            pool_size: 最多保留的空闲长连接数
+            cache_mode: 缓存模式，见 CACHE_MODES，默认取环境变量 SOUYUN_CACHE_MODE，再默认 on
+            cache_dir: 缓存目录，默认取环境变量 SOUYUN_CACHE_DIR，再默认 ~/.cache/classical-poetry/souyun
+            cache_ttl: 缓存有效秒数
+            cache_max_bytes: 缓存目录大小上限
+        """
+        cache_mode = cache_mode or os.environ.get("SOUYUN_CACHE_MODE") or "on"
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"未知的缓存模式：{cache_mode}，可选 {'、'.join(CACHE_MODES)}")
+        base_url = base_url or os.environ.get("SOUYUN_BASE_URL") or BASE_URL
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self._bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self._idle = []
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.cache_mode = cache_mode
+        self.cache = None
+        if cache_mode != "off":
+            cache_dir = cache_dir or os.environ.get("SOUYUN_CACHE_DIR") or DEFAULT_CACHE_DIR
+            self.cache = ResponseCache(cache_dir, cache_ttl, cache_max_bytes)
+
+    def _connect(self):
+        conn_class = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+        return conn_class(self._host, self._port, timeout=self.timeout)
+
+    def _acquire_connection(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _release_connection(self, conn):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def _send(self, url):
+        """发出一次请求，复用的连接已失效时换新连接重发一次。返回状态码、Retry-After 与响应体。"""
+        conn, reused = self._acquire_connection()
+        while True:
+            try:
+                conn.request("GET", url, headers={"Accept": "application/json"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except _STALE_ERRORS:
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = self._connect(), False
+                continue
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release_connection(conn)
+            return resp.status, resp.getheader("Retry-After"), body
+
+    def _record(self, path, elapsed_ms, error=False, retry=False, hit=False):
+        with self._lock:
+            stats = self._stats.setdefault(path, EndpointStats())
+            if hit:
+                stats.cache_hits += 1
+                return
+            if retry:
+                stats.retries += 1
+                return
+            stats.requests += 1
+            stats.errors += error
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+
+    def _delay(self, attempt, retry_after):
+        if retry_after and retry_after.isdigit():
+            return min(MAX_BACKOFF, float(retry_after))
+        delay = min(MAX_BACKOFF, self.backoff * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def get_json(self, path, params=None):
+        """
+        按缓存模式取一个接口的 JSON，需要时联网。
+        Args:
+            path: 接口路径，如 poem、RhymeCategory/list
+            params: 查询参数
+        Returns:
+            解析后的 JSON
+        """
+        cache = self.cache
+        if cache is None:
+            return self.fetch_json(path, params)
+        cache_only = self.cache_mode in ("offline", "replay")
+        if self.cache_mode != "record":
+            hit, body = cache.get(path, params, allow_stale=cache_only)
+            if hit:
+                self._record(path, 0.0, hit=True)
+                return body
+        if cache_only:
+            raise SouyunError(f"{path} 离线模式下缓存中没有该请求：{params or {}}")
+        try:
+            body = self.fetch_json(path, params)
+        except SouyunError:
+            hit, body = cache.get(path, params, allow_stale=True)
+            if not hit:
+                raise
+            self._record(path, 0.0, hit=True)
+            return body
+        cache.put(path, params, body)
+        return body
+
+    def fetch_json(self, path, params=None):
+        """
+        联网请求一个接口并解析 JSON，不经过缓存。
+        Args:
+            path: 接口路径
+            params: 查询参数
+        Returns:
+            解析后的 JSON
+        """
+        url = f"{self._prefix}/{path}"
+        if params:
+            url = f"{url}?{urlencode(params)}"
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if self._bucket is not None:
+                self._bucket.acquire()
+            retry_after = None
+            try:
+                status, retry_after, body = self._send(url)
+            except (OSError, http.client.HTTPException) as exc:
+                error = SouyunError(f"{path} 请求失败：{exc}")
+            else:
+                if status == 200:
+                    try:
+                        data = json.loads(body.decode("utf-8"))
+                    except ValueError as exc:  # 截断或被网关替换的响应，与服务器出错同样重试
+                        error = SouyunError(f"{path} 返回的不是合法的 JSON：{exc}", status)
+                    else:
+                        self._record(path, (time.perf_counter() - start) * 1000)
+                        return data
+                else:
+                    error = SouyunError(f"{path} 返回 HTTP {status}", status)
+                    if status not in RETRY_STATUS:
+                        break
+            if attempt == self.retries:
+                break
+            self._record(path, 0.0, retry=True)
+            time.sleep(self._delay(attempt, retry_after))
+        self._record(path, (time.perf_counter() - start) * 1000, error=True)
+        raise error
+
+    def stats(self):
+        """每个接口的请求数、出错数、重试数与平均、最大耗时（毫秒，含重试与等待）。"""
+        with self._lock:
+            return {path: stats.to_dict() for path, stats in sorted(self._stats.items())}
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def session():
+    """模块共用的会话，首次请求时按默认参数（及环境变量给出的缓存设置）创建。"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = SouyunSession()
+        return _session
+
+
+def configure(**kwargs):
+    """
+    以新的参数替换共用会话，参数同 SouyunSession，如 configure(timeout=5, rate=2)。
+    Returns:
+        新的会话
+    """
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = SouyunSession(**kwargs)
+        return _session
+
+
+def add_client_arguments(parser):
+    """给命令行加上接口地址与缓存相关的参数，与 configure_from_args 配合使用。"""
+    parser.add_argument("--souyun-url", default=None, help="搜韵接口根地址，如本地替身 http://127.0.0.1:8765/open")
+    parser.add_argument("--offline", action="store_true", help="只用缓存中的搜韵响应，不联网")
+    parser.add_argument("--cache-mode", choices=CACHE_MODES, default=None)
+    parser.add_argument("--cache-dir", default=None, help="缓存目录，录制、回放时指定录制的目录")
+    parser.add_argument("--rate", type=float, default=None,
+                        help=f"每秒最多发出的请求数，默认 {DEFAULT_RATE:g}，0 为不限速；并行下载的总速度不会超过它")
+    parser.add_argument("--burst", type=int, default=None, help=f"令牌桶容量，默认 {DEFAULT_BURST}")
+
+
+def configure_from_args(args):
+    """按命令行参数配置共用会话；没有给出这些参数时保留默认会话。"""
+    cache_mode = "offline" if args.offline else args.cache_mode
+    limits = {name: getattr(args, name) for name in ("rate", "burst") if getattr(args, name, None) is not None}
+    if cache_mode or args.cache_dir or args.souyun_url or limits:
+        configure(base_url=args.souyun_url, cache_mode=cache_mode, cache_dir=args.cache_dir, **limits)
+
+
+def endpoint_stats():
+    return session().stats()
 
 
 def _get_json(path, params=None):
-    url = f"{BASE_URL}/{path}"
-    if params:
-        url = f"{url}?{urlencode(params)}"
-    with urlopen(url) as resp:
-        payload = resp.read().decode("utf-8")
-    return json.loads(payload)
+    return session().get_json(path, params)
 
 
 def poem(
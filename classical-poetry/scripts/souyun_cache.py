@@ -0,0 +1,157 @@
+"""
+搜韵接口响应的磁盘缓存。
+以接口路径与排序后的参数计算 SHA-256 作为键，每条响应一个文件，写入先写临时文件再替换，多个进程可以共用同一目录。
+条目带写入时间，超过有效期后不再作为新鲜结果，但离线时仍可使用；目录总大小超过上限时按最近使用时间淘汰。
+本模块只依赖标准库。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "classical-poetry", "souyun")
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EVICT_RATIO = 0.8  # 淘汰到上限的这一比例，避免每次写入都扫描目录
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(path, params=None):
+    """路径与按名排序的参数决定键，参数顺序不同的同一请求命中同一条目。"""
+    items = sorted((str(name), str(value)) for name, value in (params or {}).items())
+    raw = json.dumps([path, items], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            directory: 缓存目录，不存在时在第一次写入时创建
+            ttl: 条目的有效秒数，不大于 0 时永不过期
+            max_bytes: 目录总大小上限，不大于 0 时不淘汰（录制测试数据时使用）
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._bytes = None  # 本进程估计的目录大小，第一次写入时扫描得到
+        self._lock = threading.Lock()  # 多个线程同时写入时保护 _bytes 与淘汰
+        self._warned = False
+
+    def _file(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, path, params=None, allow_stale=False):
+        """
+        读取一条缓存。
+        Args:
+            path: 接口路径
+            params: 查询参数
+            allow_stale: 过期的条目也返回
+        Returns:
+            返回两个值：
+                是否命中
+                响应的 JSON，未命中时为 None
+        """
+        file_path = self._file(cache_key(path, params))
+        try:
+            with open(file_path, encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):  # 不存在，或另一进程写坏的文件
+            return False, None
+        if not allow_stale and self.ttl > 0 and time.time() - entry.get("stored", 0) > self.ttl:
+            return False, None
+        try:
+            os.utime(file_path)  # 修改时间记录最近一次使用，供淘汰时排序
+        except OSError:
+            pass
+        return True, entry.get("body")
+
+    def put(self, path, params, body):
+        """
+        写入一条缓存，必要时淘汰最久未用的条目。
+        目录不可写等错误只记录一次警告，不影响已经取得的响应。
+        Returns:
+            是否写入成功
+        """
+        key = cache_key(path, params)
+        file_path = self._file(key)
+        entry = {"path": path, "params": params or {}, "stored": time.time(), "body": body}
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(tmp_path, "wb") as handle:
+                handle.write(data)
+            try:
+                old_size = os.path.getsize(file_path)  # 覆盖已有条目时只计增量
+            except OSError:
+                old_size = 0
+            os.replace(tmp_path, file_path)
+        except OSError as exc:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            if not self._warned:
+                self._warned = True
+                logger.warning("无法写入搜韵缓存目录 %s：%s，响应照常返回，之后写入失败不再提示", self.directory, exc)
+            return False
+        if self.max_bytes > 0:
+            with self._lock:
+                if self._bytes is None:
+                    self._bytes = sum(size for _, size, _ in self._entries())
+                else:
+                    self._bytes += len(data) - old_size
+                if self._bytes > self.max_bytes:
+                    self._evict()
+        return True
+
+    def _entries(self):
+        """目录中所有条目的（路径, 大小, 最近使用时间）。"""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir():
+                continue
+            for item in os.scandir(sub.path):
+                if item.name.endswith(".json"):
+                    try:
+                        stat = item.stat()
+                    except OSError:  # 已被另一进程淘汰
+                        continue
+                    entries.append((item.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """按最近使用时间从旧到新删除条目，直到总大小不超过上限的 EVICT_RATIO。"""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_RATIO
+        for file_path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(file_path)
+            except OSError:
+                pass
+            total -= size
+        self._bytes = total
+
+    def clear(self):
+        with self._lock:
+            for file_path, _, _ in self._entries():
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+            self._bytes = 0
@@ -0,0 +1,149 @@
+"""
+联网路径的压测。
+对本地替身（souyun_stub，默认在本进程内启动）或指定的接口地址，以给定并发反复执行一种操作，
+统计吞吐量与延迟分位数，并附上 souyun_api 按接口统计的请求、重试与出错数。压测时默认不读写缓存。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+import souyun_api
+
+THEMES = ["秋", "月", "春", "雪", "江", "山", "酒", "别"]
+REVIEW_TEXT = "空山新雨后，天气晚来秋。明月松间照，清泉石上流。"
+
+
+def _endpoints_op(index, args):
+    """按固定比例调用四个接口，模拟查韵、查字与对仗词。"""
+    rng = random.Random(index)
+    theme = THEMES[index % len(THEMES)]
+    choice = rng.random()
+    if choice < 0.4:
+        souyun_api.poem(theme, scope=args.scope, page=rng.randrange(args.pages))
+    elif choice < 0.6:
+        souyun_api.rhyme_category(rng.choice("东冬江支微鱼虞齐佳灰"))
+    elif choice < 0.8:
+        souyun_api.rhyme_dictionary(theme)
+    else:
+        souyun_api.couplet_words(theme)
+
+
+def _reference_op(index, args):
+    from reference_builder import build_reference
+
+    build_reference(THEMES[index % len(THEMES)], args.pages, args.scope, None, None, None, 30, args.workers,
+                    source=args.source, corpus=args.corpus)
+
+
+def _review_op(index, args):
+    from review_pipeline import review
+
+    review(REVIEW_TEXT, THEMES[index % len(THEMES)], form="wujue", pages=args.pages, scope=args.scope,
+           source=args.source, corpus=args.corpus)
+
+
+SCENARIOS = {"endpoints": _endpoints_op, "reference": _reference_op, "review": _review_op}
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def run_load(scenario, requests, concurrency, args):
+    """
+    以 concurrency 个线程执行 requests 次操作。
+    Returns:
+        统计字典：次数、出错数、总耗时、吞吐量与延迟分位数（毫秒）
+    """
+    op = SCENARIOS[scenario]
+
+    def timed(index):
+        start = time.perf_counter()
+        try:
+            op(index, args)
+            error = None
+        except Exception as exc:  # 单次失败计入统计，不中断压测
+            error = f"{type(exc).__name__}: {exc}"
+        return (time.perf_counter() - start) * 1000, error
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies = sorted(latency for latency, _ in results)
+    errors = [error for _, error in results if error]
+    return {
+        "scenario": scenario,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(requests / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50), 3),
+            "p95": round(_percentile(latencies, 0.95), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+            "max": round(latencies[-1], 3) if latencies else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对搜韵接口的调用路径做压测")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="reference")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4, help="reference 场景每次并行下载的页数")
+    parser.add_argument("--scope", default="Sentence")
+    parser.add_argument("--source", choices=["souyun", "local"], default="souyun",
+                        help="reference 与 review 场景的参考诗句来源，local 时不经过接口")
+    parser.add_argument("--corpus", default=None, help="--source local 时的本地语料库路径")
+    parser.add_argument("--souyun-url", default=None, help="不给时在本进程内启动替身")
+    parser.add_argument("--latency", type=float, default=50.0, help="替身的固定延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=20.0, help="替身附加的随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", default=None, help="替身使用的录制目录")
+    parser.add_argument("--rate", type=float, default=0.0, help="客户端限速，每秒请求数，0 为不限")
+    parser.add_argument("--retries", type=int, default=souyun_api.DEFAULT_RETRIES)
+    parser.add_argument("--cache-mode", choices=souyun_api.CACHE_MODES, default="off")
+    args = parser.parse_args()
+
+    stub = None
+    base_url = args.souyun_url
+    if base_url is None:
+        from souyun_stub import start_stub
+
+        stub = start_stub(latency=args.latency / 1000, jitter=args.jitter / 1000, error_rate=args.error_rate,
+                          fixtures=args.fixtures)
+        base_url = stub.base_url
+    souyun_api.configure(base_url=base_url, rate=args.rate, burst=max(1, args.concurrency * args.workers),
+                         retries=args.retries, backoff=0.05, cache_mode=args.cache_mode,
+                         pool_size=max(souyun_api.DEFAULT_POOL_SIZE, args.concurrency * args.workers))
+    try:
+        report = run_load(args.scenario, args.requests, args.concurrency, args)
+    finally:
+        if stub is not None:
+            stub.shutdown()
+            stub.server_close()
+    report["base_url"] = base_url
+    report["endpoints"] = souyun_api.endpoint_stats()
+    if stub is not None:
+        report["stub_served"] = {str(status): count for status, count in sorted(stub.served.items())}
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
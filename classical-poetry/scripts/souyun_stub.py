@@ -0,0 +1,224 @@
+"""
+搜韵开放接口的本地替身，供测试与压测在断网的机器上运行。
+提供 /open/poem、/open/RhymeCategory（含 /list）、/open/rhymeDictionary、/open/coupletwords 四个接口：
+先在 fixtures 目录（与 souyun_cache 相同的布局，可直接用 --cache-mode record 录制的目录）中按请求查找响应，
+找不到时由本地韵表与固定的随机种子生成结构相同的响应，同一请求总是得到同一结果。
+可设置每个请求的延迟、抖动与出错比例。把 SOUYUN_BASE_URL 或 --souyun-url 指向 http://127.0.0.1:端口/open 即可使用。
+本模块只依赖标准库与本地韵表。
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+
+from souyun_cache import cache_key
+
+DEFAULT_PORT = 8765
+PREFIX = "/open"
+POEM_PAGE_SIZE = 10
+# 生成诗句所用的字，取常见的意象字，使 reference_builder 的统计有意义
+POEM_CHARS = (
+    "春秋风月花雪山水江湖云烟雨露霜天地日夜星河松竹梅柳桃兰菊荷舟帆亭楼台阁城关塞草木林泉溪"
+    "孤寒清明远长高深归来去行思愁梦醉吟歌酒琴书剑马雁鸿鹤莺燕蝉钟鼓笛灯影光色声香"
+)
+
+
+def _rng(path, params):
+    return random.Random(cache_key(path, params))
+
+
+def _poem(params, rng):
+    keyword = params.get("key", "")
+    page = int(params.get("pageno", 0) or 0)
+    poems = []
+    for index in range(POEM_PAGE_SIZE):
+        size = rng.choice((5, 7))
+        clauses = []
+        for _ in range(rng.choice((4, 8))):
+            chars = [rng.choice(POEM_CHARS) for _ in range(size)]
+            if keyword and rng.random() < 0.3:
+                chars[rng.randrange(size)] = keyword[0]
+            clauses.append({"Content": "".join(chars) + rng.choice("，。")})
+        poems.append({"Id": page * POEM_PAGE_SIZE + index, "Title": {"Content": "".join(rng.sample(POEM_CHARS, 3))},
+                      "Clauses": clauses})
+    return {"ShiData": poems, "PageNo": page}
+
+
+def _rhyme_category_list():
+    from yun.rhythm.rhyme_index import rhyme_groups
+
+    return {"Categories": [item["name"] for item in rhyme_groups("pingshui")]}
+
+
+def _rhyme_category(params):
+    from yun.rhythm.rhyme_index import rhyme_list
+
+    listing = rhyme_list("pingshui", params.get("id", ""), page_size=0)
+    return {"Category": listing["name"], "Characters": listing["hanzi"]}
+
+
+def _rhyme_dictionary(params, rng):
+    from yun.rhythm.pingshui_rhythm import matching_list_to_rhythm_name, traverse_lists_and_find
+
+    hanzi = params.get("id", "")[:1]
+    rhymes = matching_list_to_rhythm_name(traverse_lists_and_find(hanzi), False) if hanzi else None
+    words = [hanzi + rng.choice(POEM_CHARS) for _ in range(10)] if hanzi else []
+    return {"Char": hanzi, "Rhymes": rhymes or [], "Words": words, "PageNo": int(params.get("pageNo", 0) or 0)}
+
+
+def _couplet_words(params, rng):
+    word = params.get("id", "")
+    return {"Key": word, "Words": ["".join(rng.choice(POEM_CHARS) for _ in word) for _ in range(12)]}
+
+
+def generate(path, params):
+    """
+    生成一个接口的响应。
+    Args:
+        path: 去掉 /open 前缀的接口路径
+        params: 查询参数
+    Returns:
+        返回两个值：
+            HTTP 状态码
+            响应的 JSON
+    """
+    rng = _rng(path, params)
+    try:
+        if path == "poem":
+            return 200, _poem(params, rng)
+        if path == "RhymeCategory/list":
+            return 200, _rhyme_category_list()
+        if path == "RhymeCategory":
+            return 200, _rhyme_category(params)
+        if path == "rhymeDictionary":
+            return 200, _rhyme_dictionary(params, rng)
+        if path == "coupletwords":
+            return 200, _couplet_words(params, rng)
+    except ValueError as exc:
+        return 400, {"error": str(exc)}
+    return 404, {"error": f"unknown endpoint: {path}"}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    wbufsize = 64 * 1024  # 响应头与响应体一次写出
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        parts = urlsplit(self.path)
+        path = parts.path
+        params = dict(parse_qsl(parts.query))
+        delay = server.latency + (server.jitter * server.draw() if server.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        if not path.startswith(PREFIX + "/"):
+            status, body = 404, {"error": f"unknown path: {path}"}
+        elif server.error_rate and server.draw() < server.error_rate:
+            status, body = server.error_status, {"error": "injected"}
+        else:
+            path = path[len(PREFIX) + 1:]
+            hit, body = server.fixtures.get(path, params, allow_stale=True) if server.fixtures else (False, None)
+            status = 200
+            if not hit:
+                status, body = generate(path, params)
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        with server.counter_lock:
+            server.served[status] = server.served.get(status, 0) + 1
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, port=DEFAULT_PORT, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503,
+                 fixtures=None, seed=0, verbose=False):
+        """
+        Args:
+            port: 监听 127.0.0.1 的端口，0 表示任选空闲端口
+            latency: 每个请求固定的延迟秒数
+            jitter: 在固定延迟上再加 0 到 jitter 秒的随机延迟
+            error_rate: 返回错误的请求比例
+            error_status: 注入的错误状态码
+            fixtures: 录制的响应目录，与 souyun_cache 的布局相同
+            seed: 延迟与出错的随机种子
+            verbose: 是否逐个打印请求
+        """
+        super().__init__(("127.0.0.1", port), _StubHandler)
+        from souyun_cache import ResponseCache
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.fixtures = ResponseCache(fixtures, ttl=0, max_bytes=0) if fixtures else None
+        self.verbose = verbose
+        self.served = {}
+        self.counter_lock = threading.Lock()
+        self._random = random.Random(seed)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}{PREFIX}"
+
+    def draw(self):
+        with self.counter_lock:
+            return self._random.random()
+
+
+def start_stub(**kwargs):
+    """
+    在后台线程中启动替身，参数同 StubServer（port 默认为 0）。
+    Returns:
+        正在运行的 StubServer，用完后调用 shutdown() 与 server_close()
+    """
+    kwargs.setdefault("port", 0)
+    server = StubServer(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="搜韵开放接口的本地替身")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="附加的随机延迟上限（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--fixtures", default=None, help="录制的响应目录")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.latency / 1000, args.jitter / 1000, args.error_rate, args.error_status,
+                        args.fixtures, args.seed, args.verbose)
+    print(f"souyun stub listening on {server.base_url}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -33,4 +33,8 @@ CI_LONG_ORIGIN = res_path(__file__, 'ci_pu', 'ci_long_origin')
 CI_LONG_TRAD   = res_path(__file__, 'ci_pu', 'ci_long_trad')
 CI_ORIGIN      = res_path(__file__, 'ci_pu', 'ci_origin')
 CI_TRAD        = res_path(__file__, 'ci_pu', 'ci_trad')
-CI_INDEX       = res_path(__file__, 'ci_pu', 'ci_index.json')
\ No newline at end of file
+CI_INDEX       = res_path(__file__, 'ci_pu', 'ci_index.json')
+# 预编译词谱（由 scripts/build_cipai_db.py 生成）
+CIPAI_DB       = res_path(__file__, 'ci_pu', 'cipai.db')
+# 预编译韵表（由 scripts/build_rhyme_db.py 生成）
+RHYME_DB       = res_path(__file__, 'hanzi', 'rhyme_db.bin')
@@ -0,0 +1,112 @@
+"""
+字数不合时的词谱对齐。
+把输入逐字的平仄代码与格式的 ge_lyu_str 连同句读一起做带状编辑距离对齐：平仄相合不计代价，不合计一，
+多字、少字计一点五，句读多出或缺少计一，句读不能与字对齐。只在对角线附近 ±band 的范围内计算与存储，
+一个格式约百余字乘以数格，全部候选合计仍在交互可接受的时间内。
+"""
+
+INF = float('inf')
+CHAR_GAP = 1.5
+SEP_GAP = 1.0
+SEP = '|'
+
+
+def _sub_cost(code: str, rule: str) -> float:
+    if code == SEP or rule == SEP:
+        return 0.0 if code == rule else INF
+    if code == '0' or rule == '中':
+        return 0.0
+    if code == '3':
+        return 0.5
+    return 0.0 if (code == '1') == (rule == '平') else 1.0
+
+
+def tokens(chars: str, punctuation: list[int]) -> tuple[str, list[int]]:
+    """
+    把逐字序列与句读位置合成对齐用的序列，句末的句读不计。
+    Args:
+        chars: 平仄代码串或格律串
+        punctuation: 句读位置，p 表示第 p 个字之后有句读
+    Returns:
+        返回两个值：
+            插入了句读符号的序列
+            序列中每一项对应的字序号，句读为 -1
+    """
+    breaks = {pos for pos in punctuation if 0 <= pos < len(chars) - 1}
+    seq = []
+    index = []
+    for i, ch in enumerate(chars):
+        seq.append(ch)
+        index.append(i)
+        if i in breaks:
+            seq.append(SEP)
+            index.append(-1)
+    return ''.join(seq), index
+
+
+def align(source: str, target: str, band: int, cutoff: float = INF) -> tuple[float, list[tuple[int, int]]]:
+    """
+    带状编辑距离对齐。
+    Args:
+        source: 输入的序列
+        target: 格式的序列
+        band: 对角线两侧计算的宽度，不小于两序列的长度差
+        cutoff: 代价一旦必然超过它就放弃
+    Returns:
+        返回两个值：
+            最小代价，放弃时为 INF
+            对齐路径，每项为（source 序号, target 序号），多出的一侧为 -1
+    """
+    n, m = len(source), len(target)
+    if abs(n - m) > band:
+        return INF, []
+    # 只存带内的格：第 i 行第 j 列存于该行的 j - i + band 处。代价只留上一行与本行，回溯表每行 2 * band + 1 项
+    width = 2 * band + 1
+    back = [bytearray(width) for _ in range(n + 1)]  # 1 对齐 2 source 多出 3 target 多出
+    prev = [INF] * width
+    prev[band] = 0.0
+    for j in range(1, min(m, band) + 1):
+        prev[band + j] = prev[band + j - 1] + (SEP_GAP if target[j - 1] == SEP else CHAR_GAP)
+        back[0][band + j] = 3
+    for i in range(1, n + 1):
+        row = [INF] * width
+        moves = back[i]
+        src = source[i - 1]
+        gap_src = SEP_GAP if src == SEP else CHAR_GAP
+        row_min = INF
+        for j in range(max(0, i - band), min(m, i + band) + 1):
+            k = j - i + band
+            best = prev[k + 1] + gap_src if k + 1 < width else INF
+            move = 2
+            if j:
+                diag = prev[k] + _sub_cost(src, target[j - 1])
+                if diag <= best:
+                    best, move = diag, 1
+                if k:
+                    left = row[k - 1] + (SEP_GAP if target[j - 1] == SEP else CHAR_GAP)
+                    if left < best:
+                        best, move = left, 3
+            row[k] = best
+            moves[k] = move
+            row_min = min(row_min, best)
+        if row_min > cutoff:
+            return INF, []
+        prev = row
+    total = prev[m - n + band]
+    if total > cutoff:
+        return INF, []
+    path = []
+    i, j = n, m
+    while i or j:
+        move = back[i][j - i + band]
+        if move == 1:
+            path.append((i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif move == 2:
+            path.append((i - 1, -1))
+            i -= 1
+        else:
+            path.append((-1, j - 1))
+            j -= 1
+    path.reverse()
+    return total, path
@@ -0,0 +1,70 @@
+"""
+不给词牌名校词时，按（词牌编号, 格式序号）把候选格式分给多个进程打分。
+子进程启动时预先加载韵表与全部词牌格式，只返回每个格式的分数，由主进程按与串行相同的顺序选出最优，再只为胜出的格式生成结果。
+"""
+
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+MIN_PARALLEL_FORMATS = 8  # 候选格式太少时进程间通信得不偿失，直接在本进程打分
+
+_pools: dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()  # 常驻进程多线程同时校验时，同样大小的进程池只建一个
+
+
+def _warm_worker():
+    from yun.ci.ci_search import form_store
+    from yun.common.common import hanzi_to_pingze, hanzi_to_yun
+
+    for yun_shu in (1, 2, 3):
+        hanzi_to_pingze('东', yun_shu, False)
+        hanzi_to_yun('东', yun_shu, False, ci_lin=True)
+    form_store.preload()
+
+
+def _score_formats(init_args: tuple, pairs: list[tuple[str, int]]) -> list[tuple[int, int, int]]:
+    """在子进程中为一批（词牌编号, 格式序号）打分。"""
+    from yun.ci.ci_rhythm import CiRhythm
+    from yun.ci.ci_search import ci_type_extraction
+
+    ci = CiRhythm(*init_args)
+    return [ci._one_format_report(ci_num, ci_type_extraction(ci_num, ci.ci_pu), fmt_id).score()
+            for ci_num, fmt_id in pairs]
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """同样大小的进程池只建一次，常驻进程中各次校验共用。"""
+    with _pools_lock:
+        if workers not in _pools:
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        return _pools[workers]
+
+
+def score_formats(init_args: tuple, pairs: list[tuple[str, int]], workers: int) -> list[tuple[int, int, int]]:
+    """
+    并行为候选格式打分。
+    Args:
+        init_args: 构造 CiRhythm 的参数
+        pairs: 按串行校验顺序排列的（词牌编号, 格式序号）
+        workers: 进程数
+    Returns:
+        与 pairs 一一对应的分数
+    """
+    if workers <= 1 or len(pairs) < MIN_PARALLEL_FORMATS:
+        return _score_formats(init_args, pairs)
+    chunk = max(1, -(-len(pairs) // (workers * 2)))  # 每个进程约两批，兼顾均衡与进程间通信次数
+    batches = [pairs[i:i + chunk] for i in range(0, len(pairs), chunk)]
+    scores = []
+    for batch_scores in get_pool(workers).map(_score_formats, [init_args] * len(batches), batches):
+        scores.extend(batch_scores)
+    return scores
+
+
+@atexit.register
+def shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(cancel_futures=True)
@@ -1,11 +1,14 @@
 """词校验模块内容，支持三韵。"""
 
-from yun.ci.ci_search import ci_type_extraction, search_ci, ci_idx
-from yun.ci.cipai_word_counts import qin_num, long_num
-from yun.common.common import hanzi_to_pingze, result_check, hanzi_to_yun
+from yun.ci.ci_search import (ci_type_extraction, cipai_by_length, form_store, forms_by_punctuation,
+                              masks_by_length, search_ci, ci_idx)
+from yun.ci.cipai_db import punctuation_mask
+from yun.common.common import hanzi_to_pingze, pingze_string, hanzi_to_yun
 import yun.rhythm.new_rhythm as nw
+from bisect import bisect_left
 from collections import Counter
 from yun.common.num_to_cn import num_to_cn
+from yun.common.result import CheckResult, ResultLine, RhymeInfo, better_result, score_key
 
 
 class YunData:
@@ -100,7 +103,7 @@ def _yun_data_process(yun_jiao_pos: list[int], yun_list: list[str], yun_jiao_cla
 
 class CiRhythm:
     def __init__(self, yun_shu: int, ci_pai_name: str, ci_content: str, ci_comma_pos: str,
-                 give_type: str, ci_pu: int, is_trad: bool):
+                 give_type: str, ci_pu: int, is_trad: bool, workers: int = 0, fuzzy_k: int = 0):
         self.yun_shu = yun_shu
         self.ci_pai_name = ci_pai_name
         self.ci_content = ci_content
@@ -109,6 +112,12 @@ class CiRhythm:
         self.ci_pu = ci_pu
         self.show_mark = ['◎', '●', '〇', '�']
         self.is_trad = is_trad
+        self.workers = workers  # 大于 1 时，不给词牌名的校验用进程池并行为候选格式打分
+        self.fuzzy_k = fuzzy_k  # 大于 0 时，字数不合的词与相差不超过 fuzzy_k 字的格式对齐后给出结果
+        self.formats_scored = 0  # 本次校验完整生成结果的格式数
+        self.formats_pruned = 0  # 因分数上界不可能胜出而跳过的格式数
+        self._pingze = None
+        self._comma_mask = punctuation_mask(ci_comma_pos)
 
     def _ci_yun_list_to_hanzi_yun(self, yun_list: list[int]):
         """
@@ -177,10 +186,8 @@ class CiRhythm:
         Returns:
             平仄正误的列表 True对 False错 "duo"多音字无法判断
         """
-        yun_shu = int(self.yun_shu)
         result = []
-        for hanzi_num in range(len(self.ci_content)):
-            ping_ze = hanzi_to_pingze(self.ci_content[hanzi_num], yun_shu, self.is_trad)
+        for hanzi_num, ping_ze in enumerate(self._content_pingze()):
             if ping_ze == '0':
                 result.append('duo')
             elif ping_ze == '3':
@@ -191,6 +198,32 @@ class CiRhythm:
                 result.append(True) if cipai[hanzi_num] in "仄中" else result.append(False)
         return result
 
+    def _content_pingze(self) -> str:
+        """输入的词逐字的平仄代码，只算一次。"""
+        if self._pingze is None:
+            self._pingze = pingze_string(self.ci_content, int(self.yun_shu))
+        return self._pingze
+
+    def _format_bound(self, ci_num: str, fmt: dict, fmt_id: int) -> tuple[int, int, int]:
+        """
+        不查韵部、不生成结果，估计一个格式的 score_key 上界。
+        正确数：平仄相合或多音的字数，加上句末为生僻字的句数（押韵时句末记作 □），水龙吟格二十四另加一；
+        押韵数：最多每句一个韵脚；韵种类最少为一。
+        """
+        right = 0
+        for rule, ping_ze in zip(fmt['ge_lyu_str'], self._content_pingze()):
+            if ping_ze == '0' or (ping_ze == '1' and rule in '平中') or (ping_ze == '2' and rule in '仄中'):
+                right += 1
+        pingze = self._content_pingze()
+        end = 0
+        for part in fmt['ci_sep']:
+            end += len(part.replace('\u3000', ''))
+            if 0 < end <= len(pingze) and pingze[end - 1] == '3':
+                right += 1
+        if fmt_id == 23 and int(ci_num) == 658:
+            right += 1
+        return right, len(fmt['ge_lyu_sep']), -1
+
     def _replace_user_ci_text(self, ci_cut_list: list[str]) -> list[str]:
         """
         根据输入的词内容与分割好的例词列表分割词内容。
@@ -217,36 +250,32 @@ class CiRhythm:
             current_pos += length
         return user_cut_text
 
-    def _show_ci(self, ge_lyu_final: list, text_final: list, yun_final: list, your_lyu_final: list) -> str:
+    def _show_ci(self, ge_lyu_final: list, text_final: list, yun_final: list[RhymeInfo],
+                 your_lyu_final: list) -> list[ResultLine]:
         """
-        将所有得到的结果组合称为最终的结果
+        将所有得到的结果组合称为逐行的结果
         Args:
             ge_lyu_final: 词的格律
             text_final: 输入的词的内容
             yun_final: 押韵结果
             your_lyu_final: 平仄符合与否的结果
         Returns:
-            组合的结果
+            逐行的结果
         """
-        result = ''
+        result = []
         _map = str.maketrans("换叠读举儿韵", "換疊讀舉兒韻")
         for _ in range(len(ge_lyu_final)):
             original_single_ge_lyu = ge_lyu_final[_]
             if self.is_trad:
                 original_single_ge_lyu = original_single_ge_lyu.translate(_map)
-            result += original_single_ge_lyu + '\n'
-            result += text_final[_] + '\u3000'
-            result += yun_final[_] + '\n'
-            if "不押韵" in yun_final[_] or '不押韻' in yun_final[_]:
-                result += your_lyu_final[_][:-1] + '■' + '\n\n'
-            if "不" not in yun_final[_]:
-                if your_lyu_final[_][-1] == '●':
-                    result += your_lyu_final[_][:-1] + '■' + '\n\n'
-                else:
-                    result += your_lyu_final[_][:-1] + '□' + '\n\n'
-            if "不知韵部" in yun_final[_] or '不知韻部' in yun_final[_]:
-                result += your_lyu_final[_] + '\n\n'
-        return result.rstrip() + '\n'
+            rhyme = yun_final[_]
+            marks = your_lyu_final[_]
+            if rhyme.rhymed is False or (rhyme.rhymed and marks[-1] == '●'):
+                marks = marks[:-1] + '■'
+            elif rhyme.rhymed:
+                marks = marks[:-1] + '□'
+            result.append(ResultLine(original_single_ge_lyu, text_final[_], marks, rhyme))
+        return result
 
     @staticmethod
     def _find_punctuation_positions(text: str) -> list[int]:
@@ -264,30 +293,41 @@ class CiRhythm:
                 is_comma = False
         return position
 
-    def _cipai_confirm(self, sg_cipai_forms: list[dict]) -> list:
+    def _cipai_confirm(self, sg_cipai_forms: list[dict], form_masks: list[int] | None = None) -> list:
+        """
+        按字数与句读位置的重合程度（Jaccard 比例）筛选格式。
+        Args:
+            sg_cipai_forms: 一个词牌的全部格式
+            form_masks: 各格式预先算好的句读位集，不给时现算
+        Returns:
+            合格的格式序号列表
+        """
+        if form_masks is None:
+            form_masks = [punctuation_mask(self._find_punctuation_positions('\u3000'.join(form['ci_sep'])))
+                          for form in sg_cipai_forms]
         right_list = []
         zi_conunt = len(self.ci_content)
-        form_count = 0
-        for single_form in sg_cipai_forms:
-            single_sample_ci = '\u3000'.join(single_form['ci_sep'])
+        set_rate = self._set_rate()
+        for form_count, (single_form, cipai_mask) in enumerate(zip(sg_cipai_forms, form_masks)):
             if zi_conunt != len(single_form['ge_lyu_str']):
-                form_count += 1
                 continue
-            cipai_form = self._find_punctuation_positions(single_sample_ci)
-            # input_form = self._find_punctuation_positions(self.ci_comma)
-            right = len(set(self.ci_comma_pos).intersection(cipai_form))
-            right_rate = right / len(set(self.ci_comma_pos) | set(cipai_form))
-            if zi_conunt <= 14:
-                set_rate = 0
-            elif zi_conunt >= 100:
-                set_rate = 0.7
-            else:
-                set_rate = 0.7 * (zi_conunt - 14) / (100 - 14)
-            if right_rate > set_rate:
+            if self._punctuation_rate(cipai_mask) > set_rate:
                 right_list.append(form_count)
-            form_count += 1
         return right_list
 
+    def _set_rate(self) -> float:
+        """句读重合比例的门槛：十四字以内不限，百字以上取 0.7，其间按字数线性增加。"""
+        zi_conunt = len(self.ci_content)
+        if zi_conunt <= 14:
+            return 0
+        if zi_conunt >= 100:
+            return 0.7
+        return 0.7 * (zi_conunt - 14) / (100 - 14)
+
+    def _punctuation_rate(self, cipai_mask: int) -> float:
+        union = (self._comma_mask | cipai_mask).bit_count()
+        return (self._comma_mask & cipai_mask).bit_count() / union if union else 1.0
+
     def _collect_candidate_ci_nums(self) -> list[str] | int:
         """返回要试的词牌编号列表；无法继续时直接返回错误码 int。"""
         if self.ci_pai_name:  # 用户给了词牌名
@@ -297,40 +337,76 @@ class CiRhythm:
             if ci_num == 'err1':
                 return 0
             return 4
-        # 按字数反查
+        # 按字数反查：句读位置完全相同的格式由句读索引直接查出，其余格式按索引中的句读位集算重合比例，都不必解压格式内容
         length = len(self.ci_content)
-        check_num = qin_num if self.ci_pu == 1 else long_num
-        if length not in check_num:
-            return 3
-        cand = [n for n in check_num[length] if self._cipai_confirm(ci_type_extraction(n, self.ci_pu))]
+        exact = forms_by_punctuation(self.ci_comma_pos, length, self.ci_pu)
+        set_rate = self._set_rate()
+        cand = []
+        for n, fmt, cipai_mask in masks_by_length(length, self.ci_pu):
+            if (not cand or cand[-1] != n) and ((n, fmt) in exact or self._punctuation_rate(cipai_mask) > set_rate):
+                cand.append(n)
         return cand or 3
 
-    def _build_single_ci_report(self, ci_num: str) -> str | int:
-        """为单个词牌生成最优格式报告。"""
+    def _plan_single_ci(self, ci_num: str) -> tuple[list[dict], list[int], bool] | int:
+        """确定单个词牌要校验的格式：返回（格式列表, 要跑的格式号, 是否降级提示），不合格时返回错误码。"""
         type_list = ci_type_extraction(ci_num, self.ci_pu)
-        ok_types = self._cipai_confirm(type_list)
+        ok_types = self._cipai_confirm(type_list, form_store.masks(ci_num, self.ci_pu))
         if not ok_types:
             return 1
         use_types, warn = self._filter_given_type(ok_types)
         if warn == 'error':
             return 2
-        best = ''
+        return type_list, use_types, warn
+
+    def _build_single_ci_report(self, ci_num: str, floor: tuple[int, int, int] | None = None) -> CheckResult | int | None:
+        """
+        为单个词牌生成最优格式的校验结果。
+        先算每个格式的分数上界，上界低于 floor（其他词牌已有的最好分数）或本词牌已有的最好分数时，
+        该格式不可能胜出（分数相同时后者胜，所以只跳过严格更低的），不再生成结果。
+        Args:
+            ci_num: 词牌编号
+            floor: 已有的最好 score_key，None 表示没有
+        Returns:
+            校验结果，错误码，或 None（全部格式都不可能胜过 floor）
+        """
+        plan = self._plan_single_ci(ci_num)
+        if isinstance(plan, int):
+            return plan
+        type_list, use_types, warn = plan
+        best = None
+        threshold = floor
         for fmt_id in use_types:
+            if threshold is not None and self._format_bound(ci_num, type_list[fmt_id], fmt_id) < threshold:
+                self.formats_pruned += 1
+                continue
+            self.formats_scored += 1
             report = self._one_format_report(ci_num, type_list, fmt_id)
-            best = result_check(best, report)
-
-        # 2. 拼装词牌名 + 降级提示（若有）
-        if not self.ci_pai_name:
+            best = better_result(best, report)
+            threshold = max(threshold, score_key(best.score())) if threshold is not None else score_key(best.score())
+        if best is None:
+            return None
+        return self._decorate_report(best, ci_num, warn)
+
+    def _decorate_report(self, best: CheckResult, ci_num: str, warn: bool) -> CheckResult:
+        """拼装词牌名 + 降级提示（若有）"""
+        entry = ci_idx[int(ci_num)]
+        best.meta['cipai'] = entry['names'][0]
+        name = entry['names_trad'][0] if self.is_trad else entry['names'][0]
+        given = self.ci_pai_name.strip() if self.ci_pai_name else ''
+        if not given:
+            best.prefix = name + '\n' + best.prefix
+        elif given not in entry['names'] + entry['names_trad']:  # 拼音或容错匹配到的词牌，注明实际所用的词牌名
+            best.meta['cipai_input'] = given
             if self.is_trad:
-                best = ci_idx[int(ci_num)]['names_trad'][0] + '\n' + best
+                best.prefix = f'{name}（輸入為「{given}」，按此詞牌校驗）\n' + best.prefix
             else:
-                best = ci_idx[int(ci_num)]['names'][0] + '\n' + best
+                best.prefix = f'{name}（输入为「{given}」，按此词牌校验）\n' + best.prefix
         if warn:
             if self.is_trad:
                 warn_word = "給定格式與實際相差過大或沒有此格式，將另行匹配。\n"
             else:
                 warn_word = "给定格式与实际相差过大或没有此格式，将另行匹配。\n"
-            best = warn_word + best
+            best.prefix = warn_word + best.prefix
         return best
 
     def _filter_given_type(self, ok_types: list[int]) -> tuple[list[int], bool | str]:
@@ -358,8 +434,8 @@ class CiRhythm:
             return [idx] if idx in ok_types else -1
         return -1
 
-    def _one_format_report(self, ci_num: str, type_list: list, fmt_id: int) -> str:
-        """生成「格 x」的完整校验文本。"""
+    def _one_format_report(self, ci_num: str, type_list: list, fmt_id: int) -> CheckResult:
+        """生成「格 x」的完整校验结果。"""
         fmt = type_list[fmt_id]
         remain = fmt['ge_lyu_str']
         yun_pos = fmt['rhyme_pos']
@@ -372,19 +448,27 @@ class CiRhythm:
                     for i in yun_pos]
         yun_show = _yun_data_process(yun_pos, [self.ci_content[i] for i in yun_pos],
                                      yun_class, yun_nums)
-        yun_info = [self._fmt_yun_info(s) for s in yun_show]
+        yun_info = [self._rhyme_info(s) for s in yun_show]
 
         pingze_right = self._ping_ze_right(remain)
         yun_final = self._yun_right_list(real_lis, pingze_right)
 
-        report = f'你的格式为 格{num_to_cn(fmt_id + 1)}\n\n'
-        report += self._show_ci(cut_lis, my_text, yun_info, yun_final)
+        lines = self._show_ci(cut_lis, my_text, yun_info, yun_final)
 
         # 水龙吟格二十四特殊处理
+        tail = []
         if fmt_id == 23 and int(ci_num) == 658:
-            report += (f'\n仄句\n{self.ci_content[-1]}\n'
-                       f'{self.show_mark[int(hanzi_to_pingze(self.ci_content[-1], self.yun_shu, self.is_trad))]}\n')
-        return report
+            mark = self.show_mark[int(hanzi_to_pingze(self.ci_content[-1], self.yun_shu, self.is_trad))]
+            tail.append(ResultLine('仄句', self.ci_content[-1], mark))
+        return CheckResult('ci', f'你的格式为 格{num_to_cn(fmt_id + 1)}', lines, self.is_trad,
+                           tail=tail, meta={'format': fmt_id + 1})
+
+    def _rhyme_info(self, d: dict) -> RhymeInfo:
+        """把单个韵脚字典变成结构化的韵脚信息。"""
+        info = self._fmt_yun_info(d)
+        if info in ('不知韵部', '不知韻部'):
+            return RhymeInfo(d['hanzi'], info, None)
+        return RhymeInfo(d['hanzi'], info, d['is_yayun'], d['group'])
 
     def _fmt_yun_info(self, d: dict) -> str:
         """把单个韵脚字典变成人类可读串。"""
@@ -403,14 +487,261 @@ class CiRhythm:
         Returns:
             校验文本 | 错误码 0/1/2/3
         """
+        result = self.check()
+        if isinstance(result, int):
+            return result
+        return result.render()
+
+    def check(self) -> CheckResult | int:
+        """
+        校验词牌，返回最匹配的结构化结果
+        Returns:
+            校验结果 | 错误码 0/1/2/3
+        """
         # 1. 确定要试的词牌编号列表
+        self.formats_scored = self.formats_pruned = 0
         ci_nums = self._collect_candidate_ci_nums()
         if isinstance(ci_nums, int):  # 0 或 3
+            if ci_nums == 3 and self.fuzzy_k:
+                return self._fuzzy_check(None) or ci_nums
             return ci_nums
 
-        # 2. 对每个词牌、每个合格格式生成报告，再 pairwise 选最优
-        best = ''
+        if self.workers > 1 and len(ci_nums) > 1:
+            result = self._check_parallel(ci_nums)
+        else:
+            result = self._check_serial(ci_nums)
+        if result == 1 and self.fuzzy_k:
+            return self._fuzzy_check(ci_nums) or result
+        return result
+
+    def _check_serial(self, ci_nums: list[str]) -> CheckResult | int:
+        """逐个词牌、逐个格式校验，按分数选最优。"""
+
+        # 2. 对每个词牌、每个合格格式生成结果，再按分数选最优；都不合格时返回第一个错误码
+        best = None
+        error = None
         for ci_num in ci_nums:
-            report = self._build_single_ci_report(ci_num)
-            best = result_check(best, report)
+            report = self._build_single_ci_report(ci_num, score_key(best.score()) if best is not None else None)
+            if report is None:
+                continue
+            if isinstance(report, int):
+                error = report if error is None else error
+                continue
+            best = better_result(best, report)
+        if best is None:
+            return error
+        best.meta['formats'] = {'scored': self.formats_scored, 'pruned': self.formats_pruned}
         return best
+
+    def _check_parallel(self, ci_nums: list[str]) -> CheckResult | int:
+        """
+        与 check 的串行路径结果相同：各格式的分数由进程池算出，按同样的顺序与规则（分数相同取后一个）选出最优，
+        再只为胜出的格式生成结果。
+        """
+        from yun.ci.ci_pool import score_formats
+
+        plans = {}
+        error = None
+        pairs = []
+        for ci_num in ci_nums:
+            plan = self._plan_single_ci(ci_num)
+            if isinstance(plan, int):
+                error = plan if error is None else error
+                continue
+            plans[ci_num] = plan
+            pairs.extend((ci_num, fmt_id) for fmt_id in plan[1])
+        if not pairs:
+            return error
+
+        init_args = (self.yun_shu, self.ci_pai_name, self.ci_content, self.ci_comma_pos,
+                     self.give_type, self.ci_pu, self.is_trad)
+        scores = dict(zip(pairs, map(score_key, score_formats(init_args, pairs, self.workers))))
+        best_pair = None
+        for ci_num, (_, use_types, _) in plans.items():
+            ci_best = None
+            for fmt_id in use_types:
+                if ci_best is None or scores[ci_num, fmt_id] >= scores[ci_best]:
+                    ci_best = (ci_num, fmt_id)
+            if best_pair is None or scores[ci_best] >= scores[best_pair]:
+                best_pair = ci_best
+        ci_num, fmt_id = best_pair
+        type_list, _, warn = plans[ci_num]
+        self.formats_scored += len(pairs)  # 并行时每个候选格式都打分，不做剪枝
+        best = self._decorate_report(self._one_format_report(ci_num, type_list, fmt_id), ci_num, warn)
+        best.meta['formats'] = {'scored': self.formats_scored, 'pruned': self.formats_pruned}
+        return best
+
+    def _fuzzy_candidates(self, ci_nums: list[str] | None) -> list[tuple[str, int]]:
+        """字数相差不超过 fuzzy_k 的（词牌编号, 格式序号）；ci_nums 为 None 时按字数索引在全部词牌中找。"""
+        length = len(self.ci_content)
+        if ci_nums is None:
+            ci_nums = []
+            for near in range(length - self.fuzzy_k, length + self.fuzzy_k + 1):
+                ci_nums.extend(n for n in cipai_by_length(near, self.ci_pu) if n not in ci_nums)
+            ci_nums.sort(key=int)
+        pairs = []
+        for ci_num in ci_nums:
+            for fmt_id, form in enumerate(ci_type_extraction(ci_num, self.ci_pu)):
+                if abs(len(form['ge_lyu_str']) - length) <= self.fuzzy_k:
+                    pairs.append((ci_num, fmt_id))
+        return pairs
+
+    def _fuzzy_check(self, ci_nums: list[str] | None) -> CheckResult | None:
+        """
+        字数不合时，把输入与相差不超过 fuzzy_k 字的格式连同句读对齐，取代价最小者，标出多字、少字的位置。
+        代价相同时取字数相差小的，再按词牌、格式的先后。句读重合程度达不到 _cipai_confirm 的标准则不采用。
+        Args:
+            ci_nums: 限定的词牌编号，None 表示按字数在全部词牌中找
+        Returns:
+            对齐后的结果，没有可用的格式时返回 None
+        """
+        from yun.ci.ci_align import CHAR_GAP, INF, SEP, align, tokens
+        from yun.ci.cipai_db import punctuation_positions
+
+        length = len(self.ci_content)
+        source, source_index = tokens(self._content_pingze(), [p for p in self.ci_comma_pos if p >= 0])
+        pairs = self._fuzzy_candidates(ci_nums)
+        pairs.sort(key=lambda pair: abs(len(ci_type_extraction(pair[0], self.ci_pu)[pair[1]]['ge_lyu_str']) - length))
+        if length <= 14:
+            set_rate = 0
+        elif length >= 100:
+            set_rate = 0.7
+        else:
+            set_rate = 0.7 * (length - 14) / (100 - 14)
+
+        best = None
+        for ci_num, fmt_id in pairs:
+            form = ci_type_extraction(ci_num, self.ci_pu)[fmt_id]
+            form_len = len(form['ge_lyu_str'])
+            if best is not None and CHAR_GAP * abs(form_len - length) > best[0][0]:
+                continue
+            target, target_index = tokens(form['ge_lyu_str'], punctuation_positions('\u3000'.join(form['ci_sep'])))
+            cost, path = align(source, target, abs(len(source) - len(target)) + 2,
+                               best[0][0] if best is not None else INF)
+            if cost == INF:
+                continue
+            seps = source.count(SEP) + target.count(SEP)
+            matched = sum(1 for i, j in path if i >= 0 and j >= 0 and source[i] == SEP)
+            if seps - matched and matched / (seps - matched) <= set_rate:
+                continue
+            key = (cost, abs(form_len - length), int(ci_num), fmt_id)
+            if best is None or key < best[0]:
+                best = (key, ci_num, fmt_id, path, target_index)
+        if best is None:
+            return None
+        _, ci_num, fmt_id, path, target_index = best
+        aligned = [(source_index[i] if i >= 0 else -1, target_index[j] if j >= 0 else -1)
+                   for i, j in path if (i < 0 or source_index[i] >= 0) and (j < 0 or target_index[j] >= 0)]
+        report = self._fuzzy_report(ci_type_extraction(ci_num, self.ci_pu)[fmt_id], fmt_id, aligned)
+        report.meta['cost'] = best[0][0]
+        return self._decorate_report(report, ci_num, False)
+
+    def _place_extra(self, aligned: list[tuple[int, int]]) -> tuple[dict, dict]:
+        """
+        决定多出的字放在哪个格式字的前后：优先跟在输入中同一句前面已对上的字之后，
+        其次放在同一句后面已对上的字之前，整句都是多出的字时跟在前一个对上的字之后。
+        Returns:
+            返回两个值：
+                格式的字序号 -> 放在其前的多出字序号列表
+                格式的字序号 -> 放在其后的多出字序号列表
+        """
+        breaks = sorted(p for p in self.ci_comma_pos if p >= 0)
+        clause = [bisect_left(breaks, i) for i in range(len(self.ci_content))]  # 每个字在输入中的句序号
+        matched = [(i, j) for i, j in aligned if i >= 0 and j >= 0]
+        before, after = {}, {}
+        for i, j in aligned:
+            if j >= 0:
+                continue
+            prev = next(((k, t) for k, t in reversed(matched) if k < i), None)
+            nxt = next(((k, t) for k, t in matched if k > i), None)
+            if prev is not None and clause[prev[0]] == clause[i]:
+                after.setdefault(prev[1], []).append(i)
+            elif nxt is not None and clause[nxt[0]] == clause[i]:
+                before.setdefault(nxt[1], []).append(i)
+            elif prev is not None:
+                after.setdefault(prev[1], []).append(i)
+            else:
+                before.setdefault(nxt[1] if nxt is not None else 0, []).append(i)
+        return before, after
+
+    def _fuzzy_rhymes(self, form: dict, match: dict) -> dict:
+        """对上了输入字的韵脚照常判断押韵，缺字的韵脚不判断。返回格式的字序号 -> 韵脚信息。"""
+        yun_pos = [pos for pos in form['rhyme_pos'] if match.get(pos, -1) >= 0]
+        hanzi = [self.ci_content[match[pos]] for pos in yun_pos]
+        yun_nums = [hanzi_to_yun(ch, self.yun_shu, self.is_trad, ci_lin=True) for ch in hanzi]
+        yun_show = _yun_data_process(yun_pos, hanzi, form['yun_classify'], yun_nums)
+        return {pos: self._rhyme_info(d) for pos, d in zip(yun_pos, yun_show)}
+
+    def _fuzzy_report(self, form: dict, fmt_id: int, aligned: list[tuple[int, int]]) -> CheckResult:
+        """
+        按对齐结果逐句展示：缺字处以＿代替并标 －，多出的字标 ＋，其余字照常标平仄正误。
+        多出的字随输入中同一句的相邻字放置，不会被移到另一句；对上了的韵脚照常判断押韵。
+        Args:
+            form: 对齐到的格式
+            fmt_id: 格式序号
+            aligned: 对齐路径，每项为（输入的字序号, 格式的字序号），多出的一侧为 -1
+        """
+        pingze = self._content_pingze()
+        rules = form['ge_lyu_str']
+        match = {j: i for i, j in aligned if j >= 0}  # 格式的字序号 -> 输入的字序号，缺字为 -1
+        before, after = self._place_extra(aligned)
+        rhymes = self._fuzzy_rhymes(form, match)
+
+        def char_mark(i: int, rule: str) -> str:
+            code = pingze[i]
+            if code == '0':
+                return '◎'
+            if code == '3':
+                return '�'
+            return '〇' if rule == '中' or (code == '1') == (rule == '平') else '●'
+
+        _map = str.maketrans("换叠读举儿韵", "換疊讀舉兒韻")
+        lines = []
+        missing_all, extra_all = [], []
+        j = 0
+        for part, rule_line in zip(form['ci_sep'], form['ge_lyu_sep']):
+            text, marks = '', ''
+            missing = added = 0
+            rhyme = None
+            for ch in part:
+                if ch == '\u3000':
+                    text += ch
+                    marks += ch
+                    continue
+                leading, trailing = before.get(j, []), after.get(j, [])
+                for k in leading:
+                    text += self.ci_content[k]
+                    marks += '＋'
+                i = match.get(j, -1)
+                if i < 0:
+                    text += '＿'
+                    marks += '－'
+                    missing_all.append(j)
+                    missing += 1
+                else:
+                    text += self.ci_content[i]
+                    mark = char_mark(i, rules[j])
+                    rhyme = rhymes.get(j, rhyme)
+                    if j in rhymes:  # 韵脚与 _show_ci 一样改标 □ ■
+                        mark = '■' if rhymes[j].rhymed is False or (rhymes[j].rhymed and mark == '●') else (
+                            '□' if rhymes[j].rhymed else mark)
+                    marks += mark
+                for k in trailing:
+                    text += self.ci_content[k]
+                    marks += '＋'
+                added += len(leading) + len(trailing)
+                extra_all.extend(leading + trailing)
+                j += 1
+            notes = []
+            if missing:
+                notes.append(f'少{num_to_cn(missing)}字')
+            if added:
+                notes.append(f'多{num_to_cn(added)}字')
+            lines.append(ResultLine(rule_line.translate(_map) if self.is_trad else rule_line, text, marks,
+                                    rhyme, note=' '.join(notes)))
+        if self.is_trad:
+            title = f'你的格式為 格{num_to_cn(fmt_id + 1)}（字數不合，已按最接近的格式對齊）'
+        else:
+            title = f'你的格式为 格{num_to_cn(fmt_id + 1)}（字数不合，已按最接近的格式对齐）'
+        return CheckResult('ci', title, lines, self.is_trad,
+                           meta={'format': fmt_id + 1, 'fuzzy': True, 'missing': missing_all, 'extra': extra_all})
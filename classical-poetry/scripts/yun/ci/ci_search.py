@@ -1,36 +1,318 @@
 import json
 import os
+import threading
+from collections import OrderedDict
 
 from yun import CI_LIST, CI_LONG, CI_INDEX
+from yun.ci.cipai_db import load_cipai_db, punctuation_mask, punctuation_positions
 
 with open(CI_INDEX, 'r', encoding='utf-8') as f:
     ci_idx = json.load(f)
 
 
-def search_ci(input_name: str, ci_pu: int) -> str:
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """带相邻换位的编辑距离，超过 limit 时提前返回 limit + 1。"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if prev2 is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+FUZZY_MIN_NAME = 3
+FUZZY_MIN_PINYIN = 4
+
+
+class CipaiNameIndex:
     """
-    从词牌名称，在词牌索引中读取编号。或者通过编号读取词牌名。
+    词牌名索引。简繁体名与拼音（全拼、首字母）精确查找用字典，前缀联想用字典树，
+    字典树每个节点预先存好按匹配程度排序的词牌编号，联想时只需走到前缀所在节点。
+    """
+
+    def __init__(self, entries: list[dict]):
+        self._entries = entries
+        self._names: dict[str, int] = {}  # 简繁体名
+        self._pinyins: dict[str, int] = {}  # 全拼与首字母
+        self._trie: dict = {}
+        ranked: list[tuple[dict, tuple[int, int, int]]] = []
+        for item in entries:
+            idx = item['idx']
+            keys = item['names'] + item['names_trad']
+            for name in keys:
+                self._names.setdefault(name, idx)  # 与原先的顺序扫描一致，排在前面的词牌优先
+            pinyins = [pinyin.lower() for pinyin in item['pinyins'] + [item['full']]]
+            for pinyin in pinyins:
+                self._pinyins.setdefault(pinyin, idx)
+            for key in set(keys + pinyins):
+                node = self._trie
+                for depth, ch in enumerate(key, start=1):
+                    node = node.setdefault(ch, {})
+                    ranked.append((node, (len(key) - depth, idx, len(key))))
+        for node, rank in ranked:
+            node.setdefault(None, []).append(rank)
+        self._finish(self._trie)
+
+    def _finish(self, node: dict):
+        """把节点上的（剩余字数, 编号, 键长）排序去重为编号列表：完整匹配在前，其次是更短的名字，再按编号。"""
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            ranks = node.get(None)
+            if ranks is not None:
+                seen = set()
+                ids = []
+                for _, idx, _ in sorted(ranks):
+                    if idx not in seen:
+                        seen.add(idx)
+                        ids.append(idx)
+                node[None] = ids
+            stack.extend(child for key, child in node.items() if key is not None)
+
+    def exact(self, name: str) -> int | None:
+        """简繁体名或拼音完全相同的词牌编号。"""
+        idx = self._names.get(name)
+        if idx is None:
+            idx = self._pinyins.get(name.strip().lower().replace(' ', ''))
+        return idx
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[int]:
+        """以 prefix 开头的名字或拼音对应的词牌编号。"""
+        node = self._trie
+        for ch in prefix.strip().lower().replace(' ', ''):
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node.get(None, [])[:limit]
+
+    def fuzzy(self, name: str) -> int | None:
+        """
+        容错查找：三字及以上的汉字名差一个字（错字、漏字、多字、两字颠倒），
+        或四个字母及以上的拼音每四个字母容许差一个、最多差两个。
+        Returns:
+            唯一最接近的词牌编号；没有或有多个同样接近的词牌时返回 None
+        """
+        name = name.strip()
+        key = name.lower().replace(' ', '')
+        if key.isascii():
+            if len(key) < FUZZY_MIN_PINYIN:  # 过短的键差一个字母就能对上许多词牌，不做容错
+                return None
+            table, limit = self._pinyins, min(2, len(key) // 4)
+        else:
+            if len(name) < FUZZY_MIN_NAME:
+                return None
+            table, limit = self._names, 1
+        best = limit + 1
+        found = set()
+        for candidate, idx in table.items():
+            distance = _edit_distance(key if key.isascii() else name, candidate, min(best, limit))
+            if distance < best:
+                best = distance
+                found = {idx}
+            elif distance == best:
+                found.add(idx)
+        if best > limit or len(found) != 1:
+            return None
+        return found.pop()
+
+
+_name_index: CipaiNameIndex | None = None
+
+
+def name_index() -> CipaiNameIndex:
+    """词牌名索引，第一次使用时建立。"""
+    global _name_index
+    if _name_index is None:
+        _name_index = CipaiNameIndex(ci_idx)
+    return _name_index
+
+
+def search_ci(input_name: str, ci_pu: int, fuzzy: bool = True) -> str:
+    """
+    从词牌名称，在词牌索引中读取编号。也可输入拼音全拼或首字母，名称有错字时按最接近的词牌匹配。
     Args:
-        input_name: 词牌实际名称或编号
+        input_name: 词牌实际名称或拼音
         ci_pu: 给定的词谱
+        fuzzy: 找不到时是否容错匹配
     Returns:
-        词牌的编号值（字符串）或编号值对应的词牌名，如果没有，返回None
+        词牌的编号值，没有该词牌返回 'err1'，龙谱中没有该词牌返回 'err2'
     """
-    for single_ci in ci_idx:
-        if input_name in single_ci['names'] or input_name in single_ci['names_trad']:
-            if ci_pu == 1:
-                return single_ci['idx']
-            else:
-                if single_ci['long_exist']:
-                    return single_ci['idx']
-                return 'err2'
-    return 'err1'
+    db = load_cipai_db()
+    if db is not None:  # 精确查找走预编译词谱的词牌名表，不必建立名称索引
+        found = db.search(input_name, ci_pu)
+        if found != 'err1' or not fuzzy:
+            return found
+    index = name_index()
+    idx = index.exact(input_name)
+    if idx is None and fuzzy:
+        idx = index.fuzzy(input_name)
+    if idx is None:
+        return 'err1'
+    if ci_pu == 1 or ci_idx[idx]['long_exist']:
+        return idx
+    return 'err2'
 
 
-def ci_type_extraction(ci_number: str | int, ci_pu: int) -> list[dict]:
+def suggest_cipai(prefix: str, limit: int = 10, is_trad: bool = False) -> list[str]:
+    """
+    词牌名联想，供输入时逐字补全。
+    Args:
+        prefix: 已输入的词牌名或拼音前缀
+        limit: 最多返回几个
+        is_trad: 是否返回繁体名
+    Returns:
+        词牌名列表，完整匹配在前
+    """
+    if not prefix.strip():
+        return []
+    key = 'names_trad' if is_trad else 'names'
+    return [ci_idx[idx][key][0] for idx in name_index().suggest(prefix, limit)]
+
+
+def _form_path(ci_number: str | int, ci_pu: int) -> str:
     base = CI_LIST if ci_pu == 1 else CI_LONG
     last = '' if ci_pu == 1 else '_long'
-    file_name = f'cipai_{ci_number}{last}.json'
-    file_path = os.path.join(base, file_name)
-    with open(file_path, 'r', encoding='utf-8') as file:
-        return json.load(file)
+    return os.path.join(base, f'cipai_{ci_number}{last}.json')
+
+
+def _read_forms(ci_number: str | int, ci_pu: int) -> tuple[list[dict], list[int]]:
+    """从预编译词谱读取一个词牌的全部格式与句读位集，没有预编译词谱时读 JSON 文件并现算位集。"""
+    db = load_cipai_db()
+    if db is not None:
+        return db.forms_with_masks(ci_number, ci_pu)
+    with open(_form_path(ci_number, ci_pu), 'r', encoding='utf-8') as file:
+        forms = json.load(file)
+    return forms, [punctuation_mask(punctuation_positions('\u3000'.join(form['ci_sep']))) for form in forms]
+
+
+def cipai_by_length(length: int, ci_pu: int) -> list[str]:
+    """
+    按字数反查词牌。
+    Args:
+        length: 词的字数
+        ci_pu: 1 钦谱 2 龙谱
+    Returns:
+        有该字数格式的词牌编号列表（字符串），没有则为空列表
+    """
+    db = load_cipai_db()
+    if db is not None:
+        return db.cipai_by_length(length, ci_pu)
+    from yun.ci.cipai_word_counts import qin_num, long_num
+
+    return (qin_num if ci_pu == 1 else long_num).get(length, [])
+
+
+def masks_by_length(length: int, ci_pu: int) -> list[tuple[str, int, int]]:
+    """
+    字数为 length 的全部格式的句读位集，供按字数反查词牌时筛选。
+    Args:
+        length: 词的字数
+        ci_pu: 1 钦谱 2 龙谱
+    Returns:
+        （词牌编号, 格式序号, 句读位集）列表，词牌按 cipai_by_length 的顺序；有预编译词谱时不解压格式内容
+    """
+    db = load_cipai_db()
+    if db is not None:
+        return db.masks_by_length(length, ci_pu)
+    return [(n, fmt, mask)
+            for n in cipai_by_length(length, ci_pu)
+            for fmt, (form, mask) in enumerate(zip(form_store.get(n, ci_pu), form_store.masks(n, ci_pu)))
+            if len(form['ge_lyu_str']) == length]
+
+
+def forms_by_punctuation(positions: list[int], length: int, ci_pu: int) -> set[tuple[str, int]]:
+    """句读位置与 positions 完全相同、字数为 length 的（词牌编号, 格式序号），没有预编译词谱时为空集。"""
+    db = load_cipai_db()
+    if db is None:
+        return set()
+    return {(str(idx), fmt) for idx, fmt in db.forms_by_punctuation(positions, ci_pu, length)}
+
+
+class CiFormStore:
+    """
+    词牌格式缓存。按（编号, 词谱）缓存解析好的 cipai_<n>.json 及各格式的句读位集，最近最少使用的先淘汰。
+    返回的格式列表为共享对象，调用方只读不改。
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._forms: OrderedDict[tuple[int, int], tuple[list[dict], list[int]]] = OrderedDict()
+        self._lock = threading.Lock()  # 守护进程多线程共用
+
+    def get(self, ci_number: str | int, ci_pu: int) -> list[dict]:
+        """
+        读取一个词牌的全部格式。
+        Args:
+            ci_number: 词牌编号
+            ci_pu: 1 钦谱 2 龙谱
+        Returns:
+            词牌格式列表
+        """
+        return self._entry(ci_number, ci_pu)[0]
+
+    def masks(self, ci_number: str | int, ci_pu: int) -> list[int]:
+        """一个词牌各格式的句读位集（见 punctuation_mask），与 get 的格式一一对应。"""
+        return self._entry(ci_number, ci_pu)[1]
+
+    def _entry(self, ci_number: str | int, ci_pu: int) -> tuple[list[dict], list[int]]:
+        key = (int(ci_number), 1 if ci_pu == 1 else 2)
+        with self._lock:
+            entry = self._forms.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._forms.move_to_end(key)
+                return entry
+            self.misses += 1
+        entry = _read_forms(ci_number, ci_pu)
+        with self._lock:
+            self._forms[key] = entry
+            self._forms.move_to_end(key)
+            while len(self._forms) > self.maxsize:
+                self._forms.popitem(last=False)
+        return entry
+
+    def preload(self, ci_pu: int | None = None) -> int:
+        """
+        一次读入全部词牌格式，并把容量放大到能全部容纳，供常驻进程使用。
+        Args:
+            ci_pu: 只预读某个词谱，None 表示两个词谱都读
+        Returns:
+            已缓存的词牌数
+        """
+        keys = []
+        for pu in ((1, 2) if ci_pu is None else (ci_pu,)):
+            keys.extend((int(item['idx']), pu) for item in ci_idx
+                        if pu == 1 or item['long_exist'])
+        self.maxsize = max(self.maxsize, len(keys))
+        for ci_number, pu in keys:
+            try:
+                self.get(ci_number, pu)
+            except FileNotFoundError:  # 索引中标有龙谱、实际没有格式文件的词牌
+                continue
+        return len(self._forms)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._forms), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self._lock:
+            self._forms.clear()
+            self.hits = self.misses = 0
+
+
+form_store = CiFormStore()
+
+
+def ci_type_extraction(ci_number: str | int, ci_pu: int) -> list[dict]:
+    """读取词牌的全部格式，经由 form_store 缓存。"""
+    return form_store.get(ci_number, ci_pu)
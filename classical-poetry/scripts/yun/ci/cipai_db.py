@@ -0,0 +1,346 @@
+"""
+预编译词谱模块。
+将 ci_pu/ci_list（钦谱）与 ci_pu/ci_long（龙谱）下的全部 cipai_<n>.json 以及词牌索引打包为单个 SQLite 文件，
+运行时只读打开，按词牌名、编号、字数、韵脚位置与句读位置查询，免去逐个打开、解析小文件。
+按字数反查词牌时只读各格式的句读位置，不必解压格式内容。
+
+表结构：
+    meta        键值对，记录版本号
+    cipai       词牌编号、是否有龙谱
+    cipai_name  词牌名（含繁体，kind 为 0）与小写拼音（全拼、首字母，kind 为 1）到编号，按索引中的先后顺序排列
+    form        词谱(1 钦谱 2 龙谱)、编号、格式序号、字数、韵脚位置、句读位置、格式内容（zlib 压缩的 JSON）
+"""
+
+import ast
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+from yun import CI_DIR, CI_INDEX, CI_LIST, CI_LONG, CIPAI_DB
+
+VERSION = '3'
+
+_SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE cipai (idx INTEGER PRIMARY KEY, long_exist INTEGER NOT NULL);
+CREATE TABLE cipai_name (name TEXT NOT NULL, kind INTEGER NOT NULL, idx INTEGER NOT NULL, seq INTEGER NOT NULL);
+CREATE TABLE form (
+    ci_pu INTEGER NOT NULL,
+    idx INTEGER NOT NULL,
+    fmt INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    rhyme_pos TEXT NOT NULL,
+    punctuation TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (ci_pu, idx, fmt)
+);
+CREATE INDEX cipai_name_name ON cipai_name (kind, name, seq);
+CREATE INDEX form_length ON form (ci_pu, length, idx, fmt, punctuation);
+CREATE INDEX form_rhyme_pos ON form (ci_pu, rhyme_pos, length);
+CREATE INDEX form_punctuation ON form (ci_pu, punctuation, length);
+'''
+
+WORD_COUNTS = os.path.join(CI_DIR, 'cipai_word_counts.py')
+LENGTH_TABLES = {1: 'qin_num', 2: 'long_num'}
+
+COMMA_SYMS = {',', '.', '?', '!', ':', "，", "。", "？", "！", "、", "：", '　'}
+
+_loaded: dict[str, 'CipaiDB | None'] = {}
+
+
+def punctuation_positions(text: str) -> list[int]:
+    """与 CiRhythm._find_punctuation_positions 相同：每处句读前一个字在去掉标点后的位置。"""
+    position = []
+    correct = 1
+    is_comma = False
+    for index, ch in enumerate(text):
+        if ch in COMMA_SYMS:
+            if not is_comma:
+                position.append(index - correct)
+            correct += 1
+            is_comma = True
+        else:
+            is_comma = False
+    return position
+
+
+def punctuation_mask(positions) -> int:
+    """把句读位置压成整数位集，第 p 位（从 -1 起算，故整体右移一位）表示位置 p 后有句读，Jaccard 比例用 bit_count 计算。"""
+    mask = 0
+    for pos in positions:
+        mask |= 1 << (pos + 1)
+    return mask
+
+
+def _signature(positions) -> str:
+    return ','.join(map(str, positions))
+
+
+def _mask(signature: str) -> int:
+    return punctuation_mask(map(int, signature.split(','))) if signature else 0
+
+
+def _ci_pu(ci_pu: int) -> int:
+    return 1 if ci_pu == 1 else 2
+
+
+class CipaiDB:
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self._conn = sqlite3.connect(f'file:{path}?mode=ro&immutable=1', uri=True, check_same_thread=False)
+        self._lock = threading.Lock()  # 守护进程多线程共用一个只读连接
+        row = self._query_one("SELECT value FROM meta WHERE key = 'version'")
+        if row is None or row[0] != VERSION:
+            raise ValueError(f'{path} 不是可识别的词谱文件')
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query_one(self, sql: str, params: tuple = ()) -> tuple | None:
+        rows = self._query(sql, params)
+        return rows[0] if rows else None
+
+    def forms(self, ci_number: str | int, ci_pu: int) -> list[dict]:
+        """与读取 cipai_<n>.json 相同：一个词牌的全部格式。没有该词牌时抛出 FileNotFoundError。"""
+        return self.forms_with_masks(ci_number, ci_pu)[0]
+
+    def forms_with_masks(self, ci_number: str | int, ci_pu: int) -> tuple[list[dict], list[int]]:
+        """一个词牌的全部格式，以及建库时算好的各格式句读位集。没有该词牌时抛出 FileNotFoundError。"""
+        rows = self._query('SELECT data, punctuation FROM form WHERE ci_pu = ? AND idx = ? ORDER BY fmt',
+                           (_ci_pu(ci_pu), int(ci_number)))
+        if not rows:
+            raise FileNotFoundError(f'词谱中没有编号为 {ci_number} 的词牌')
+        return [json.loads(zlib.decompress(data)) for data, _ in rows], [_mask(signature) for _, signature in rows]
+
+    def search(self, input_name: str, ci_pu: int) -> int | str:
+        """
+        与 CipaiNameIndex.exact 相同的精确查找：简繁体名优先，其次不分大小写、忽略空格的拼音；同名时排在索引前面的词牌优先。
+        Returns:
+            词牌的编号值，没有该词牌返回 'err1'，龙谱中没有该词牌返回 'err2'
+        """
+        row = self._query_one(
+            'SELECT cipai.idx, cipai.long_exist FROM cipai_name JOIN cipai USING (idx) '
+            'WHERE (kind = 0 AND name = ?) OR (kind = 1 AND name = ?) ORDER BY kind, seq LIMIT 1',
+            (input_name, input_name.strip().lower().replace(' ', '')))
+        if row is None:
+            return 'err1'
+        idx, long_exist = row
+        if ci_pu == 1 or long_exist:
+            return idx
+        return 'err2'
+
+    def cipai_numbers(self, ci_pu: int) -> list[int]:
+        """词谱中全部词牌的编号，按编号排序。"""
+        return [idx for idx, in self._query('SELECT DISTINCT idx FROM form WHERE ci_pu = ? ORDER BY idx',
+                                            (_ci_pu(ci_pu),))]
+
+    def cipai_by_length(self, length: int, ci_pu: int) -> list[str]:
+        """有某一格式字数为 length 的词牌编号，与 qin_num、long_num 同样按字符串排序。"""
+        rows = self._query('SELECT DISTINCT idx FROM form WHERE ci_pu = ? AND length = ?', (_ci_pu(ci_pu), length))
+        return sorted(str(idx) for idx, in rows)
+
+    def masks_by_length(self, length: int, ci_pu: int) -> list[tuple[str, int, int]]:
+        """
+        字数为 length 的全部格式的句读位集，只读索引，不解压格式内容。
+        Returns:
+            （词牌编号, 格式序号, 句读位集）列表，词牌按 cipai_by_length 的顺序，同一词牌内按格式序号
+        """
+        rows = self._query('SELECT idx, fmt, punctuation FROM form WHERE ci_pu = ? AND length = ?',
+                           (_ci_pu(ci_pu), length))
+        return sorted((str(idx), fmt, _mask(signature)) for idx, fmt, signature in rows)
+
+    def forms_by_rhyme_pos(self, rhyme_pos: list[int], ci_pu: int, length: int | None = None) -> list[tuple[int, int]]:
+        """韵脚位置完全相同的（词牌编号, 格式序号），给出 length 时只取该字数的格式。"""
+        sql = 'SELECT idx, fmt FROM form WHERE ci_pu = ? AND rhyme_pos = ?'
+        params = (_ci_pu(ci_pu), _signature(rhyme_pos))
+        if length is not None:
+            sql, params = sql + ' AND length = ?', params + (length,)
+        return self._query(sql + ' ORDER BY idx, fmt', params)
+
+    def forms_by_punctuation(self, positions: list[int], ci_pu: int,
+                             length: int | None = None) -> list[tuple[int, int]]:
+        """句读位置完全相同的（词牌编号, 格式序号），positions 为 punctuation_positions 的结果，给出 length 时只取该字数的格式。"""
+        sql = 'SELECT idx, fmt FROM form WHERE ci_pu = ? AND punctuation = ?'
+        params = (_ci_pu(ci_pu), _signature(sorted(set(positions))))
+        if length is not None:
+            sql, params = sql + ' AND length = ?', params + (length,)
+        return self._query(sql + ' ORDER BY idx, fmt', params)
+
+
+def load_cipai_db(path: str = CIPAI_DB) -> CipaiDB | None:
+    """
+    打开预编译词谱，同一路径只打开一次。
+    Args:
+        path: 词谱文件路径
+    Returns:
+        CipaiDB 对象，文件不存在或不可识别时返回 None，调用方应回退到 JSON 词谱目录
+    """
+    if path not in _loaded:
+        try:
+            _loaded[path] = CipaiDB(path)
+        except (OSError, ValueError, sqlite3.Error):
+            _loaded[path] = None
+    return _loaded[path]
+
+
+def _source_forms():
+    """按（词谱, 编号）遍历 JSON 词谱目录中的全部格式。"""
+    for ci_pu, base, last in ((1, CI_LIST, ''), (2, CI_LONG, '_long')):
+        names = [name for name in os.listdir(base) if name.startswith('cipai_') and name.endswith(f'{last}.json')]
+        for name in sorted(names, key=lambda n: int(n[len('cipai_'):-len(f'{last}.json')])):
+            with open(os.path.join(base, name), 'r', encoding='utf-8') as file:
+                yield ci_pu, int(name[len('cipai_'):-len(f'{last}.json')]), json.load(file)
+
+
+def build_cipai_db(path: str = CIPAI_DB) -> int:
+    """
+    将词牌索引与钦谱、龙谱的全部格式打包为 SQLite 文件，先写临时文件再替换，避免读到半个文件。
+    Args:
+        path: 输出文件路径
+    Returns:
+        写入的格式数
+    """
+    with open(CI_INDEX, 'r', encoding='utf-8') as f:
+        ci_idx = json.load(f)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    count = 0
+    try:
+        conn.executescript(_SCHEMA)
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (VERSION,))
+        seq = 0
+        for item in ci_idx:  # 与 CipaiNameIndex 的查找顺序一致
+            conn.execute('INSERT INTO cipai VALUES (?, ?)', (item['idx'], int(bool(item['long_exist']))))
+            for kind, names in ((0, item['names'] + item['names_trad']),
+                                (1, [pinyin.lower() for pinyin in item['pinyins'] + [item['full']]])):
+                for name in names:
+                    conn.execute('INSERT INTO cipai_name VALUES (?, ?, ?, ?)', (name, kind, item['idx'], seq))
+                    seq += 1
+        for ci_pu, idx, forms in _source_forms():
+            for fmt, form in enumerate(forms):
+                conn.execute('INSERT INTO form VALUES (?, ?, ?, ?, ?, ?, ?)', (
+                    ci_pu, idx, fmt, len(form['ge_lyu_str']), _signature(form['rhyme_pos']),
+                    _signature(punctuation_positions('　'.join(form['ci_sep']))),
+                    zlib.compress(json.dumps(form, ensure_ascii=False).encode('utf-8'), 9)))
+                count += 1
+        conn.commit()
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+    os.replace(tmp_path, path)
+    _loaded.pop(path, None)
+    return count
+
+
+def check_cipai_db(path: str = CIPAI_DB) -> list[str]:
+    """
+    核对预编译词谱与 JSON 词谱目录、词牌索引是否一致。
+    Args:
+        path: 词谱文件路径
+    Returns:
+        不一致的词牌（形如 钦谱 12）与词牌名列表，为空表示一致
+    """
+    db = CipaiDB(path)
+    mismatched = []
+    with open(CI_INDEX, 'r', encoding='utf-8') as f:
+        ci_idx = json.load(f)
+    expected = {}
+    for item in ci_idx:
+        for name in item['names'] + item['names_trad'] + [p.lower() for p in item['pinyins'] + [item['full']]]:
+            expected.setdefault(name, item['idx'] if item['long_exist'] else 'err2')
+    mismatched.extend(f'词牌名 {name}' for name, want in expected.items() if db.search(name, 2) != want)
+    seen = {1: set(), 2: set()}
+    for ci_pu, idx, forms in _source_forms():
+        seen[ci_pu].add(idx)
+        try:
+            if db.forms(idx, ci_pu) != forms:
+                mismatched.append(f"{'钦谱' if ci_pu == 1 else '龙谱'} {idx}")
+        except FileNotFoundError:
+            mismatched.append(f"{'钦谱' if ci_pu == 1 else '龙谱'} {idx}")
+    for ci_pu in (1, 2):
+        extra = set(db.cipai_numbers(ci_pu)) - seen[ci_pu]
+        mismatched.extend(f"{'钦谱' if ci_pu == 1 else '龙谱'} {idx}" for idx in sorted(extra))
+    return mismatched
+
+
+def source_length_index() -> dict[int, dict[int, list[str]]]:
+    """
+    从 JSON 词谱目录中各格式 ge_lyu_str 的实际字数生成字数索引。
+    Returns:
+        {词谱: {字数: 按字符串排序的词牌编号列表}}，1 钦谱 2 龙谱
+    """
+    index = {1: {}, 2: {}}
+    for ci_pu, idx, forms in _source_forms():
+        for form in forms:
+            index[ci_pu].setdefault(len(form['ge_lyu_str']), set()).add(str(idx))
+    return {ci_pu: {length: sorted(ids) for length, ids in sorted(table.items())} for ci_pu, table in index.items()}
+
+
+def _format_table(name: str, table: dict[int, list[str]]) -> str:
+    indent = ' ' * (len(name) + 4)
+    lines = [f'{length}: {ids!r},' for length, ids in table.items()]
+    return f'{name} = {{' + f'\n{indent}'.join(lines).rstrip(',') + '}\n'
+
+
+def write_length_index(path: str = WORD_COUNTS) -> int:
+    """
+    生成 cipai_word_counts.py（qin_num、long_num），词谱目录改动后重新生成，不要手改。
+    Args:
+        path: 输出文件路径
+    Returns:
+        两个词谱合计的字数条目数
+    """
+    index = source_length_index()
+    content = ('"""字数到候选词牌编号的索引，由 scripts/build_cipai_db.py 从 ci_list、ci_long 生成，请勿手改。"""\n\n'
+               + '\n'.join(_format_table(LENGTH_TABLES[ci_pu], index[ci_pu]) for ci_pu in (1, 2)))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as handle:
+        handle.write(content)
+    os.replace(tmp_path, path)
+    return sum(len(table) for table in index.values())
+
+
+def _read_length_tables(path: str) -> tuple[dict[str, dict], list[str]]:
+    """不导入模块，按语法树读出字数索引，同时找出字典字面量中重复的键（重复时后者会静默覆盖前者）。"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        tree = ast.parse(handle.read(), path)
+    tables = {}
+    problems = []
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict) and len(node.targets) == 1:
+            name = getattr(node.targets[0], 'id', None)
+            if name not in LENGTH_TABLES.values():
+                continue
+            keys = [ast.literal_eval(key) for key in node.value.keys]
+            problems.extend(f'{name} 重复的字数 {key}' for key in sorted({k for k in keys if keys.count(k) > 1}))
+            tables[name] = ast.literal_eval(node.value)
+    return tables, problems
+
+
+def check_length_index(path: str = WORD_COUNTS, db_path: str | None = CIPAI_DB) -> list[str]:
+    """
+    核对字数索引（cipai_word_counts.py 与预编译词谱）与词谱目录中各格式的实际字数是否一致。
+    Args:
+        path: cipai_word_counts.py 路径
+        db_path: 预编译词谱路径，None 表示不核对
+    Returns:
+        不一致之处的说明列表，为空表示一致
+    """
+    index = source_length_index()
+    tables, problems = _read_length_tables(path)
+    db = CipaiDB(db_path) if db_path else None
+    for ci_pu, name in LENGTH_TABLES.items():
+        table = tables.get(name, {})
+        for length in sorted(set(index[ci_pu]) | set(table)):
+            want = index[ci_pu].get(length, [])
+            if table.get(length, []) != want:
+                problems.append(f'{name} {length} 字')
+            if db is not None and db.cipai_by_length(length, ci_pu) != want:
+                problems.append(f'{os.path.basename(db_path)} {name} {length} 字')
+    return problems
@@ -1,170 +1,193 @@
-qin_num = {28: ['0', '28', '32', '33', '34', '35', '36', '37', '38', '39', '40', '41', '7'], 14: ['0'], 16: ['1'],
-           52: ['10', '176', '186', '189', '192', '193', '196', '211', '213', '214', '219', '220', '221', '222',
-                '223', '224', '225', '226', '227', '228', '229', '230', '231', '232', '233', '234', '235', '236',
-                '237', '238', '239', '247', '262'],
-           53: ['10', '211', '214', '219', '235', '240', '241', '242', '243', '244', '245', '247', '260', '261'],
-           54: ['10', '106', '149', '165', '192', '196', '214', '23', '246', '247', '248', '249', '250', '251',
-                '252', '253', '254', '255', '256', '257', '258', '260', '262', '267', '28', '280', '285', '52'],
-           23: ['10', '11'], 26: ['10', '11', '19', '20', '21'],
-           42: ['100', '101', '103', '78', '79', '81', '86', '88', '89', '92', '93', '94', '95', '96', '97', '98',
-                '99'],
-           44: ['100', '101', '102', '105', '106', '107', '108', '109', '110', '111', '129', '79', '83', '96'],
-           43: ['102', '103', '104', '78', '79', '91', '92', '93'],
-           48: ['106', '111', '134', '135', '139', '142', '145', '149', '150', '151', '152', '153', '154', '155',
-                '156', '157', '158', '159', '160', '161', '162', '163', '164', '165', '166', '167', '168', '169',
-                '170', '171', '172', '186', '327', '78'],
-           46: ['107', '110', '111', '113', '126', '127', '128', '129', '130', '131', '132', '133', '134', '135',
-                '136', '137', '138', '145', '164', '327', '74', '96'],
-           45: ['108', '110', '111', '112', '113', '114', '115', '116', '117', '118', '119', '120', '121', '122',
-                '123', '124', '125', '128', '74', '79'],
-           50: ['11', '111', '139', '142', '153', '156', '157', '174', '181', '183', '184', '185', '186', '187',
-                '188', '189', '190', '191', '192', '193', '194', '195', '196', '197', '198', '199', '200', '201',
-                '202', '203', '204', '205', '206', '207', '208', '209', '213', '22', '244', '90', '99'],
-           47: ['111', '133', '134', '138', '139', '140', '141', '142', '143', '144', '145', '146', '147', '148',
-                '153'],
-           49: ['111', '128', '135', '142', '145', '151', '154', '158', '165', '166', '173', '174', '175', '176',
-                '177', '178', '179', '180', '181', '182', '183', '184', '186', '99'],
+"""字数到候选词牌编号的索引，由 scripts/build_cipai_db.py 从 ci_list、ci_long 生成，请勿手改。"""
+
+qin_num = {14: ['0'],
+           16: ['1'],
+           18: ['2', '3'],
+           20: ['4', '5', '6', '7'],
+           22: ['8', '9'],
+           23: ['10', '11'],
            24: ['12', '13', '14', '15', '16', '17', '18'],
-           62: ['121', '246', '316', '321', '324', '325', '326', '327', '328', '329', '330', '331'],
-           40: ['127', '48', '76', '78', '79', '80', '81', '82', '83', '84', '85'],
-           38: ['127', '29', '73', '74', '75'], 37: ['127', '21', '58', '65', '70'],
-           104: ['128', '193', '361', '425', '658', '664', '668', '677', '682', '694', '695', '696', '697', '698',
-                 '699', '700', '701', '702', '703', '704', '705', '706', '707', '708', '709', '710', '711', '712',
-                 '713', '714', '715', '716', '717', '718', '719', '720', '724', '728'],
-           102: ['138', '373', '425', '567', '614', '634', '650', '655', '656', '657', '658', '659', '660', '661',
-                 '662', '663', '664', '665', '666', '667', '668', '669', '670', '671', '672', '673', '674', '675',
-                 '690', '701', '706', '707', '718', '727'],
-           103: ['138', '361', '634', '639', '648', '650', '655', '664', '667', '668', '675', '676', '677', '678',
-                 '679', '680', '681', '682', '683', '684', '685', '686', '687', '688', '689', '690', '691', '692',
-                 '693', '698', '703', '707', '716', '719', '731'],
-           105: ['138', '612', '681', '698', '708', '721', '722', '723', '724', '725', '726', '727', '728', '729',
-                 '730', '731', '732', '733', '734', '744', '748'],
-           97: ['152', '282', '494', '516', '528', '531', '532', '543', '544', '545', '546', '547', '548', '549',
-                '550', '551', '552', '553', '554', '555', '556', '557', '558', '559', '560', '561', '562', '563',
-                '566', '568', '576', '590', '593'],
-           96: ['157', '501', '516', '518', '526', '527', '528', '529', '530', '531', '532', '533', '534', '535',
-                '536', '537', '538', '539', '540', '541', '542', '543', '546', '566', '590'],
-           58: ['166', '246', '253', '266', '271', '275', '28', '294', '295', '296', '297', '298', '299', '301',
-                '312', '313', '315', '323'],
-           59: ['166', '23', '246', '260', '300', '301', '302', '303', '313', '323'],
-           57: ['173', '260', '265', '274', '275', '288', '289', '290', '291', '292', '293', '294', '301'],
            25: ['18', '22'],
-           94: ['184', '491', '494', '495', '500', '501', '502', '503', '504', '505', '506', '507', '508', '509',
-                '510', '511', '512', '513', '516', '517', '531', '541', '564', '687'],
-           98: ['184', '347', '502', '539', '543', '552', '564', '565', '566', '567', '568', '569', '570', '571',
-                '572', '573', '574', '575', '576', '577', '578', '579', '580', '581', '582', '583', '584', '585',
-                '586', '587', '590', '596', '602', '615', '621', '627', '638', '640', '86'],
-           51: ['185', '186', '188', '190', '210', '211', '212', '213', '214', '215', '216', '217', '218', '219',
-                '228', '260'],
-           56: ['190', '196', '214', '246', '250', '252', '259', '266', '271', '272', '273', '274', '275', '276',
-                '277', '278', '279', '28', '280', '281', '282', '283', '284', '285', '286', '287', '301', '315'],
-           55: ['193', '214', '228', '247', '250', '252', '259', '260', '261', '262', '263', '264', '265', '266',
-                '267', '268', '269', '270', '285', '301'],
-           70: ['195', '214', '365', '366', '367', '368', '65', '73'],
-           71: ['195', '369', '370', '371', '372', '373', '374', '375', '376'], 18: ['2', '3'],
-           100: ['209', '229', '244', '502', '547', '566', '567', '593', '594', '596', '611', '612', '613', '614',
-                 '615', '616', '617', '618', '619', '620', '621', '622', '623', '624', '625', '626', '627', '628',
-                 '629', '630', '631', '632', '634', '636', '637', '667', '680', '698', '708', '776'],
-           32: ['21', '32', '53', '54', '55', '56'], 33: ['21', '42', '48', '56', '57', '58', '59', '68'],
+           26: ['10', '11', '19', '20', '21'],
            27: ['21', '22', '23', '24', '25', '26', '27', '28', '29', '30', '31', '32'],
+           28: ['0', '28', '32', '33', '34', '35', '36', '37', '38', '39', '40', '41', '7'],
+           29: ['42', '43', '44', '45'],
+           30: ['28', '44', '45', '46', '47', '48', '49'],
+           31: ['45', '50', '51', '52', '53'],
+           32: ['21', '32', '53', '54', '55', '56'],
+           33: ['21', '42', '48', '56', '57', '58', '59', '68'],
+           34: ['53', '60', '61', '62', '63', '68'],
+           35: ['59', '64', '65', '66'],
+           36: ['65', '67', '68', '69', '70', '71', '72'],
+           37: ['127', '21', '58', '65', '70'],
+           38: ['127', '29', '73', '74', '75'],
+           39: ['75', '76', '77', '85'],
+           40: ['127', '48', '76', '78', '79', '80', '81', '82', '83', '84', '85'],
+           41: ['127', '58', '64', '75', '78', '79', '81', '86', '87', '88', '89', '90', '91'],
+           42: ['100', '101', '103', '78', '79', '81', '86', '88', '89', '92', '93', '94', '95', '96', '97', '98', '99'],
+           43: ['102', '103', '104', '78', '79', '91', '92', '93'],
+           44: ['100', '101', '102', '105', '106', '107', '108', '109', '110', '111', '129', '79', '83', '96'],
+           45: ['108', '110', '111', '112', '113', '114', '115', '116', '117', '118', '119', '120', '121', '122', '123', '124', '125', '128', '74', '79'],
+           46: ['107', '110', '111', '113', '126', '127', '128', '129', '130', '131', '132', '133', '134', '135', '136', '137', '138', '145', '164', '327', '74', '96'],
+           47: ['111', '133', '134', '138', '139', '140', '141', '142', '143', '144', '145', '146', '147', '148', '153'],
+           48: ['106', '111', '134', '135', '139', '142', '145', '149', '150', '151', '152', '153', '154', '155', '156', '157', '158', '159', '160', '161', '162', '163', '164', '165', '166', '167', '168', '169', '170', '171', '172', '186', '327', '78'],
+           49: ['111', '128', '135', '142', '145', '151', '154', '158', '165', '166', '173', '174', '175', '176', '177', '178', '179', '180', '181', '182', '183', '184', '186', '99'],
+           50: ['11', '111', '139', '142', '153', '156', '157', '174', '181', '183', '184', '185', '186', '187', '188', '189', '190', '191', '192', '193', '194', '195', '196', '197', '198', '199', '200', '201', '202', '203', '204', '205', '206', '207', '208', '209', '213', '22', '244', '90', '99'],
+           51: ['185', '186', '188', '190', '210', '211', '212', '213', '214', '215', '216', '217', '218', '219', '228', '260'],
+           52: ['10', '176', '186', '189', '192', '193', '196', '211', '213', '214', '219', '220', '221', '222', '223', '224', '225', '226', '227', '228', '229', '230', '231', '232', '233', '234', '235', '236', '237', '238', '239', '247', '262'],
+           53: ['10', '211', '214', '219', '235', '240', '241', '242', '243', '244', '245', '247', '260', '261'],
+           54: ['10', '106', '149', '165', '192', '196', '214', '23', '246', '247', '248', '249', '250', '251', '252', '253', '254', '255', '256', '257', '258', '260', '262', '267', '28', '280', '285', '52'],
+           55: ['193', '214', '228', '247', '250', '252', '259', '260', '261', '262', '263', '264', '265', '266', '267', '268', '269', '270', '285', '301'],
+           56: ['190', '196', '214', '246', '250', '252', '259', '266', '271', '272', '273', '274', '275', '276', '277', '278', '279', '28', '280', '281', '282', '283', '284', '285', '286', '287', '301', '315'],
+           57: ['173', '260', '265', '274', '275', '288', '289', '290', '291', '292', '293', '294', '301'],
+           58: ['166', '246', '253', '266', '271', '275', '28', '294', '295', '296', '297', '298', '299', '301', '312', '313', '315', '323'],
+           59: ['166', '23', '246', '260', '300', '301', '302', '303', '313', '323'],
+           60: ['228', '246', '253', '260', '261', '294', '296', '304', '305', '306', '307', '308', '309', '310', '311', '312', '313', '314', '315', '316', '317', '318', '319', '325', '55'],
            61: ['214', '260', '316', '320', '321', '322', '323'],
+           62: ['121', '246', '316', '321', '324', '325', '326', '327', '328', '329', '330', '331'],
+           63: ['228', '244', '274', '325', '332', '333'],
            64: ['228', '272', '295', '334', '335', '336', '337', '338', '339', '340', '348', '352', '362'],
            65: ['228', '339', '341', '342', '343', '344', '350', '356'],
-           66: ['228', '295', '328', '345', '346', '347', '348', '349', '350', '351', '352', '353', '354', '355',
-                '356', '362', '57'],
-           60: ['228', '246', '253', '260', '261', '294', '296', '304', '305', '306', '307', '308', '309', '310',
-                '311', '312', '313', '314', '315', '316', '317', '318', '319', '325', '55'],
-           63: ['228', '244', '274', '325', '332', '333'], 125: ['229', '789', '790', '791', '794'],
-           106: ['261', '425', '607', '658', '685', '699', '718', '724', '735', '736', '737', '738', '739', '740',
-                 '741', '744', '745', '746', '756', '84'],
-           107: ['261', '699', '742', '743', '744', '745', '746', '747', '752', '755', '769', '87'],
-           78: ['261', '392', '406', '414', '415', '416', '422', '430'],
-           89: ['265', '469', '471', '472', '473', '474', '475', '476', '478', '479', '494'],
-           87: ['265', '438', '444', '446', '465', '466', '467', '485'],
-           88: ['272', '275', '444', '446', '452', '466', '468', '469', '470', '471', '476'],
-           86: ['272', '444', '446', '452', '461', '462', '463', '464'],
-           30: ['28', '44', '45', '46', '47', '48', '49'],
-           93: ['282', '446', '473', '494', '495', '496', '497', '498', '499', '501', '507', '515', '518'],
-           114: ['290', '769', '774', '775', '776', '777', '778', '781', '87'],
-           117: ['300', '772', '781', '782', '783'], 69: ['335', '348', '355'],
-           67: ['345', '351', '355', '356', '357', '358', '359', '360', '361'],
+           66: ['228', '295', '328', '345', '346', '347', '348', '349', '350', '351', '352', '353', '354', '355', '356', '362', '57'],
+           67: ['345', '351', '355', '356', '357', '358', '359', '360', '361', '362'],
            68: ['348', '355', '356', '360', '361', '362', '363', '364', '60'],
-           101: ['361', '567', '594', '605', '612', '613', '614', '615', '618', '633', '634', '635', '636', '637',
-                 '638', '639', '640', '641', '642', '643', '644', '645', '646', '647', '648', '649', '650', '651',
-                 '652', '653', '654', '658', '662', '665', '667', '675', '690', '706', '708'],
-           72: ['363', '365', '366', '372', '373', '375', '377', '378', '379', '380', '381', '382', '389', '413',
-                '73'], 91: ['366', '469', '476', '481', '482', '483', '484', '485', '494', '794'],
+           69: ['335', '348', '355'],
+           70: ['195', '214', '365', '366', '367', '368', '65', '73'],
+           71: ['195', '369', '370', '371', '372', '373', '374', '375', '376'],
+           72: ['363', '365', '366', '372', '373', '375', '377', '378', '379', '380', '381', '382', '389', '413', '73'],
            73: ['370', '379', '383', '384', '385', '389', '390', '404', '70'],
-           79: ['371', '417', '418', '419', '420', '421', '422'],
-           80: ['373', '406', '423', '424', '425', '426', '430'],
-           76: ['378', '379', '389', '392', '397', '404', '405', '406', '407', '408', '412'],
            74: ['386', '387', '388', '389', '390', '391', '392', '70'],
            75: ['387', '392', '393', '394', '395', '396', '397', '398', '399', '400', '401', '402', '403', '404'],
-           77: ['399', '400', '406', '409', '410', '411', '412', '413'], 20: ['4', '5', '6', '7'],
-           81: ['406', '422', '427', '428', '429', '430', '431', '432', '433', '444'], 29: ['42', '43', '44', '45'],
+           76: ['378', '379', '389', '392', '397', '404', '405', '406', '407', '408', '412'],
+           77: ['399', '400', '406', '409', '410', '411', '412', '413'],
+           78: ['261', '392', '406', '414', '415', '416', '422', '430'],
+           79: ['371', '417', '418', '419', '420', '421', '422'],
+           80: ['373', '406', '423', '424', '425', '426', '430'],
+           81: ['406', '422', '427', '428', '429', '430', '431', '432', '433', '444'],
            82: ['427', '430', '434', '435', '436', '437', '438', '439', '440', '441', '446', '456', '73'],
            83: ['430', '434', '437', '442', '443', '444', '445', '446', '447', '448', '449', '450', '455', '459'],
-           85: ['430', '438', '446', '451', '456', '460', '466'],
            84: ['438', '446', '449', '450', '451', '452', '453', '454', '455', '456', '457', '458', '459', '88'],
-           113: ['442', '769', '773', '775', '780', '782', '815', '87'], 122: ['443'],
-           90: ['444', '476', '477', '478', '479', '480', '501', '667'], 118: ['446', '633', '778'],
-           123: ['446', '788'], 124: ['446'], 126: ['446', '792'], 31: ['45', '50', '51', '52', '53'],
-           112: ['465', '759', '770', '772', '775', '87'],
+           85: ['430', '438', '446', '451', '456', '460', '466'],
+           86: ['272', '444', '446', '452', '461', '462', '463', '464'],
+           87: ['265', '438', '444', '446', '465', '466', '467', '485'],
+           88: ['272', '275', '444', '446', '452', '466', '468', '469', '470', '471', '476'],
+           89: ['265', '469', '471', '472', '473', '474', '475', '476', '478', '479', '494'],
+           90: ['444', '476', '477', '478', '479', '480', '501', '667'],
+           91: ['366', '469', '476', '481', '482', '483', '484', '485', '494', '794'],
            92: ['468', '474', '485', '486', '487', '488', '489', '490', '491', '492', '493', '494', '497'],
-           187: ['48'],
-           99: ['502', '547', '566', '570', '586', '588', '589', '590', '591', '592', '593', '594', '595', '596',
-                '597', '598', '599', '600', '601', '602', '603', '604', '605', '606', '607', '608', '609', '610',
-                '612', '638', '662', '86'],
-           95: ['502', '514', '515', '516', '517', '518', '519', '520', '521', '522', '523', '524', '525', '528',
-                '529', '539', '543', '546', '590'], 34: ['53', '60', '61', '62', '63', '68'],
-           41: ['58', '64', '75', '78', '79', '81', '86', '87', '88', '89', '90', '91'],
-           35: ['59', '64', '65', '66'],
+           93: ['282', '446', '473', '494', '495', '496', '497', '498', '499', '501', '507', '515', '518'],
+           94: ['184', '491', '494', '495', '500', '501', '502', '503', '504', '505', '506', '507', '508', '509', '510', '511', '512', '513', '516', '517', '531', '541', '564', '687'],
+           95: ['502', '514', '515', '516', '517', '518', '519', '520', '521', '522', '523', '524', '525', '528', '529', '539', '543', '546', '590'],
+           96: ['157', '501', '516', '518', '526', '527', '528', '529', '530', '531', '532', '533', '534', '535', '536', '537', '538', '539', '540', '541', '542', '543', '546', '566', '590'],
+           97: ['152', '282', '494', '516', '528', '531', '532', '543', '544', '545', '546', '547', '548', '549', '550', '551', '552', '553', '554', '555', '556', '557', '558', '559', '560', '561', '562', '563', '566', '568', '576', '590', '593'],
+           98: ['184', '347', '502', '539', '543', '552', '564', '565', '566', '567', '568', '569', '570', '571', '572', '573', '574', '575', '576', '577', '578', '579', '580', '581', '582', '583', '584', '585', '586', '587', '590', '596', '602', '615', '621', '627', '638', '640', '86'],
+           99: ['502', '547', '566', '570', '586', '588', '589', '590', '591', '592', '593', '594', '595', '596', '597', '598', '599', '600', '601', '602', '603', '604', '605', '606', '607', '608', '609', '610', '612', '638', '662', '86'],
+           100: ['209', '229', '244', '502', '547', '566', '567', '593', '594', '596', '611', '612', '613', '614', '615', '616', '617', '618', '619', '620', '621', '622', '623', '624', '625', '626', '627', '628', '629', '630', '631', '632', '634', '636', '637', '667', '680', '698', '708', '776'],
+           101: ['361', '567', '594', '605', '612', '613', '614', '615', '618', '633', '634', '635', '636', '637', '638', '639', '640', '641', '642', '643', '644', '645', '646', '647', '648', '649', '650', '651', '652', '653', '654', '658', '662', '665', '667', '675', '690', '706', '708'],
+           102: ['138', '373', '425', '567', '614', '634', '650', '655', '656', '657', '658', '659', '660', '661', '662', '663', '664', '665', '666', '667', '668', '669', '670', '671', '672', '673', '674', '675', '690', '701', '706', '707', '718', '727'],
+           103: ['138', '361', '634', '639', '648', '650', '655', '664', '667', '668', '675', '676', '677', '678', '679', '680', '681', '682', '683', '684', '685', '686', '687', '688', '689', '690', '691', '692', '693', '698', '703', '707', '716', '719', '731'],
+           104: ['128', '193', '361', '425', '658', '664', '668', '677', '682', '694', '695', '696', '697', '698', '699', '700', '701', '702', '703', '704', '705', '706', '707', '708', '709', '710', '711', '712', '713', '714', '715', '716', '717', '718', '719', '720', '724', '728'],
+           105: ['138', '612', '681', '698', '708', '721', '722', '723', '724', '725', '726', '727', '728', '729', '730', '731', '732', '733', '734', '744', '748'],
+           106: ['261', '425', '607', '658', '685', '699', '718', '724', '735', '736', '737', '738', '739', '740', '741', '744', '745', '746', '756', '84'],
+           107: ['261', '699', '742', '743', '744', '745', '746', '747', '752', '755', '769', '87'],
            108: ['61', '699', '741', '748', '749', '750', '751', '752', '753', '754', '755', '756', '757', '766'],
            109: ['61', '681', '758', '759', '760', '761', '762', '763', '769', '770'],
            110: ['61', '749', '761', '764', '765', '766', '767', '768', '770', '87'],
-           111: ['61', '728', '768', '769', '770', '771', '87'], 36: ['65', '67', '68', '69', '70', '71', '72'],
-           135: ['655'], 136: ['655', '799'], 137: ['655', '800'], 116: ['699', '775', '781', '782'],
-           39: ['75', '76', '77', '85'], 140: ['774', '800', '802'], 115: ['775', '779', '780', '782'],
-           120: ['778', '785'], 119: ['784'], 121: ['786', '787', '791'], 129: ['793'], 130: ['794', '795'],
-           141: ['794', '803', '804'], 131: ['795'], 133: ['796', '797', '798', '804', '816'], 132: ['797', '798'],
-           22: ['8', '9'], 139: ['800', '801'], 144: ['804', '805'], 143: ['804'], 145: ['805'], 155: ['806'],
-           157: ['806'], 158: ['806'], 159: ['807'], 160: ['808', '811'], 169: ['809'], 171: ['810'], 200: ['811'],
-           202: ['811'], 203: ['811'], 204: ['811'], 210: ['812'], 212: ['812'], 213: ['812'], 215: ['813'],
-           240: ['814'], 236: ['814']}
+           111: ['61', '728', '768', '769', '770', '771', '87'],
+           112: ['465', '759', '770', '772', '775', '87'],
+           113: ['442', '769', '773', '775', '780', '782', '815', '87'],
+           114: ['290', '769', '774', '775', '776', '777', '778', '781', '87'],
+           115: ['775', '779', '780', '782'],
+           116: ['699', '775', '781', '782'],
+           117: ['300', '772', '781', '782', '783'],
+           118: ['446', '633', '778'],
+           119: ['784'],
+           120: ['778', '785'],
+           121: ['786', '787', '791'],
+           122: ['443'],
+           123: ['446', '788'],
+           124: ['446'],
+           125: ['229', '789', '790', '791', '794'],
+           126: ['446', '792'],
+           129: ['793'],
+           130: ['794', '795'],
+           131: ['795'],
+           132: ['797', '798'],
+           133: ['796', '797', '798', '804', '816'],
+           135: ['655'],
+           136: ['655', '799'],
+           137: ['655', '800'],
+           139: ['800', '801'],
+           140: ['774', '800', '802'],
+           141: ['794', '803', '804'],
+           143: ['804'],
+           144: ['804', '805'],
+           145: ['805'],
+           155: ['806'],
+           157: ['806'],
+           158: ['806'],
+           159: ['807'],
+           160: ['808', '811'],
+           169: ['809'],
+           171: ['810'],
+           187: ['48'],
+           200: ['811'],
+           202: ['811'],
+           203: ['811'],
+           204: ['811'],
+           210: ['812'],
+           212: ['812'],
+           213: ['812'],
+           215: ['813'],
+           236: ['814'],
+           240: ['814']}
 
-long_num = {43: ['102', '104'],
-            44: ['105', '106', '109', '110', '129'],
-            48: ['106', '149', '150', '158', '161', '162'],
+long_num = {16: ['1'],
+            23: ['11'],
             26: ['10'],
-            52: ['10', '225', '226'],
+            27: ['22', '23', '24', '28', '29'],
+            28: ['23', '28', '36'],
+            30: ['28', '47'],
+            31: ['50', '52'],
+            32: ['54'],
+            33: ['57', '58'],
+            34: ['60', '62'],
+            35: ['64', '65'],
+            36: ['65', '67', '69'],
+            38: ['54', '74', '75'],
+            40: ['81', '85'],
+            41: ['79', '86', '90', '91'],
+            42: ['96'],
+            43: ['102', '104'],
+            44: ['105', '106', '109', '110', '129'],
             45: ['110', '113', '116'],
-            23: ['11'],
-            50: ['11', '157', '186', '187', '190'],
             46: ['126', '127', '128', '133'],
-            47: ['138', '141', '145'],
-            49: ['151', '175', '181', '183'],
-            96: ['157', '528', '529', '531', '533'],
+            47: ['133', '138', '141', '145'],
+            48: ['106', '149', '150', '158', '161', '162'],
+            49: ['145', '151', '175', '181', '183'],
+            50: ['11', '157', '186', '187', '190'],
             51: ['186'],
-            16: ['1'],
-            27: ['22', '23', '24', '28', '29'],
+            52: ['10', '225', '226'],
             54: ['23', '247', '260'],
-            58: ['246', '271', '294', '295'],
-            60: ['246', '253', '304', '313', '316'],
             55: ['260', '262', '268'],
-            106: ['261', '738'],
             56: ['262', '271', '275', '28'],
             57: ['289'],
-            30: ['28', '47'],
-            66: ['295', '345', '348', '349', '350'],
+            58: ['246', '271', '294', '295'],
+            60: ['246', '253', '304', '313', '316'],
+            61: ['316'],
             62: ['325', '326', '328', '329'],
             65: ['341', '343'],
+            66: ['295', '345', '348', '349', '350'],
             67: ['355'],
-            28: ['36'],
+            68: ['60'],
+            69: ['348'],
+            70: ['65'],
             71: ['372'],
             72: ['381', '413'],
             76: ['389'],
-            78: ['406'],
             77: ['410'],
+            78: ['406'],
+            80: ['406'],
             81: ['422', '430'],
             82: ['437', '438'],
             83: ['446'],
@@ -174,32 +197,24 @@ long_num = {43: ['102', '104'],
             92: ['485'],
             93: ['494', '499'],
             94: ['494', '504'],
-            31: ['50', '52'],
             95: ['516', '518', '546'],
+            96: ['157', '528', '529', '531', '533'],
             97: ['543', '545', '553', '562', '590'],
-            32: ['54'],
-            38: ['54', '74', '75'],
             98: ['578', '580'],
-            33: ['57', '58'],
             99: ['598', '612', '86'],
-            34: ['60', '62'],
-            68: ['60'],
             100: ['614', '616', '617', '621', '625'],
             101: ['634', '637', '638', '649', '650', '652'],
-            35: ['64', '65'],
             102: ['658', '660', '662', '664', '667', '668'],
-            36: ['65', '67', '69'],
-            70: ['65'],
             103: ['664', '667', '678', '688'],
             104: ['697', '698', '706'],
             105: ['722', '728', '730'],
+            106: ['261', '738'],
             107: ['742'],
             110: ['765'],
             114: ['775'],
             116: ['781', '782'],
             130: ['795'],
             133: ['798'],
-            41: ['79', '86', '90', '91'],
             139: ['800'],
             140: ['802'],
             143: ['804'],
@@ -207,6 +222,4 @@ long_num = {43: ['102', '104'],
             157: ['806'],
             203: ['811'],
             212: ['812'],
-            240: ['814'],
-            40: ['81', '85'],
-            42: ['96']}
+            240: ['814']}
@@ -1,12 +1,9 @@
 """一些都会用到的通用模块。"""
 
-import re
-
 import yun.rhythm.new_rhythm as nw
+from yun.hanzi.rhyme_db import load_rhyme_db, source_pingze_tables
 from yun.rhythm.pingshui_rhythm import hanzi_rhythm
 
-cn_nums = {'一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9, '十': 10}
-
 
 def show_all_rhythm(single_hanzi: str, is_trad: bool) -> str | None:
     """
@@ -52,75 +49,58 @@ def hanzi_to_yun(hanzi: str, yun_shu: int, is_trad: bool, ci_lin: bool = False)
             return hanzi_rhythm(hanzi, is_trad, ci_lin=True)
         return hanzi_rhythm(hanzi, is_trad)
     elif yun_shu == 2:
-        return nw.convert_yun(nw.get_new_yun(hanzi), nw.xin_yun)
-    return nw.convert_yun(nw.get_new_yun(hanzi), nw.tong_yun)
+        return list(nw.hanzi_categories(hanzi, nw.xin_yun))
+    return list(nw.hanzi_categories(hanzi, nw.tong_yun))
 
 
-def hanzi_to_pingze(hanzi: str, yun_shu: int, is_trad: bool) -> str:
+_pingze_tables: dict[int, bytes | memoryview] = {}
+
+
+def pingze_table(yun_shu: int) -> bytes | memoryview:
     """
-    给定汉字，返回对应韵书的平仄。多音字 0 平 1 仄 2 生僻字 3
+    返回按码位索引的平仄表，每个码位一个 ASCII 平仄代码。优先取预编译韵表中的表，缺失时由 Python 韵表生成一次。
     Args:
-        hanzi: 给定的汉字
-        yun_shu: 使用的韵书代号
-        is_trad: 簡體 or 繁體
+        yun_shu: 使用的韵书代号，新韵与通韵平仄相同，共用一张表
     Returns:
-        平仄代码
+        平仄表
     """
-    if yun_shu == 1:
-        return hanzi_rhythm(hanzi, is_trad, only_ping_ze=True)
-    return nw.new_ping_ze(nw.get_new_yun(hanzi))
+    key = 1 if yun_shu == 1 else 2
+    if key not in _pingze_tables:
+        rhyme_db = load_rhyme_db()
+        if rhyme_db is not None:
+            _pingze_tables[1], _pingze_tables[2] = rhyme_db.pingze_table(1), rhyme_db.pingze_table(2)
+        else:
+            _pingze_tables[1], _pingze_tables[2] = map(bytes, source_pingze_tables())
+    return _pingze_tables[key]
 
 
-def result_check(post_result: str, temp_result: str) -> str:
+def pingze_string(text: str, yun_shu: int) -> str:
     """
-    如果一首诗、词可能对应多个结构，需要排查整体的结果，根据平仄和押韵符合字数的多少，是否押更多的韵数，是否有更少的韵种类，确定一个最接近的。
+    一次得到整句的平仄代码串，与逐字调用 hanzi_to_pingze 的结果相同。
     Args:
-        post_result: 上一个校验的结果
-        temp_result: 目前校验的结果
+        text: 一句或多句诗词，不含标点
+        yun_shu: 使用的韵书代号
     Returns:
-        两者中更匹配的结果
+        平仄代码串，多音字 0 平 1 仄 2 生僻字 3
     """
-    if post_result == '':
-        return temp_result
-    post_count, post_yayun_count, post_yayun_type = count_poem_para(post_result)
-    temp_count, temp_yayun_count, temp_yayun_type = count_poem_para(temp_result)
-    if temp_count > post_count:
-        return temp_result
-    if temp_count == post_count:
-        if post_yayun_count > temp_yayun_count:
-            return post_result
-        if post_yayun_count == temp_yayun_count:
-            if temp_yayun_type > post_yayun_type:
-                return post_result
-            return temp_result
-        return temp_result
-    return post_result
+    table = pingze_table(yun_shu)
+    if not text or ord(max(text)) < len(table):
+        return text.translate(table)
+    return ''.join(chr(table[ord(ch)]) if ord(ch) < len(table) else '3' for ch in text)
 
 
-def count_poem_para(string: str) -> tuple[int, int, int]:
+def hanzi_to_pingze(hanzi: str, yun_shu: int, is_trad: bool) -> str:
     """
-    对一个校验结果的字符串，检测其总正确平仄数、押韵数、韵种类
+    给定汉字，返回对应韵书的平仄。多音字 0 平 1 仄 2 生僻字 3
     Args:
-        string: 验结果的字符串
+        hanzi: 给定的汉字
+        yun_shu: 使用的韵书代号
+        is_trad: 簡體 or 繁體
     Returns:
-        返回三个值：
-            总正确平仄数
-            押韵数
-            韵种类
+        平仄代码
     """
-    matches = re.findall(r'第([一二三四五六七八九十])组韵', string)
-    if matches:
-        yun_nums = [cn_nums[cn_num] for cn_num in matches]
-        yun_types = max(yun_nums)
-    else:
-        yun_types = 1
-    total_count = yayun_count = 0
-    lines = string.split('\n')
-    for line in lines:
-        if '□' in line or '■' in line or '〇' in line:
-            total_count += line.count('〇') + line.count('◎') + line.count('□')
-        if '不押韵' in line:
-            total_count -= 1
-        if '押韵' in line:
-            yayun_count += 1
-    return total_count, yayun_count, yun_types
+    if len(hanzi) == 1:
+        return pingze_string(hanzi, yun_shu)
+    if yun_shu == 1:
+        return hanzi_rhythm(hanzi, is_trad, only_ping_ze=True)
+    return nw.new_ping_ze(nw.get_new_yun(hanzi))
@@ -0,0 +1,124 @@
+"""
+校验结果的结构化表示。
+诗、词校验先得到逐行的格律、平仄标记与韵脚，候选结果之间按数值比较，只把最终胜出的结果渲染为文本或 JSON。
+"""
+
+RIGHT_MARKS = '〇◎□'
+SCORED_LINE_MARKS = '□■〇'
+
+
+class RhymeInfo:
+    def __init__(self, hanzi: str, info: str, rhymed: bool | None, group: int | None = None):
+        self.hanzi = hanzi
+        self.info = info  # 展示用的韵部说明
+        self.rhymed = rhymed  # True 押韵 False 不押韵 None 不知韵部
+        self.group = group  # 词的第几组韵，诗为 None
+
+    def to_dict(self) -> dict:
+        return {'hanzi': self.hanzi, 'info': self.info, 'rhymed': self.rhymed, 'group': self.group}
+
+
+class ResultLine:
+    def __init__(self, rule: str, text: str, marks: str, rhyme: RhymeInfo | None = None, note: str = ''):
+        self.rule = rule  # 格律
+        self.text = text  # 输入的内容
+        self.marks = marks  # 平仄标记，句末已按押韵与否改为 □ ■
+        self.rhyme = rhyme
+        self.note = note  # 拗救等提示
+
+    def right_count(self) -> int:
+        """平仄正确与押韵的标记数，与原先按文本统计的口径一致：只统计含 □■〇 的标记行。"""
+        if not any(mark in self.marks for mark in SCORED_LINE_MARKS):
+            return 0
+        return sum(self.marks.count(mark) for mark in RIGHT_MARKS)
+
+    def to_dict(self) -> dict:
+        return {'rule': self.rule, 'text': self.text, 'marks': self.marks,
+                'rhyme': self.rhyme.to_dict() if self.rhyme else None, 'note': self.note}
+
+
+class CheckResult:
+    def __init__(self, kind: str, title: str, lines: list[ResultLine], is_trad: bool,
+                 prefix: str = '', tail: list[ResultLine] | None = None, meta: dict | None = None):
+        self.kind = kind  # 'shi' 或 'ci'
+        self.title = title  # 诗体或格式说明
+        self.lines = lines
+        self.is_trad = is_trad
+        self.prefix = prefix  # 标题前的提示与词牌名
+        self.tail = tail or []  # 水龙吟格二十四等特殊处理附加的行，不含韵脚
+        self.meta = meta or {}
+
+    def score(self) -> tuple[int, int, int]:
+        """
+        对一个校验结果，统计其总正确平仄数、押韵数、韵种类
+        Returns:
+            返回三个值：
+                总正确平仄数（不押韵的韵脚各扣一）
+                押韵数（知道韵部的韵脚数）
+                韵种类
+        """
+        total_count = yayun_count = 0
+        groups = []
+        for line in self.tail:
+            total_count += line.right_count()
+        for line in self.lines:
+            total_count += line.right_count()
+            if line.rhyme is None or line.rhyme.rhymed is None:
+                continue
+            yayun_count += 1
+            if not line.rhyme.rhymed:
+                total_count -= 1
+            if line.rhyme.group:
+                groups.append(line.rhyme.group)
+        return total_count, yayun_count, max(groups, default=1)
+
+    def render(self) -> str:
+        """渲染为文本报告。"""
+        if self.kind == 'shi':
+            report = f'{self.title}\n'
+            for line in self.lines:
+                report += f'\n{line.rule}\n{line.text}{line.rhyme.info}\n{line.marks}{line.note}\n'
+            return self.prefix + report
+        body = ''
+        for line in self.lines:
+            info = ' '.join(part for part in (line.rhyme.info if line.rhyme else '', line.note) if part)
+            sep = '\u3000' if info else ''
+            body += f'{line.rule}\n{line.text}{sep}{info}\n{line.marks}\n\n'
+        report = self.prefix + f'{self.title}\n\n' + body.rstrip() + '\n'
+        for line in self.tail:
+            report += f'\n{line.rule}\n{line.text}\n{line.marks}\n'
+        return report
+
+    def to_dict(self) -> dict:
+        total_count, yayun_count, yun_types = self.score()
+        return {
+            'kind': self.kind,
+            'title': self.title,
+            **self.meta,
+            'score': {'right': total_count, 'rhymed': yayun_count, 'rhyme_groups': yun_types},
+            'lines': [line.to_dict() for line in self.lines + self.tail],
+            'report': self.render(),
+        }
+
+
+def score_key(score: tuple[int, int, int]) -> tuple[int, int, int]:
+    """把 score() 转为可直接比较大小的键：正确数、押韵数越多越好，韵种类越少越好。"""
+    total_count, yayun_count, yun_types = score
+    return total_count, yayun_count, -yun_types
+
+
+def better_result(post_result: CheckResult | None, temp_result: CheckResult) -> CheckResult:
+    """
+    如果一首诗、词可能对应多个结构，根据平仄和押韵符合字数的多少，是否押更多的韵数，是否有更少的韵种类，确定一个最接近的。
+    分数相同时取后一个。
+    Args:
+        post_result: 上一个校验的结果
+        temp_result: 目前校验的结果
+    Returns:
+        两者中更匹配的结果
+    """
+    if post_result is None:
+        return temp_result
+    if score_key(temp_result.score()) >= score_key(post_result.score()):
+        return temp_result
+    return post_result
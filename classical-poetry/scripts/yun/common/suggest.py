@@ -0,0 +1,217 @@
+"""
+不联网的替换字建议。
+韵部 -> 汉字取自 rhyme_index 的反查索引，另按字频建立平仄 -> 汉字的索引，
+对校验结果中平仄不合（●）或不押韵（■）的位置，给出平仄合律、韵脚处还与全篇同韵的候选字。
+候选按字频排序，字频默认取自词谱所附例词，也可以指定本地字频表。
+"""
+import json
+from collections import Counter
+
+from yun.common.common import hanzi_to_yun, pingze_string
+from yun.common.result import CheckResult
+from yun.rhythm.rhyme_index import YUN_SHU_BOOKS, rhyme_index
+
+RULE_TONES = {'平': '1', '仄': '2'}
+TONE_NAMES = {'1': '平', '2': '仄'}
+DEFAULT_LIMIT = 8
+
+_indexes: dict[tuple, 'SuggestIndex'] = {}
+_frequency: dict[tuple, Counter] = {}
+
+
+def char_frequency(path: str | None = None, is_trad: bool = False) -> Counter:
+    """
+    字频表，只读一次。
+    Args:
+        path: 本地字频表，JSON 对象 {"字": 次数} 或每行“字 次数”的文本；None 表示统计词谱中的全部例词
+        is_trad: 统计例词时取繁体还是简体，使同一字的另一写法排在后面
+    Returns:
+        汉字到出现次数的计数
+    """
+    key = (path, is_trad if path is None else None)
+    if key in _frequency:
+        return _frequency[key]
+    counts = Counter()
+    if path is None:
+        from yun.ci.ci_search import ci_idx, ci_type_extraction
+
+        for pu in (1, 2):
+            for item in ci_idx:
+                if pu == 2 and not item['long_exist']:
+                    continue
+                try:
+                    forms = ci_type_extraction(item['idx'], pu)
+                except FileNotFoundError:
+                    continue
+                for form in forms:
+                    counts.update(form.get('origin_trad' if is_trad else 'origin', ''))
+    else:
+        with open(path, encoding='utf-8') as handle:
+            if path.endswith('.json'):
+                counts.update({hanzi: int(count) for hanzi, count in json.load(handle).items()})
+            else:
+                for line in handle:
+                    parts = line.split()
+                    if len(parts) >= 2 and len(parts[0]) == 1:
+                        counts[parts[0]] += int(parts[1])
+    _frequency[key] = counts
+    return counts
+
+
+class SuggestIndex:
+    def __init__(self, yun_shu: int, frequency: Counter):
+        """
+        Args:
+            yun_shu: 使用的韵书代号
+            frequency: 字频，决定候选的先后
+        """
+        self.yun_shu = yun_shu
+        self._rhymes = rhyme_index(YUN_SHU_BOOKS[yun_shu])
+        self._ci_lin = rhyme_index('cilin') if yun_shu == 1 else self._rhymes  # 新韵、通韵填词与作诗同一韵部
+        hanzis = set()
+        for tones in self._rhymes.groups.values():
+            for group_hanzis in tones.values():
+                hanzis.update(group_hanzis)
+        hanzis = sorted(hanzis, key=lambda ch: (-frequency[ch], ord(ch)))
+        self._rank = {hanzi: rank for rank, hanzi in enumerate(hanzis)}
+        self.by_tone: dict[str, list[str]] = {}  # 平仄代码 -> 按字频排好的汉字，只收读音平仄唯一的字
+        for hanzi, tone in zip(hanzis, pingze_string(''.join(hanzis), yun_shu)):
+            self.by_tone.setdefault(tone, []).append(hanzi)
+
+    def candidates(self, tone: str | None, rhymes: list[int] | None = None, ci_lin: bool = False,
+                   exclude: str = '', limit: int = DEFAULT_LIMIT) -> list[str]:
+        """
+        按字频给出候选字。
+        Args:
+            tone: 需要的平仄代码 '1' 或 '2'，None 表示不限
+            rhymes: 须属于其中某个韵部，None 表示不限
+            ci_lin: rhymes 为词林正韵韵部（仅平水韵时有区别）
+            exclude: 不取的字，如原字
+            limit: 最多给出的字数
+        Returns:
+            候选字列表
+        """
+        if rhymes:
+            index = self._ci_lin if ci_lin else self._rhymes
+            pool = set().union(*(index.yun_chars(num) for num in rhymes))
+            if tone is not None:
+                pool &= set(self.by_tone.get(tone, ()))
+            ordered = sorted(pool, key=self._rank.__getitem__)
+        else:
+            ordered = self.by_tone.get(tone, []) if tone is not None else sorted(self._rank, key=self._rank.get)
+        result = []
+        for hanzi in ordered:
+            if hanzi in exclude:
+                continue
+            result.append(hanzi)
+            if len(result) >= limit:
+                break
+        return result
+
+
+def suggest_index(yun_shu: int, is_trad: bool = False, frequency_path: str | None = None) -> SuggestIndex:
+    """每种韵书、简繁、字频表的组合只建一次索引。"""
+    key = (yun_shu, is_trad, frequency_path)
+    if key not in _indexes:
+        _indexes[key] = SuggestIndex(yun_shu, char_frequency(frequency_path, is_trad))
+    return _indexes[key]
+
+
+def _aligned(rule: str, text: str, marks: str) -> tuple[str, str, str] | None:
+    """去掉分句的全角空格与词谱中的句读、韵位说明，使格律、内容、标记逐字对齐；对不齐（如字数不合的词）时返回 None。"""
+    text = text.replace('　', '')
+    marks = marks.replace('　', '')
+    rule = ''.join(ch for ch in rule if ch in '中平仄')
+    if not (len(rule) == len(text) == len(marks)) or '＋' in marks or '－' in marks:
+        return None
+    return rule, text, marks
+
+
+def _group_rhymes(result: CheckResult, yun_shu: int) -> dict[int | None, list[int]]:
+    """每组韵脚中已押韵的字最常见的韵部，诗只有一组（键为 None）。"""
+    ci_lin = result.kind == 'ci'
+    counters: dict[int | None, Counter] = {}
+    for line in result.lines:
+        if line.rhyme is None or not line.rhyme.rhymed:
+            continue
+        nums = [num for num in hanzi_to_yun(line.rhyme.hanzi, yun_shu, result.is_trad, ci_lin=ci_lin) if num != 107]
+        counters.setdefault(line.rhyme.group, Counter()).update(nums)
+    groups = {}
+    for group, counter in counters.items():
+        if counter:
+            top = max(counter.values())
+            groups[group] = [num for num, count in counter.items() if count == top]
+    return groups
+
+
+def suggest_line(rule: str, text: str, marks: str, yun_shu: int, is_trad: bool = False,
+                 rhymes: list[int] | None = None, ci_lin: bool = False, limit: int = DEFAULT_LIMIT,
+                 frequency_path: str | None = None) -> list[dict]:
+    """
+    为一行中平仄不合（●）与不押韵（■）的字给出候选。
+    Args:
+        rule: 格律，由中、平、仄组成，可含分句空格与句读说明
+        text: 内容，与 rule 逐字对齐
+        marks: 平仄标记
+        yun_shu: 使用的韵书代号
+        is_trad: 簡體 or 繁體
+        rhymes: 句末字不押韵时应押的韵部，给出时句末字按韵脚处理
+        ci_lin: rhymes 为词林正韵韵部
+        limit: 每个位置最多给出的字数
+        frequency_path: 本地字频表
+    Returns:
+        每个待改位置一项：{"index": 行内字序号, "hanzi": 原字, "need": 平/仄/None, "rhyme": 是否韵脚, "candidates": [...]}
+    """
+    aligned = _aligned(rule, text, marks)
+    if aligned is None:
+        return []
+    rule, text, marks = aligned
+    index = suggest_index(yun_shu, is_trad, frequency_path)
+    items = []
+    last = len(text) - 1
+    for pos, (need, hanzi, mark) in enumerate(zip(rule, text, marks)):
+        at_rhyme = bool(rhymes) and pos == last
+        if mark not in '●■' and not at_rhyme:
+            continue
+        tone = RULE_TONES.get(need)
+        candidates = index.candidates(tone, rhymes if at_rhyme else None, ci_lin, hanzi, limit)
+        items.append({'index': pos, 'hanzi': hanzi, 'need': TONE_NAMES.get(tone), 'rhyme': at_rhyme,
+                      'candidates': candidates})
+    return items
+
+
+def suggest_replacements(result: CheckResult, yun_shu: int, limit: int = DEFAULT_LIMIT,
+                         frequency_path: str | None = None) -> list[dict]:
+    """
+    为诗、词校验结果中所有待改的字给出候选。
+    Args:
+        result: ShiRhythm 或 CiRhythm 的校验结果
+        yun_shu: 使用的韵书代号
+        limit: 每个位置最多给出的字数
+        frequency_path: 本地字频表
+    Returns:
+        与 suggest_line 相同的列表，每项另有 "line"：结果中的行序号
+    """
+    groups = _group_rhymes(result, yun_shu)
+    items = []
+    for line_no, line in enumerate(result.lines):
+        unrhymed = line.rhyme is not None and line.rhyme.rhymed is False
+        rhymes = groups.get(line.rhyme.group) if unrhymed else None
+        for item in suggest_line(line.rule, line.text, line.marks, yun_shu, result.is_trad, rhymes,
+                                 result.kind == 'ci', limit, frequency_path):
+            items.append({'line': line_no, **item})
+    return items
+
+
+def render_suggestions(items: list[dict], is_trad: bool) -> str:
+    """把建议渲染为文本，每个位置一行。"""
+    if not items:
+        return ''
+    lines = ['替換建議：' if is_trad else '替换建议：']
+    for item in items:
+        need = item['need'] or ('韻' if is_trad else '韵')
+        rhyme = ('，須同韻' if is_trad else '，须同韵') if item['rhyme'] else ''
+        where = f"第{item['line'] + 1}行" if 'line' in item else ''
+        candidates = '、'.join(item['candidates']) or ('無' if is_trad else '无')
+        lines.append(f"{where}第{item['index'] + 1}字「{item['hanzi']}」宜{need}{rhyme}：{candidates}")
+    return '\n'.join(lines)
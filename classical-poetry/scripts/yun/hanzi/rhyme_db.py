@@ -0,0 +1,239 @@
+"""
+预编译韵表模块。
+将 hanzi_pinyin_class.py（新韵、通韵用的韵母声调）与 hanzi_class.py（平水、词林韵表）编译为单个二进制文件，
+运行时通过 mmap 只读映射，按码位直接取记录，免去导入四万余行字典的冷启动开销。
+
+文件布局（小端序）：
+    文件头      magic、版本号、韵母数、韵表数、页表长度、数据页数、记录区长度、平仄表长度
+    韵母表      每项 8 字节，韵母字符串，不足补 0
+    韵表表      每项 12 字节：变量名(8s)、声调(b)、平水韵部(b)、词林韵部(b)、平水总编号(B)
+    页表        每个 256 码位的页对应一个 uint16 数据页编号，0xFFFF 表示空页
+    数据页      每页 256 个 uint32，为该码位在记录区中的偏移，0 表示无记录
+    记录区      读音数(B)、读音(韵母编号 << 1 | 平仄)…、韵表数(B)、韵表编号…
+    平仄表      平水韵、新韵（通韵同）各一张，按码位直接索引，每字一个 ASCII 平仄代码：0多音 1平 2仄 3生僻
+"""
+
+import mmap
+import os
+import struct
+
+from yun import RHYME_DB
+
+MAGIC = b'YUNRHYDB'
+VERSION = 2
+HEADER = struct.Struct('<8sIIIIIII')
+FINAL = struct.Struct('<8s')
+CLASS = struct.Struct('<8sbbbB')
+PAGE_SIZE = 256
+EMPTY_PAGE = 0xFFFF
+
+_loaded: dict[str, 'RhymeDB | None'] = {}
+
+
+class RhymeDB:
+    def __init__(self, path: str):
+        with open(path, 'rb') as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mm)
+        if len(view) < HEADER.size or bytes(view[:8]) != MAGIC:
+            raise ValueError(f'{path} 不是可识别的韵表文件')
+        (magic, version, n_finals, n_classes, n_page_table, n_pages, records_size,
+         self.pingze_limit) = HEADER.unpack_from(view, 0)
+        if version != VERSION:
+            raise ValueError(f'{path} 不是可识别的韵表文件')
+        offset = HEADER.size
+        self.finals = [FINAL.unpack_from(view, offset + i * FINAL.size)[0].rstrip(b'\0').decode('ascii')
+                       for i in range(n_finals)]
+        offset += n_finals * FINAL.size
+        self.classes = []
+        for i in range(n_classes):
+            name, tone, rhyme, ci_lin, total = CLASS.unpack_from(view, offset + i * CLASS.size)
+            self.classes.append([name.rstrip(b'\0').decode('ascii'), tone, rhyme, ci_lin, total])
+        offset += n_classes * CLASS.size
+        self._page_table = view[offset:offset + n_page_table * 2].cast('H')
+        offset += n_page_table * 2
+        offset += -offset % 4
+        self._pages = view[offset:offset + n_pages * PAGE_SIZE * 4].cast('I')
+        offset += n_pages * PAGE_SIZE * 4
+        self._records = view[offset:offset + records_size]
+        offset += records_size
+        self._pingze_tables = {1: view[offset:offset + self.pingze_limit],
+                               2: view[offset + self.pingze_limit:offset + 2 * self.pingze_limit]}
+
+    def _record(self, hanzi: str) -> int:
+        """返回汉字在记录区中的偏移，没有记录返回 0。"""
+        if len(hanzi) != 1:
+            return 0
+        code = ord(hanzi)
+        page_no = code >> 8
+        if page_no >= len(self._page_table):
+            return 0
+        page = self._page_table[page_no]
+        if page == EMPTY_PAGE:
+            return 0
+        return self._pages[page * PAGE_SIZE + (code & 0xFF)]
+
+    def pinyin(self, hanzi: str) -> list[list]:
+        """与 pinyin_dict.get(hanzi, []) 相同：该汉字所有读音的韵母和声调的列表。"""
+        pos = self._record(hanzi)
+        if not pos:
+            return []
+        records = self._records
+        count = records[pos]
+        return [[self.finals[code >> 1], code & 1] for code in records[pos + 1:pos + 1 + count]]
+
+    def pingshui(self, hanzi: str) -> list[list]:
+        """与 traverse_lists_and_find 相同：包含该汉字的韵表列表，首项为 hanzi_class.py 中的变量名。"""
+        pos = self._record(hanzi)
+        if not pos:
+            return []
+        records = self._records
+        pos += records[pos] + 1
+        count = records[pos]
+        return [self.classes[idx] for idx in records[pos + 1:pos + 1 + count]]
+
+    def pingze_table(self, yun_shu: int) -> memoryview:
+        """按码位索引的平仄表，yun_shu 1 平水韵，2、3 新韵与通韵（两者平仄相同）。"""
+        return self._pingze_tables[1 if yun_shu == 1 else 2]
+
+
+def load_rhyme_db(path: str = RHYME_DB) -> RhymeDB | None:
+    """
+    映射预编译韵表，同一路径只映射一次。
+    Args:
+        path: 韵表文件路径
+    Returns:
+        RhymeDB 对象，文件不存在或不可识别时返回 None，调用方应回退到 Python 韵表
+    """
+    if path not in _loaded:
+        try:
+            _loaded[path] = RhymeDB(path)
+        except (OSError, ValueError, struct.error):
+            _loaded[path] = None
+    return _loaded[path]
+
+
+def _source_tables() -> tuple[list[str], list[list], dict[str, tuple[list, list]]]:
+    """从 Python 韵表汇总每个汉字的读音与所在韵表。"""
+    import yun.hanzi.hanzi_class as hanzi_class
+    from yun.hanzi.hanzi_pinyin_class import pinyin_dict
+
+    finals = sorted({yun for readings in pinyin_dict.values() for yun, _ in readings})
+    final_ids = {yun: i for i, yun in enumerate(finals)}
+    classes = []
+    entries: dict[str, tuple[list, list]] = {}
+    for var_name in dir(hanzi_class):  # 与 traverse_lists_and_find 保持同一顺序
+        var = getattr(hanzi_class, var_name)
+        if isinstance(var, list) and len(var) > 0 and isinstance(var[0], str):
+            class_id = len(classes)
+            classes.append([var_name] + var[1:])
+            for hanzi in set(var[0]) - {'\n'}:
+                entries.setdefault(hanzi, ([], []))[1].append(class_id)
+    for hanzi, readings in pinyin_dict.items():
+        entries.setdefault(hanzi, ([], []))[0].extend(final_ids[yun] << 1 | pingze for yun, pingze in readings)
+    for _, class_ids in entries.values():
+        class_ids.sort()
+    return finals, classes, entries
+
+
+def _pingze_code(ping: bool, ze: bool) -> int:
+    """与 hanzi_rhythm(only_ping_ze=True)、new_ping_ze 一致的平仄代码。"""
+    if not ping and not ze:
+        return ord('3')
+    return ord('0') if ping and ze else ord('1') if ping else ord('2')
+
+
+def source_pingze_tables() -> tuple[bytearray, bytearray]:
+    """
+    从 Python 韵表生成平水韵与新韵的按码位平仄表。
+    Returns:
+        返回两个值：
+            平水韵平仄表
+            新韵（通韵）平仄表
+    """
+    _, classes, entries = _source_tables()
+    limit = max(map(ord, entries)) + 1
+    pingshui = bytearray(b'3' * limit)
+    pinyin = bytearray(b'3' * limit)
+    for hanzi, (readings, class_ids) in entries.items():
+        code = ord(hanzi)
+        rhymes = [classes[idx][2] for idx in class_ids]
+        pingshui[code] = _pingze_code(any(r > 0 for r in rhymes), any(r < 0 for r in rhymes))
+        pinyin[code] = _pingze_code(any(not r & 1 for r in readings), any(r & 1 for r in readings))
+    return pingshui, pinyin
+
+
+def build_rhyme_db(path: str = RHYME_DB) -> int:
+    """
+    将 Python 韵表编译为二进制韵表文件，先写临时文件再替换，避免读到半个文件。
+    Args:
+        path: 输出文件路径
+    Returns:
+        写入的字节数
+    """
+    finals, classes, entries = _source_tables()
+    pingshui_table, pinyin_table = source_pingze_tables()
+    records = bytearray(b'\0')  # 偏移 0 表示无记录
+    offsets = {}
+    for hanzi in sorted(entries, key=ord):
+        readings, class_ids = entries[hanzi]
+        offsets[ord(hanzi)] = len(records)
+        records.append(len(readings))
+        records.extend(readings)
+        records.append(len(class_ids))
+        records.extend(class_ids)
+
+    n_page_table = (max(offsets) >> 8) + 1
+    page_table = [EMPTY_PAGE] * n_page_table
+    pages = []
+    for code in sorted(offsets):
+        page_no = code >> 8
+        if page_table[page_no] == EMPTY_PAGE:
+            page_table[page_no] = len(pages)
+            pages.append([0] * PAGE_SIZE)
+        pages[page_table[page_no]][code & 0xFF] = offsets[code]
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, len(finals), len(classes), n_page_table, len(pages), len(records),
+                                 len(pingshui_table)))
+    for yun in finals:
+        data += FINAL.pack(yun.encode('ascii'))
+    for name, tone, rhyme, ci_lin, total in classes:
+        data += CLASS.pack(name.encode('ascii'), tone, rhyme, ci_lin, total)
+    data += struct.pack(f'<{n_page_table}H', *page_table)
+    data += bytes(-len(data) % 4)
+    for page in pages:
+        data += struct.pack(f'<{PAGE_SIZE}I', *page)
+    data += records
+    data += pingshui_table
+    data += pinyin_table
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as handle:
+        handle.write(data)
+    os.replace(tmp_path, path)
+    _loaded.pop(path, None)
+    return len(data)
+
+
+def check_rhyme_db(path: str = RHYME_DB) -> list[str]:
+    """
+    核对二进制韵表与 Python 韵表是否一致。
+    Args:
+        path: 韵表文件路径
+    Returns:
+        不一致的汉字列表，为空表示一致
+    """
+    db = RhymeDB(path)
+    finals, classes, entries = _source_tables()
+    if db.finals != finals or db.classes != classes:
+        return ['<header>']
+    pingshui_table, pinyin_table = source_pingze_tables()
+    if db.pingze_table(1) != pingshui_table or db.pingze_table(2) != pinyin_table:
+        return ['<pingze>']
+    mismatched = []
+    for hanzi, (readings, class_ids) in entries.items():
+        want_pinyin = [[finals[code >> 1], code & 1] for code in readings]
+        want_pingshui = [classes[idx] for idx in class_ids]
+        if db.pinyin(hanzi) != want_pinyin or db.pingshui(hanzi) != want_pingshui:
+            mismatched.append(hanzi)
+    return mismatched
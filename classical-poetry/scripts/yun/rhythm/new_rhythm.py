@@ -2,7 +2,7 @@
 
 import math
 from yun.common.num_to_cn import num_to_cn
-from yun.hanzi.hanzi_pinyin_class import pinyin_dict
+from yun.hanzi.rhyme_db import load_rhyme_db
 
 xin_yun = {1: ['a', 'ia', 'ua'], 2: ['o', 'e', 'uo'], 3: ['ie', 'ue', 've'], 4: ['ai', 'uai'],
            5: ['ei', 'uei', 'ui'], 6: ['ao', 'iao'], 7: ['ou', 'iu', 'iou'], 8: ['an', 'ian', 'uan', 'van'],
@@ -20,15 +20,50 @@ xin_hanzi_trad = ['麻', '波', '皆', '開', '微', '豪', '尤', '寒', '文',
 tong_hanzi_trad = ['啊', '喔', '鵝', '衣', '烏', '迂', '哀', '欸', '熬', '歐', '安', '恩', '昂', '英', '雍', '兒']
 
 
+def pinyin_table() -> dict[str, list]:
+    """
+    返回完整的汉字拼音韵母字典，首次调用时才导入 hanzi_pinyin_class.py。
+    Returns:
+        汉字到其所有读音的韵母和声调列表的字典
+    """
+    from yun.hanzi.hanzi_pinyin_class import pinyin_dict
+    return pinyin_dict
+
+
 def get_new_yun(hanzi: str) -> list:
     """
-    给定一个汉字，返回其所有韵母和声调的列表。
+    给定一个汉字，返回其所有韵母和声调的列表。优先读取预编译韵表，缺失时回退到 hanzi_pinyin_class.py。
     Args:
         hanzi: 给定的汉字
     Returns:
         该汉字所有读音的韵母和声调的列表
     """
-    return pinyin_dict.get(hanzi, [])
+    rhyme_db = load_rhyme_db()
+    if rhyme_db is not None:
+        return rhyme_db.pinyin(hanzi)
+    return pinyin_table().get(hanzi, [])
+
+
+_final_maps: dict[int, tuple[dict, dict[str, int]]] = {}
+_category_memo: dict[tuple[str, int], tuple[int, ...]] = {}
+
+
+def final_map(rhyme_dict: dict) -> dict[str, int]:
+    """
+    韵母到韵部的反查表，每个韵部字典只建一次；同一韵母出现在多个韵部时取第一个，与逐部查找的结果一致。
+    Args:
+        rhyme_dict: 新韵或通韵韵母韵部对照字典
+    Returns:
+        韵母到韵部序号的字典
+    """
+    cached = _final_maps.get(id(rhyme_dict))
+    if cached is None or cached[0] is not rhyme_dict:
+        mapping = {}
+        for category, rhymes in rhyme_dict.items():
+            for rhyme in rhymes:
+                mapping.setdefault(rhyme, category)
+        cached = _final_maps[id(rhyme_dict)] = (rhyme_dict, mapping)
+    return cached[1]
 
 
 def convert_yun(yun_list: list, rhyme_dict: dict) -> list:
@@ -40,6 +75,24 @@ def convert_yun(yun_list: list, rhyme_dict: dict) -> list:
     Returns:
         韵部的列表
     """
+    mapping = final_map(rhyme_dict)
+    converted_list = []
+    for yun, pingze in yun_list:
+        category = mapping.get(yun)
+        if category is not None:
+            converted_list.append(category if pingze == 0 else -category)
+    return converted_list if converted_list else [107]
+
+
+def scan_convert_yun(yun_list: list, rhyme_dict: dict) -> list:
+    """
+    逐个韵部遍历查找韵母，不使用反查表，结果与 convert_yun 相同。基准测试使用。
+    Args:
+        yun_list: 汉字所有读音的韵母和声调的列表
+        rhyme_dict: 使用的新韵或通韵韵母韵部对照字典
+    Returns:
+        韵部的列表
+    """
     converted_list = []
     for yun, pingze in yun_list:
         # 遍历字典，找到韵母对应的类别
@@ -53,6 +106,35 @@ def convert_yun(yun_list: list, rhyme_dict: dict) -> list:
     return converted_list if converted_list else [107]
 
 
+def hanzi_categories(hanzi: str, rhyme_dict: dict) -> tuple[int, ...]:
+    """
+    一个汉字的新韵或通韵韵部，每字每种韵书只转换一次。
+    Args:
+        hanzi: 一个汉字
+        rhyme_dict: 使用的新韵或通韵韵母韵部对照字典
+    Returns:
+        与 convert_yun(get_new_yun(hanzi), rhyme_dict) 相同的韵部，以元组表示
+    """
+    key = (hanzi, id(rhyme_dict))
+    categories = _category_memo.get(key)
+    if categories is None:
+        final_map(rhyme_dict)  # 保证 id 对应的仍是同一个字典
+        categories = _category_memo[key] = tuple(convert_yun(get_new_yun(hanzi), rhyme_dict))
+    return categories
+
+
+def convert_yun_batch(hanzis, rhyme_dict: dict) -> dict[str, tuple[int, ...]]:
+    """
+    一次转换一组韵字，如词谱某组韵脚或一部韵字表。
+    Args:
+        hanzis: 汉字的字符串或可迭代对象
+        rhyme_dict: 使用的新韵或通韵韵母韵部对照字典
+    Returns:
+        汉字到韵部元组的字典，重复的字只转换一次
+    """
+    return {hanzi: hanzi_categories(hanzi, rhyme_dict) for hanzi in dict.fromkeys(hanzis)}
+
+
 def new_ping_ze(yun_list: list) -> str:
     """
     根据新韵通韵返回平仄，或多音。
@@ -83,7 +165,7 @@ def show_yun(hanzi: str | list, yun_rule: dict, yun_hanzi: list) -> str:
         汉字或列表对应的新韵、通韵韵部
     """
     if type(hanzi) is str:
-        hanzi_yun_list = convert_yun(get_new_yun(hanzi), yun_rule)
+        hanzi_yun_list = list(hanzi_categories(hanzi, yun_rule))
     else:
         hanzi_yun_list = hanzi
     if not hanzi_yun_list or hanzi_yun_list == [107]:
@@ -1,7 +1,7 @@
 """平水韵相关模块"""
 
 from yun.common.num_to_cn import num_to_cn  # 自用数字转换汉字代码
-import yun.hanzi.hanzi_class as hanzi_class # 平水韵表
+from yun.hanzi.rhyme_db import load_rhyme_db  # 预编译韵表
 
 rhythm_name = [
     '东冬江支微鱼虞齐佳灰真文元寒删先萧肴豪歌麻阳庚青蒸尤侵覃盐咸',
@@ -22,14 +22,51 @@ rhythm_correspond = {1: 1, 2: 1, 3: 2, 4: 3, 5: 3, 6: 4, 7: 4, 8: 3, 9: [5, 10],
                      22: 2, 23: 11, 24: 11, 25: 11, 26: 12, 27: 13, 28: 14, 29: 14, 30: 14}
 
 
+_hanzi_index: dict[str, list[list]] = {}
+
+
+def _build_hanzi_index() -> dict[str, list[list]]:
+    """
+    构建汉字到韵表列表的倒排索引，只在第一次查询时构建一次。
+    Returns:
+        以单个汉字为键，hanzi_class.py 中包含该汉字的所有列表（声调、平水韵部、词林韵部、平水总编号）为值的字典
+    """
+    if _hanzi_index:
+        return _hanzi_index
+    import yun.hanzi.hanzi_class as hanzi_class  # 平水韵表
+    for var_name in dir(hanzi_class):  # 保持与原先遍历相同的顺序
+        var = getattr(hanzi_class, var_name)
+        if isinstance(var, list) and len(var) > 0 and isinstance(var[0], str):
+            for hanzi in set(var[0]) - {'\n'}:
+                _hanzi_index.setdefault(hanzi, []).append(var)
+    return _hanzi_index
+
+
 def traverse_lists_and_find(search_hanzi: str) -> list[list]:
     """
-    查找并返回包含特定字符串的列表。
+    查找并返回包含特定字符串的列表。单个汉字优先读取预编译韵表，此时列表首项为 hanzi_class.py 中的变量名。
     Args:
         search_hanzi: 单个汉字
     Returns:
         在 hanzi_class.py 中包含这一汉字的所有列表的列表
     """
+    if len(search_hanzi) == 1:
+        rhyme_db = load_rhyme_db()
+        if rhyme_db is not None:
+            return rhyme_db.pingshui(search_hanzi)
+        return list(_build_hanzi_index().get(search_hanzi, ()))
+    return scan_hanzi_class(search_hanzi)
+
+
+def scan_hanzi_class(search_hanzi: str) -> list[list]:
+    """
+    逐个遍历 hanzi_class.py 中的列表查找汉字，不使用索引。多字查询与基准测试使用。
+    Args:
+        search_hanzi: 查询的字符串
+    Returns:
+        在 hanzi_class.py 中包含这一字符串的所有列表的列表
+    """
+    import yun.hanzi.hanzi_class as hanzi_class  # 平水韵表
     matching_list = []
     for var_name in dir(hanzi_class):
         var = getattr(hanzi_class, var_name)
@@ -0,0 +1,228 @@
+"""
+韵部反查模块，由韵部查字。
+由平水韵表（hanzi_class.py）建立平水韵、词林正韵的韵部到汉字的索引，由拼音表（hanzi_pinyin_class.py）
+按 xin_yun、tong_yun 建立新韵、通韵的索引。每部韵书只在第一次使用时建立一次，之后的列字与分页都只是切片。
+韵部编号即 hanzi_to_yun 所返回韵部代码的绝对值：平水韵为四声总编号 1-106，词林正韵为部 1-19，新韵、通韵为韵部序号。
+"""
+
+import re
+
+import yun.rhythm.new_rhythm as nw
+from yun.common.num_to_cn import num_to_cn
+from yun.rhythm.pingshui_rhythm import rhythm_name, rhythm_name_trad
+
+BOOKS = ['pingshui', 'cilin', 'xin', 'tong']
+YUN_SHU_BOOKS = {1: 'pingshui', 2: 'xin', 3: 'tong'}
+BOOK_TITLES = {'pingshui': ('平水韵', '平水韻'), 'cilin': ('词林正韵', '詞林正韻'),
+               'xin': ('中华新韵', '中華新韻'), 'tong': ('中华通韵', '中華通韻')}
+TONES = ['平', '仄']  # 每个韵部按平、仄分列，词林正韵的仄含上、去、入
+DEFAULT_PAGE_SIZE = 200
+
+# 平水韵各段：起始总编号、在 rhythm_name 中的行与该行的起始总编号、段名，上平、下平各十五韵
+_PINGSHUI_SECTIONS = [(1, 0, 1, '上平', '上平'), (16, 0, 1, '下平', '下平'), (31, 1, 31, '上声', '上聲'),
+                      (60, 2, 60, '去声', '去聲'), (90, 3, 90, '入声', '入聲')]
+_CN_DIGITS = {'零': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4, '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+
+_indexes: dict[str, 'RhymeIndex'] = {}
+
+
+def _ordered(hanzis: set[str]) -> list[str]:
+    """基本区汉字在前，扩展区与其他字符在后，各自按码位排序，常用字不被生僻字挤到后面的页里。"""
+    return sorted(hanzis, key=lambda ch: (not '\u4e00' <= ch <= '\u9fff', ord(ch)))
+
+
+def _cn_to_num(text: str) -> int | None:
+    """把一百零六以内的汉字或阿拉伯数字转为整数，不是数字时返回 None。"""
+    if text.isdigit():
+        return int(text)
+    if not text or any(ch not in _CN_DIGITS and ch not in '十百' for ch in text):
+        return None
+    total = digit = 0
+    for ch in text:
+        if ch == '百':
+            total += (digit or 1) * 100
+            digit = 0
+        elif ch == '十':
+            total += (digit or 1) * 10
+            digit = 0
+        else:
+            digit = _CN_DIGITS[ch]
+    return total + digit
+
+
+class RhymeIndex:
+    def __init__(self, book: str):
+        """
+        Args:
+            book: 韵书，pingshui、cilin、xin、tong 之一
+        """
+        if book not in BOOKS:
+            raise ValueError(f'未知的韵书：{book}，可选 {"、".join(BOOKS)}')
+        self.book = book
+        groups: dict[int, dict[str, set[str]]] = {}
+        if book in ('pingshui', 'cilin'):
+            import yun.hanzi.hanzi_class as hanzi_class
+
+            for var_name in dir(hanzi_class):
+                var = getattr(hanzi_class, var_name)
+                if isinstance(var, list) and len(var) > 0 and isinstance(var[0], str):
+                    group = var[4] if book == 'pingshui' else abs(var[3])
+                    tone = '平' if var[2] > 0 else '仄'
+                    groups.setdefault(group, {}).setdefault(tone, set()).update(set(var[0]) - {'\n'})
+        else:
+            rhyme_dict = nw.xin_yun if book == 'xin' else nw.tong_yun
+            for hanzi, readings in nw.pinyin_table().items():
+                for num in nw.convert_yun(readings, rhyme_dict):
+                    if num != 107:
+                        groups.setdefault(abs(num), {}).setdefault('平' if num > 0 else '仄', set()).add(hanzi)
+        self.groups: dict[int, dict[str, list[str]]] = {
+            group: {tone: _ordered(tones[tone]) for tone in TONES if tone in tones}
+            for group, tones in sorted(groups.items())
+        }
+
+    def chars(self, group: int, tone: str | None = None) -> list[str]:
+        """
+        一个韵部的字，基本区汉字在前，各自按码位排序。
+        Args:
+            group: 韵部编号
+            tone: '平' 或 '仄'，None 表示平仄都取
+        Returns:
+            汉字列表，同一字平仄两收时只出现一次
+        """
+        tones = self.groups.get(group, {})
+        if tone is not None:
+            return list(tones.get(tone, []))
+        if len(tones) == 1:
+            return list(next(iter(tones.values())))
+        return _ordered(set().union(*tones.values()))
+
+    def yun_chars(self, num: int) -> list[str]:
+        """按 hanzi_to_yun 返回的韵部代码取字：平水韵总编号已分平仄，词林正韵、新韵、通韵以负数表示仄声，词林入声部为正数。"""
+        if self.book == 'pingshui':
+            return self.chars(num)
+        tones = self.groups.get(abs(num), {})
+        return list(tones.get('仄' if num < 0 or '平' not in tones else '平', []))
+
+    def group_name(self, group: int, is_trad: bool = False) -> str:
+        """
+        韵部的名称，如平水韵“上平一东”、词林正韵“第一部”、新韵“十一庚”。
+        Args:
+            group: 韵部编号
+            is_trad: 簡體 or 繁體
+        Returns:
+            韵部名称
+        """
+        if self.book == 'pingshui':
+            start, row, row_start, label, label_trad = [section for section in _PINGSHUI_SECTIONS
+                                                        if section[0] <= group][-1]
+            names = rhythm_name_trad if is_trad else rhythm_name
+            return f'{label_trad if is_trad else label}{num_to_cn(group - start + 1)}{names[row][group - row_start]}'
+        if self.book == 'cilin':
+            return f'第{num_to_cn(group)}部'
+        if self.book == 'xin':
+            names = nw.xin_hanzi_trad if is_trad else nw.xin_hanzi
+        else:
+            names = nw.tong_hanzi_trad if is_trad else nw.tong_hanzi
+        return f'{num_to_cn(group)}{names[group - 1]}'
+
+    def parse_group(self, query: str | int) -> int:
+        """
+        把韵部的写法解析为编号，可以是编号、韵目字，或带韵书名、序数的全称，如“平水韵·一东”“下平一先”“新韵十庚”“第七部”。
+        Args:
+            query: 韵部的写法
+        Returns:
+            韵部编号
+        """
+        if isinstance(query, int):
+            if query in self.groups:
+                return query
+            raise ValueError(f'{BOOK_TITLES[self.book][0]}没有第{query}韵部')
+        text = re.sub(r'[\s·・.、:：]', '', query)
+        for title in BOOK_TITLES[self.book] + ('新韵', '新韻', '通韵', '通韻', '词林', '詞林'):
+            text = text.removeprefix(title)
+        if self.book != 'cilin':  # 韵目字唯一确定韵部
+            for group in self.groups:
+                name = self.group_name(group)
+                if name[-1] in text or self.group_name(group, True)[-1] in text:
+                    return group
+        offset = 0
+        for start, _, _, label, label_trad in _PINGSHUI_SECTIONS if self.book == 'pingshui' else []:
+            for prefix in (label + '声', label_trad + '聲', label):
+                if text.startswith(prefix):
+                    text, offset = text.removeprefix(prefix), start - 1
+                    break
+        text = re.sub(r'[平仄][声聲]?$', '', text)
+        num = _cn_to_num(text.removeprefix('第').removesuffix('部'))
+        if num is None or num + offset not in self.groups:
+            raise ValueError(f'无法识别的{BOOK_TITLES[self.book][0]}韵部：{query}')
+        return num + offset
+
+
+def rhyme_index(book: str) -> RhymeIndex:
+    """每部韵书只建一次索引。"""
+    if book not in _indexes:
+        _indexes[book] = RhymeIndex(book)
+    return _indexes[book]
+
+
+def rhyme_groups(book: str, is_trad: bool = False) -> list[dict]:
+    """
+    列出一部韵书的全部韵部。
+    Args:
+        book: 韵书，pingshui、cilin、xin、tong 之一
+        is_trad: 簡體 or 繁體
+    Returns:
+        每个韵部一项：{"group": 编号, "name": 名称, "counts": {"平": 字数, "仄": 字数}}
+    """
+    index = rhyme_index(book)
+    return [{'group': group, 'name': index.group_name(group, is_trad),
+             'counts': {tone: len(hanzis) for tone, hanzis in tones.items()}}
+            for group, tones in index.groups.items()]
+
+
+def rhyme_list(book: str, group: str | int, tone: str | None = None, page: int = 1,
+               page_size: int = DEFAULT_PAGE_SIZE, is_trad: bool = False) -> dict:
+    """
+    分页列出一个韵部的字。
+    Args:
+        book: 韵书，pingshui、cilin、xin、tong 之一
+        group: 韵部编号或写法，见 RhymeIndex.parse_group
+        tone: '平' 或 '仄'，None 表示平仄都取
+        page: 第几页，从 1 开始
+        page_size: 每页字数，不大于 0 时不分页
+        is_trad: 簡體 or 繁體
+    Returns:
+        {"book", "group", "name", "tone", "total", "page", "page_size", "pages", "hanzi"}，hanzi 为本页的字串
+    """
+    if tone not in (None, *TONES):
+        raise ValueError(f'平仄只能是平或仄：{tone}')
+    index = rhyme_index(book)
+    num = index.parse_group(group)
+    hanzis = index.chars(num, tone)
+    total = len(hanzis)
+    if page_size <= 0:
+        page_size = max(total, 1)
+    pages = max(1, -(-total // page_size))
+    page = min(max(page, 1), pages)
+    return {'book': book, 'group': num, 'name': index.group_name(num, is_trad), 'tone': tone, 'total': total,
+            'page': page, 'page_size': page_size, 'pages': pages,
+            'hanzi': ''.join(hanzis[(page - 1) * page_size:page * page_size])}
+
+
+def render_rhyme_list(listing: dict, is_trad: bool = False) -> str:
+    """把 rhyme_list 的结果渲染为文本。"""
+    title = BOOK_TITLES[listing['book']][1 if is_trad else 0]
+    tone = listing['tone'] or ''
+    head = (f"{title}·{listing['name']}{tone}：共{listing['total']}字，"
+            f"第{listing['page']}/{listing['pages']}頁" if is_trad else
+            f"{title}·{listing['name']}{tone}：共{listing['total']}字，第{listing['page']}/{listing['pages']}页")
+    return f"{head}\n{listing['hanzi']}"
+
+
+def render_rhyme_groups(groups: list[dict], book: str, is_trad: bool = False) -> str:
+    """把 rhyme_groups 的结果渲染为文本，每部一行。"""
+    lines = [BOOK_TITLES[book][1 if is_trad else 0]]
+    for item in groups:
+        counts = '，'.join(f'{tone}{count}字' for tone, count in item['counts'].items())
+        lines.append(f"{item['group']:>3} {item['name']}（{counts}）")
+    return '\n'.join(lines)
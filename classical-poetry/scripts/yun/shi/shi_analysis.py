@@ -0,0 +1,41 @@
+"""一首诗逐字的平仄与韵部，只查一次，供 ShiRhythm 与 ShiFirst 在各候选句长、平仄方向下共用。"""
+from yun.common.common import hanzi_to_pingze, hanzi_to_yun, pingze_string
+
+
+class PoemAnalysis:
+    def __init__(self, poem: str, yun_shu: int, is_trad: bool):
+        self.poem = poem
+        self.yun_shu = yun_shu
+        self.is_trad = is_trad
+        self.pingze = pingze_string(poem, yun_shu)  # 逐字平仄代码，与诗等长
+        self._hanzi_pingze = dict(zip(poem, self.pingze))
+        self._rhythms = {}
+        self._ci_lin = {}
+
+    def splice(self, start: int, end: int, hanzis: str):
+        """把诗的第 start 到 end 字换成 hanzis，只查新字的平仄，其余字的结果照旧。"""
+        self.poem = self.poem[:start] + hanzis + self.poem[end:]
+        self.pingze = self.pingze[:start] + self.line_pingze(hanzis) + self.pingze[end:]
+
+    def hanzi_pingze(self, hanzi: str) -> str:
+        """与 hanzi_to_pingze 相同，诗中的字直接取已算好的结果。"""
+        ping_ze = self._hanzi_pingze.get(hanzi)
+        if ping_ze is None:
+            ping_ze = self._hanzi_pingze[hanzi] = hanzi_to_pingze(hanzi, self.yun_shu, self.is_trad)
+        return ping_ze
+
+    def line_pingze(self, line: str) -> str:
+        """一句的平仄代码串。"""
+        return ''.join(self.hanzi_pingze(hanzi) for hanzi in line)
+
+    def rhythm(self, hanzi: str) -> list[int]:
+        """与 hanzi_to_yun 相同，每个字只查一次。返回副本，调用方可以自行排序。"""
+        if hanzi not in self._rhythms:
+            self._rhythms[hanzi] = hanzi_to_yun(hanzi, self.yun_shu, self.is_trad)
+        return list(self._rhythms[hanzi])
+
+    def ci_lin(self, hanzi: str) -> list[int]:
+        """与 hanzi_to_yun(ci_lin=True) 相同，每个字只查一次。"""
+        if hanzi not in self._ci_lin:
+            self._ci_lin[hanzi] = hanzi_to_yun(hanzi, self.yun_shu, self.is_trad, ci_lin=True)
+        return list(self._ci_lin[hanzi])
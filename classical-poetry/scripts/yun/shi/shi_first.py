@@ -3,13 +3,14 @@ from yun.common.common import hanzi_to_pingze
 
 
 class ShiFirst:
-    def __init__(self, poem, yun_shu, first_yayun, poem_pingze, set_len, is_trad):
+    def __init__(self, poem, yun_shu, first_yayun, poem_pingze, set_len, is_trad, analysis=None):
         self.poem = poem
         self.yun_shu = yun_shu
         self.first_yayun = first_yayun
         self.poem_pingze = poem_pingze
         self.set_len = set_len
         self.is_trad = is_trad
+        self.analysis = analysis  # ShiRhythm 传入的 PoemAnalysis，已查过的字不再重复查询
 
     @staticmethod
     def _match_combinations(poem_str: str) -> list[str]:
@@ -40,6 +41,8 @@ class ShiFirst:
         Returns:
             二四五字对应平仄代号的字符串
         """
+        if self.analysis is not None:
+            return self.analysis.line_pingze(poem_sen[1] + poem_sen[3] + poem_sen[-1])
         hanzi1 = hanzi_to_pingze(poem_sen[1], self.yun_shu, self.is_trad)
         hanzi3 = hanzi_to_pingze(poem_sen[3], self.yun_shu, self.is_trad)
         hanzi5 = hanzi_to_pingze(poem_sen[-1], self.yun_shu, self.is_trad)
@@ -0,0 +1,44 @@
+"""诗句平仄与律句格式的批量比对，可选的 numpy 引擎。整首诗一次算出每句对每个候选格式的不合字数。"""
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，缺失时只能使用默认的逐字比对
+    np = None
+
+
+class ShiMeter:
+    def __init__(self, pingze: str, sen_len: int, patterns: list[str]):
+        """
+        Args:
+            pingze: 整首诗逐字的平仄代码串
+            sen_len: 句长 5 或 7
+            patterns: 句长为 sen_len 的全部候选格式，0中 1平 2仄
+        """
+        if np is None:
+            raise RuntimeError('numpy 引擎需要先安装 numpy')
+        total_lines = len(pingze) // sen_len
+        codes = np.frombuffer(pingze[:total_lines * sen_len].encode('ascii'), dtype=np.uint8)
+        tones = (codes - ord('0')).astype(np.int8).reshape(total_lines, sen_len)  # 0多音 1平 2仄 3生僻
+        rules = np.array([[int(ch) for ch in pattern] for pattern in patterns], dtype=np.int8).reshape(-1, sen_len)
+        # right[格式代码, 平仄代码]：中可平可仄；平位接受平与多音；仄位接受仄与多音；生僻字只能落在中位
+        right = np.array([[True, True, True, True],
+                          [True, True, False, False],
+                          [True, False, True, False]])
+        self._right = right[rules[np.newaxis, :, :], tones[:, np.newaxis, :]]  # 句 × 格式 × 字
+        self._scores = (~self._right).sum(axis=2)
+        self._column = {pattern: idx for idx, pattern in enumerate(patterns)}
+
+    def matches(self, sen_idx: int, patterns: list[str]) -> list[tuple[int, list[bool]]]:
+        """
+        取出某一句对给定格式的比对结果。
+        Args:
+            sen_idx: 句子序号
+            patterns: 候选格式
+        Returns:
+            每个格式的（平仄不合字数, 表示该字平仄正确与否的布尔列表）
+        """
+        result = []
+        for pattern in patterns:
+            column = self._column[pattern]
+            result.append((int(self._scores[sen_idx, column]), self._right[sen_idx, column].tolist()))
+        return result
@@ -4,13 +4,15 @@ from collections import defaultdict
 
 from yun.rhythm.pingshui_rhythm import rhythm_name, rhythm_name_trad, rhythm_correspond  # 平水韵模块
 import yun.rhythm.new_rhythm as nw
-from yun.common.common import hanzi_rhythm, hanzi_to_pingze, hanzi_to_yun, result_check
 from yun.common.num_to_cn import num_to_cn
+from yun.common.result import CheckResult, ResultLine, RhymeInfo, better_result
+from yun.shi.shi_analysis import PoemAnalysis  # 逐字平仄、韵部只查一次
 from yun.shi.shi_first import ShiFirst  # 判断首句格式
+from yun.shi.shi_meter import ShiMeter  # numpy 批量比对平仄
 
 
 class ShiRhythm:
-    def __init__(self, yun_shu, poem, comma_pos, is_trad):
+    def __init__(self, yun_shu, poem, comma_pos, is_trad, engine='python'):
         self.lyu_ju_rule_dict = {
             1: ['11221', '21121', '11121'],  # 平起押韵
             2: ['01122', '11212'],  # 平起不押韵
@@ -27,6 +29,9 @@ class ShiRhythm:
         self.poem = poem
         self.comma_pos = comma_pos
         self.is_trad = is_trad
+        self.engine = engine  # 'python' 逐字比对，'numpy' 整首诗一次比对
+        self._meter = None
+        self.analysis = PoemAnalysis(poem, yun_shu, is_trad)
 
     @staticmethod
     def _infer_sen_len(poem: str) -> int:
@@ -78,13 +83,8 @@ class ShiRhythm:
             Returns:
                 返回共同韵部的列表，如果没有共同韵部，返回 False。
             """
-        if self.yun_shu == 1:
-            first_list = hanzi_rhythm(first_hanzi, self.is_trad)  # 平水
-            other_list = [hanzi_rhythm(other_hanzi, self.is_trad) for other_hanzi in other_hanzis]
-        else:  # 新韵通韵
-            yun_shu = nw.xin_yun if self.yun_shu == 2 else nw.tong_yun
-            first_list = nw.convert_yun(nw.get_new_yun(first_hanzi), yun_shu)
-            other_list = [nw.convert_yun(nw.get_new_yun(other_hanzi), yun_shu) for other_hanzi in other_hanzis]
+        first_list = self.analysis.rhythm(first_hanzi)  # 平水或新韵通韵
+        other_list = [self.analysis.rhythm(other_hanzi) for other_hanzi in other_hanzis]
         all_unknown = True
         for _ in other_list:
             if _ != [107]:
@@ -94,8 +94,8 @@ class ShiRhythm:
             return first_list
         duplicates = set(first_list) & set(self._most_frequent_rhythm(other_list, lis=True))
         if self.yun_shu == 1 and not duplicates:  # 使用平水韵时首句检测词林，首句可能押邻韵
-            first_ci = hanzi_rhythm(first_hanzi, self.is_trad, ci_lin=True)
-            second_ci = hanzi_rhythm(other_hanzis[0],self.is_trad, ci_lin=True)
+            first_ci = self.analysis.ci_lin(first_hanzi)
+            second_ci = self.analysis.ci_lin(other_hanzis[0])
             duplicates = set(first_ci) & set(second_ci)
         if duplicates:
             return list(duplicates)
@@ -137,8 +137,46 @@ class ShiRhythm:
             extracted.insert(0, first_hanzi)
         return ''.join(extracted), first_yayun, first_hanzi, other_hanzis
 
+    def _all_patterns(self, sen_len: int) -> list[str]:
+        """句长为 sen_len 的全部候选律句格式，包括平韵、仄韵两种情况下的格式。"""
+        patterns = {pattern for rule_patterns in self.lyu_ju_rule_dict.values() for pattern in rule_patterns}
+        patterns.update(['21221', '02022', '0102022'])  # _lyu_ju 按平韵、仄韵改写规则时增删的格式
+        return sorted(pattern for pattern in patterns if len(pattern) == sen_len)
+
+    def _pattern_matches(self, sentence: str, patterns: list[str],
+                         sen_idx: int | None = None) -> list[tuple[int, list[bool]]]:
+        """
+            比对一个句子与各个候选格式。
+            Args:
+                sentence: 诗的单个句子
+                patterns: 候选格式
+                sen_idx: 句子序号，给出时使用 numpy 引擎预先算好的结果
+            Returns:
+                每个格式的（平仄不合字数, 表示该字平仄正确与否的布尔列表）
+            """
+        if self._meter is not None and sen_idx is not None:
+            return self._meter.matches(sen_idx, patterns)
+        sentence_pattern = self.analysis.line_pingze(sentence)
+        result = []
+        for pattern in patterns:
+            match_list = [False] * len(sentence_pattern)
+            match_score = 0
+
+            for i_ljuju, (s_char, p_char) in enumerate(zip(sentence_pattern, pattern)):
+                if p_char == '0':
+                    match_list[i_ljuju] = True
+                elif p_char == '1' and s_char in '01':
+                    match_list[i_ljuju] = True
+                elif p_char == '2' and s_char in '02':
+                    match_list[i_ljuju] = True
+
+                if not match_list[i_ljuju]:
+                    match_score += 1  # 记录平仄不匹配的个数
+            result.append((match_score, match_list))
+        return result
+
     def _lyu_ju(self, sentence: str, rule: int, poem_pingze: int,
-                input_flag: int = 0) -> tuple[list[bool], int, str, str]:
+                input_flag: int = 0, sen_idx: int | None = None) -> tuple[list[bool], int, str, str]:
         """
             判断一个句子是不是律句，包括拗句。
             Args:
@@ -146,6 +184,7 @@ class ShiRhythm:
                 rule: 句子匹配的对应规则代码
                 input_flag: 拗句标记代码
                 poem_pingze: 诗的平仄代码
+                sen_idx: 句子序号，使用 numpy 引擎时给出
             Returns:
                 返回三个值：
                     表示该字平仄正确与否的布尔列表
@@ -166,25 +205,9 @@ class ShiRhythm:
         else:
             patterns = self.lyu_ju_rule_dict[rule]
 
-        sentence_pattern = ''.join(hanzi_to_pingze(char, self.yun_shu, self.is_trad) for char in sentence)
-
         best_match = None
         best_match_score = float('inf')
-        for pattern in patterns:
-            match_list = [False] * len(sentence_pattern)
-            match_score = 0
-
-            for i_ljuju, (s_char, p_char) in enumerate(zip(sentence_pattern, pattern)):
-                if p_char == '0':
-                    match_list[i_ljuju] = True
-                elif p_char == '1' and s_char in '01':
-                    match_list[i_ljuju] = True
-                elif p_char == '2' and s_char in '02':
-                    match_list[i_ljuju] = True
-
-                if not match_list[i_ljuju]:
-                    match_score += 1  # 记录平仄不匹配的个数
-
+        for pattern, (match_score, match_list) in zip(patterns, self._pattern_matches(sentence, patterns, sen_idx)):
             if match_score < best_match_score:
                 best_match_score = match_score
                 best_match = (pattern, match_list)
@@ -218,8 +241,8 @@ class ShiRhythm:
                     修正后的 sen_type
                     修正后的 second
             """
-        last1 = hanzi_to_pingze(first_sen[-1], self.yun_shu, self.is_trad)
-        last3 = hanzi_to_pingze(first_sen[-3], self.yun_shu, self.is_trad)
+        last1 = self.analysis.hanzi_pingze(first_sen[-1])
+        last3 = self.analysis.hanzi_pingze(first_sen[-3])
         if last1 not in ['0', '3']:
             return sen_type, second
         change_dict = {1: 2, 3: 4, 4: 3, 2: 1, 5: 6, 6: 5, 7: 8, 8: 7}
@@ -269,7 +292,7 @@ class ShiRhythm:
                     first_sen_type = ze_turn_rule[first_sen_type]
         return sen_list
 
-    def _yun_jiao_show(self, zi: str, poem_rhythm_num: int, is_first_sentence: bool) -> str:
+    def _yun_jiao_show(self, zi: str, poem_rhythm_num: int, is_first_sentence: bool) -> tuple[str, bool | None]:
         """
             展示韵脚。
             Args:
@@ -277,23 +300,21 @@ class ShiRhythm:
                 poem_rhythm_num: 诗所押的韵的数字表示
                 is_first_sentence: 是否为首句
             Returns:
-                韵脚的展示结果
+                返回两个值：
+                    韵脚的展示结果
+                    是否押韵，不知韵部时为 None
             """
         yun_jiao_content = ''
         zi_list = []
         yun = '韻' if self.is_trad else '韵'
         lin = '鄰' if self.is_trad else '邻'
+        zi_rhythm = self.analysis.rhythm(zi)
         if self.yun_shu == 1:
-            zi_rhythm = hanzi_rhythm(zi, self.is_trad)
             zi_rhythm.sort()
             using_name = rhythm_name_trad if self.is_trad else rhythm_name
             for _ in zi_rhythm:
                 zi_list.append(''.join(using_name)[_ - 1])
         else:
-            if self.yun_shu == 2:
-                zi_rhythm = nw.convert_yun(nw.get_new_yun(zi), nw.xin_yun)
-            else:
-                zi_rhythm = nw.convert_yun(nw.get_new_yun(zi), nw.tong_yun)
             if zi_rhythm != [107]:
                 if self.yun_shu == 2:
                     using_xin = nw.xin_hanzi_trad if self.is_trad else nw.xin_hanzi
@@ -324,11 +345,12 @@ class ShiRhythm:
                 yun_jiao_content += f'{"、".join(zi_list)}{yun} ' + f'不押{yun} '
             else:
                 yun_jiao_content += f'{"、".join(zi_list)}{yun} ' + f'用{lin}韵 押{yun} '
+                if_ya_yun = True
         else:
             yun_jiao_content += f'{"、".join(zi_list)}{yun} ' + f'{"" if if_ya_yun else "不"}押{yun} '
         if '�' in yun_jiao_content or '？' in yun_jiao_content or yun_jiao_content == f'{yun} 不押{yun} ':
-            yun_jiao_content = f'不知{yun}部'  # 生僻字处理模块
-        return yun_jiao_content
+            return f'不知{yun}部', None  # 生僻字处理模块
+        return yun_jiao_content, if_ya_yun
 
     def _sentence_show(self, show_sentence: str, sen_ge_lyu: list[bool]) -> str:
         """
@@ -341,8 +363,7 @@ class ShiRhythm:
             """
         sp_zi = []
         ge_lju_show = ''
-        for char in show_sentence:
-            ping_ze = hanzi_to_pingze(char, self.yun_shu, self.is_trad)
+        for ping_ze in self.analysis.line_pingze(show_sentence):
             sp_zi.append('duo') if ping_ze == '0' else sp_zi.append('no') if ping_ze != '3' else sp_zi.append('pi')
 
         for i, is_valid in enumerate(sen_ge_lyu):
@@ -362,10 +383,10 @@ class ShiRhythm:
             Returns:
                 第二个判断标准（两者平仄是否相同）
             """
-        ping_ze1 = hanzi_to_pingze(hanzi1, self.yun_shu, self.is_trad)
+        ping_ze1 = self.analysis.hanzi_pingze(hanzi1)
         if ping_ze1 == '3':
             ping_ze1 = '0'
-        ping_ze2 = hanzi_to_pingze(hanzi2, self.yun_shu, self.is_trad)
+        ping_ze2 = self.analysis.hanzi_pingze(hanzi2)
         if ping_ze2 == '3':
             ping_ze2 = '0'
         if ping_ze1 + ping_ze2 in ['12', '21']:
@@ -387,7 +408,7 @@ class ShiRhythm:
                 是否全部为多音字
             """
         for i in yun_jiao_content:
-            ping_ze = hanzi_to_pingze(i, self.yun_shu, self.is_trad)
+            ping_ze = self.analysis.hanzi_pingze(i)
             if ping_ze != '0':
                 return False
         return True
@@ -420,21 +441,27 @@ class ShiRhythm:
         inter = set(f_rhythm) & {this_rhythm}
         return next(iter(inter)) if inter else f_rhythm[0]
 
+    def _first_sentence_type(self, sen_len: int, s_rhythm: int, pingze: int) -> int:
+        """由 ShiFirst 推断首句的规则代码。"""
+        first_checker = ShiFirst(self.poem, self.yun_shu, s_rhythm, pingze, sen_len, self.is_trad, self.analysis)
+        return first_checker.main_first()
+
     def _build_report(self, maybe_len, main_rhythm, f_rhythm,
-                      f_hanzi, s_hanzi, pingze):
-        """为单平仄方向生成完整报告"""
+                      f_hanzi, s_hanzi, pingze) -> CheckResult:
+        """为单平仄方向生成完整的结构化结果"""
         sen_len = maybe_len or self._infer_sen_len(self.poem)
         total_lines = len(self.poem) // sen_len
         poem_type = self._infer_poem_type(total_lines)
 
-        report = f'{num_to_cn(sen_len)}言{poem_type}\n'
+        lines = []
 
         s_rhythm = self._special_two_pingze(f_hanzi, s_hanzi, pingze)
-        first_checker = ShiFirst(self.poem, self.yun_shu, s_rhythm, pingze, sen_len, self.is_trad)
         first_type, s_rhythm = self._check_real_first(f_rhythm, s_rhythm,
                                                       self.poem[:sen_len],
-                                                      first_checker.main_first())
+                                                      self._first_sentence_type(sen_len, s_rhythm, pingze))
         rule_list = self._which_sentence(first_type, total_lines, s_rhythm, pingze)
+        if self.engine == 'numpy':
+            self._meter = ShiMeter(self.analysis.pingze, sen_len, self._all_patterns(sen_len))
 
         # 逐句扫描
         yun_positions = list(range(2, total_lines + 1, 2))
@@ -446,7 +473,7 @@ class ShiRhythm:
         lian = "聯" if self.is_trad else '联'
         for idx, rule in enumerate(rule_list):
             sentence = self.poem[sen_len * idx: sen_len * (idx + 1)]
-            ge_lju, sen_mode, hint, ao = self._lyu_ju(sentence, rule, pingze, sen_mode)
+            ge_lju, sen_mode, hint, ao = self._lyu_ju(sentence, rule, pingze, sen_mode, idx)
             hint_buf += hint + '\u3000'
             sen_buf += sentence + '\u3000'
             ao_buf += (f'\n本{lian}{"上" if idx % 2 == 0 else "下"}句' + ao) if ao else ''
@@ -454,12 +481,13 @@ class ShiRhythm:
 
             # 逢押韵句
             if idx + 1 in yun_positions:
-                yun_info = self._yun_jiao_show(sentence[-1], main_rhythm, idx == 0)
+                yun_info, rhymed = self._yun_jiao_show(sentence[-1], main_rhythm, idx == 0)
                 ge_buf = self._mark_yun(ge_buf, yun_info)
-                report += f'\n{hint_buf}\n{sen_buf}{yun_info}\n{ge_buf}{ao_buf}\n'
+                lines.append(ResultLine(hint_buf, sen_buf, ge_buf, RhymeInfo(sentence[-1], yun_info, rhymed), ao_buf))
                 hint_buf = sen_buf = ge_buf = ao_buf = ''
 
-        return report
+        return CheckResult('shi', f'{num_to_cn(sen_len)}言{poem_type}', lines, self.is_trad,
+                           meta={'sentence_length': sen_len, 'lines_count': total_lines})
 
     @staticmethod
     def _mark_yun(ge_buf: str, yun_info: str) -> str:
@@ -471,11 +499,11 @@ class ShiRhythm:
         return ge_buf
 
     @staticmethod
-    def _merge_results(results: list[str]) -> str:
-        """多候选结果合并策略，这里简单取最后一个非空"""
-        best = ''
+    def _merge_results(results: list[CheckResult]) -> CheckResult:
+        """多候选结果按分数比较，分数相同时取后一个"""
+        best = None
         for r in results:
-            best = result_check(best, r)
+            best = better_result(best, r)
         return best
 
     def main_shi(self) -> str | int:
@@ -484,6 +512,17 @@ class ShiRhythm:
         Returns:
             校验文本 或 错误码 1/2
         """
+        result = self.check()
+        if isinstance(result, int):
+            return result
+        return result.render().lstrip()
+
+    def check(self) -> CheckResult | int:
+        """
+        诗歌格律校验，返回最匹配的结构化结果
+        Returns:
+            校验结果 或 错误码 1/2
+        """
         # 1. 快速失败：句长不合法
         if self.comma_pos:
             sen_len = self._check_sentence_lengths()
@@ -497,7 +536,7 @@ class ShiRhythm:
         results = []
         for maybe_len in candidates:
             yun_jiaos, f_rhythm, f_hanzi, s_hanzi = self._poetry_yun_jiao(maybe_len)
-            rhythms = [hanzi_to_yun(y, self.yun_shu, self.is_trad) for y in yun_jiaos]
+            rhythms = [self.analysis.rhythm(y) for y in yun_jiaos]
 
             # 2.1 未知韵部过多
             if all(r == [107] or not r for r in rhythms):
@@ -517,4 +556,4 @@ class ShiRhythm:
                 results.append(self._build_report(maybe_len, main_rhythm, f_rhythm,
                                                   f_hanzi, s_hanzi, pz))
 
-        return self._merge_results(results).lstrip()
+        return self._merge_results(results)
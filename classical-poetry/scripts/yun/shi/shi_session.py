@@ -0,0 +1,156 @@
+"""
+编辑器中逐键修改一首诗时的增量校验。
+会话保存原文、去标点后的诗与句读位置，按字修改时只改动受影响的部分；校验沿用 ShiRhythm 的流程，
+但逐句的律句比对、平仄标记、韵脚展示、首句格式推断与首句入韵判断都按各自的全部输入缓存，
+只有输入变了的句子、韵脚与首句才重新计算，因此结果与整首重新校验完全相同。
+"""
+import re
+
+from yun.common.result import CheckResult
+from yun.common.text_proceed import PAIRED_SYMBOLS, SYMBOL_PATTERN, is_symbol, process_text
+from yun.shi.shi_rhythm import ShiRhythm
+
+_BRACKETS = set("([{（【《<)]}）】》>") | {ch for pair in PAIRED_SYMBOLS for ch in pair}
+_SYMBOL_RUN = re.compile(SYMBOL_PATTERN.pattern + '+')
+MEMO_LIMIT = 4096  # 每种缓存的条目上限，超出时清空，长时间编辑也不会无限增长
+
+
+class _Memo(dict):
+    def put(self, key, value):
+        if len(self) >= MEMO_LIMIT:
+            self.clear()
+        self[key] = value
+        return value
+
+
+class IncrementalShiRhythm(ShiRhythm):
+    """在多次校验之间保留逐句结果的 ShiRhythm，由 ShiSession 在每次修改后更新 poem 与 comma_pos。"""
+
+    def __init__(self, yun_shu, poem, comma_pos, is_trad):
+        super().__init__(yun_shu, poem, comma_pos, is_trad)
+        self._lyu_ju_memo = _Memo()
+        self._show_memo = _Memo()
+        self._yun_memo = _Memo()
+        self._first_memo = _Memo()
+        self._first_hard_memo = _Memo()
+
+    def _lyu_ju(self, sentence, rule, poem_pingze, input_flag=0, sen_idx=None):
+        key = (sentence, rule, poem_pingze, input_flag)
+        if key not in self._lyu_ju_memo:
+            return self._lyu_ju_memo.put(key, super()._lyu_ju(sentence, rule, poem_pingze, input_flag))
+        return self._lyu_ju_memo[key]
+
+    def _sentence_show(self, show_sentence, sen_ge_lyu):
+        key = (show_sentence, tuple(sen_ge_lyu))
+        if key not in self._show_memo:
+            return self._show_memo.put(key, super()._sentence_show(show_sentence, sen_ge_lyu))
+        return self._show_memo[key]
+
+    def _yun_jiao_show(self, zi, poem_rhythm_num, is_first_sentence):
+        key = (zi, poem_rhythm_num, is_first_sentence)
+        if key not in self._yun_memo:
+            return self._yun_memo.put(key, super()._yun_jiao_show(zi, poem_rhythm_num, is_first_sentence))
+        return self._yun_memo[key]
+
+    def _first_hard(self, first_hanzi, other_hanzis):
+        key = (first_hanzi, other_hanzis)
+        if key not in self._first_hard_memo:
+            self._first_hard_memo.put(key, super()._first_hard(first_hanzi, other_hanzis))
+        common = self._first_hard_memo[key]
+        return list(common) if common else common
+
+    def _first_sentence_type(self, sen_len, s_rhythm, pingze):
+        key = (sen_len, s_rhythm, pingze, len(self.poem), self._first_codes(sen_len))
+        if key not in self._first_memo:
+            return self._first_memo.put(key, super()._first_sentence_type(sen_len, s_rhythm, pingze))
+        return self._first_memo[key]
+
+    def _first_codes(self, sen_len: int) -> str:
+        """ShiFirst 只看每句末五字中的第二、四、五字，取这些字的平仄作为缓存键；句长不整齐时取全诗平仄。"""
+        pingze = self.analysis.pingze
+        if len(pingze) % sen_len:
+            return pingze
+        offset = sen_len - 5
+        return ''.join(pingze[start + offset + 1] + pingze[start + offset + 3] + pingze[start + sen_len - 1]
+                       for start in range(0, len(pingze), sen_len))
+
+
+class ShiSession:
+    def __init__(self, text: str, yun_shu: int, is_trad: bool):
+        """
+        Args:
+            text: 编辑器中的原文，含标点
+            yun_shu: 使用的韵书代号
+            is_trad: 簡體 or 繁體
+        """
+        self.text = text
+        self.yun_shu = yun_shu
+        self.poem, self.comma_pos = process_text(text)
+        self._plain = not _BRACKETS.intersection(text)
+        self._rhythm = IncrementalShiRhythm(yun_shu, self.poem, self.comma_pos, is_trad)
+
+    def replace(self, pos: int, chars: str, length: int | None = None):
+        """把原文第 pos 个字符起的 length 个字符（默认与 chars 等长）换成 chars。"""
+        self._edit(pos, pos + (len(chars) if length is None else length), chars)
+
+    def insert(self, pos: int, chars: str):
+        """在原文第 pos 个字符前插入 chars。"""
+        self._edit(pos, pos, chars)
+
+    def delete(self, pos: int, length: int = 1):
+        """删除原文第 pos 个字符起的 length 个字符。"""
+        self._edit(pos, pos + length, '')
+
+    def set_text(self, text: str):
+        """整体替换原文，已缓存的逐句结果仍可复用。"""
+        self._edit(0, len(self.text), text)
+
+    def _edit(self, start: int, end: int, chars: str):
+        text = self.text
+        start, end = max(0, min(start, len(text))), max(0, min(end, len(text)))
+        end = max(start, end)
+        removed = text[start:end]
+        self.text = text[:start] + chars + text[end:]
+        if self._fast_edit(text, start, end, removed, chars):
+            return
+        poem, comma_pos = process_text(self.text)
+        self._plain = not _BRACKETS.intersection(self.text)
+        self._set_poem(0, len(self.poem), poem, comma_pos)
+
+    def _fast_edit(self, text: str, start: int, end: int, removed: str, chars: str) -> bool:
+        """
+        只增删改汉字、且不使前后的标点连成一片或断开时，直接推算去标点后的诗与句读位置，不再整段处理原文。
+        Returns:
+            是否已按快速路径更新
+        """
+        if not self._plain or _BRACKETS.intersection(chars):
+            return False
+        if any(is_symbol(ch) for ch in removed) or any(is_symbol(ch) for ch in chars):
+            return False
+        if not removed or not chars:  # 纯插入或纯删除时，两侧都是标点会改变标点的合并
+            left = text[start - 1] if start > 0 else ''
+            right = text[end] if end < len(text) else ''
+            if left and right and is_symbol(left) and is_symbol(right):
+                return False
+        before = text[:start]
+        clean_start = len(SYMBOL_PATTERN.sub('', before))
+        runs_before = len(_SYMBOL_RUN.findall(before))
+        shift = len(chars) - len(removed)
+        comma_pos = self.comma_pos[:runs_before] + [pos + shift for pos in self.comma_pos[runs_before:]]
+        self._set_poem(clean_start, clean_start + len(removed), chars, comma_pos)
+        return True
+
+    def _set_poem(self, start: int, end: int, hanzis: str, comma_pos: list[int]):
+        self.poem = self.poem[:start] + hanzis + self.poem[end:]
+        self.comma_pos = comma_pos
+        self._rhythm.analysis.splice(start, end, hanzis)
+        self._rhythm.poem = self.poem
+        self._rhythm.comma_pos = comma_pos
+
+    def check(self) -> CheckResult | int:
+        """
+        校验当前的诗，与对原文整首调用 ShiRhythm.check 的结果相同
+        Returns:
+            校验结果 或 错误码 1/2
+        """
+        return self._rhythm.check()
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from batch_checker import check_stream
+from poem_source import jsonl_poems
+
+MIXED_JSONL = "\n".join([
+    json.dumps({"id": 1, "text": "床前明月光，疑是地上霜。举头望明月，低头思故乡。"}, ensure_ascii=False),
+    "123",
+    "[1, 2]",
+    "null",
+    json.dumps("春眠不觉晓，处处闻啼鸟。夜来风雨声，花落知多少。", ensure_ascii=False),
+    "{bad",
+    json.dumps({"id": 7, "text": 5}),
+    json.dumps({"text": "床前明月光，疑是地上霜。举头望明月，低头思故乡。", "mode": "ping"}, ensure_ascii=False),
+    json.dumps({"text": "床前明月光，疑是地上霜。举头望明月，低头思故乡。", "workers": 4, "engine": "nope",
+                "output_format": "text"}, ensure_ascii=False),
+]) + "\n"
+
+
+class MixedJsonlTest(unittest.TestCase):
+    def _run(self, workers):
+        out = io.StringIO()
+        stats = check_stream(jsonl_poems(io.StringIO(MIXED_JSONL)), {"yun_shu": 1}, out, workers, chunk_size=3)
+        return stats, [json.loads(line) for line in out.getvalue().splitlines()]
+
+    def _check(self, workers):
+        stats, records = self._run(workers)
+        self.assertEqual([record["index"] for record in records], list(range(9)))
+        self.assertEqual(stats, {"poems": 9, "errors": 6, "shi": 3, "ci": 0})
+        self.assertEqual(records[0]["id"], 1)
+        self.assertNotIn("error", records[0]["result"])
+        self.assertNotIn("error", records[4]["result"])
+        for index in (1, 2, 3, 5, 6):
+            self.assertIn("error", records[index]["result"])
+        self.assertEqual(records[6]["id"], 7)
+        # 只认 shi、ci 两种 mode，其余字段（进程数、引擎、输出格式）一律取批量的设置
+        self.assertIn("error", records[7]["result"])
+        self.assertEqual(records[8]["mode"], "shi")
+        self.assertNotIn("error", records[8]["result"])
+        self.assertIsInstance(records[8]["result"], dict)
+
+    def test_inline(self):
+        self._check(workers=1)
+
+    def test_pool(self):
+        self._check(workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
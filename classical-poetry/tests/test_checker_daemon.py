@@ -0,0 +1,76 @@
+import os
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import checker_daemon
+from checker_daemon import code_version, send_job
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 Unix 套接字")
+class SendJobTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chmod(self.tmp.name, 0o700)
+        self.path = os.path.join(self.tmp.name, "checker.sock")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(1)
+
+    def tearDown(self):
+        self.listener.close()
+        self.tmp.cleanup()
+
+    def _reply_once(self, payload):
+        def run():
+            conn, _ = self.listener.accept()
+            with conn:
+                conn.makefile("rb").readline()
+                conn.sendall(payload)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread
+
+    def test_reply(self):
+        thread = self._reply_once(b'{"ok": true, "result": 1}\n')
+        self.assertEqual(send_job({"mode": "ping"}, self.path), {"ok": True, "result": 1})
+        thread.join()
+
+    def test_truncated_reply(self):
+        thread = self._reply_once(b'{"ok": tr')
+        self.assertIsNone(send_job({"mode": "ping"}, self.path))
+        thread.join()
+
+    def test_no_daemon(self):
+        self.assertIsNone(send_job({"mode": "ping"}, os.path.join(self.tmp.name, "missing.sock")))
+
+
+class CodeVersionTest(unittest.TestCase):
+    def test_tracks_code_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            os.makedirs(os.path.join(root, "yun", "ci_pu", "ci_list"))
+            with open(os.path.join(root, "a.py"), "w") as handle:
+                handle.write("x = 1\n")
+            first = code_version(root)
+            # 同一进程内只计算一次
+            with open(os.path.join(root, "a.py"), "w") as handle:
+                handle.write("x = 22\n")
+            self.assertEqual(code_version(root), first)
+            checker_daemon._versions.clear()
+            second = code_version(root)
+            self.assertNotEqual(second, first)
+            # 词谱 JSON 目录不参与版本
+            with open(os.path.join(root, "yun", "ci_pu", "ci_list", "1.json"), "w") as handle:
+                handle.write("{}")
+            checker_daemon._versions.clear()
+            self.assertEqual(code_version(root), second)
+            checker_daemon._versions.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
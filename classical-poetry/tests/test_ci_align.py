@@ -0,0 +1,88 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.ci.ci_align import CHAR_GAP, INF, SEP, SEP_GAP, _sub_cost, align, tokens
+
+
+def full_align_cost(source, target):
+    """不限带宽、存满整个矩阵的编辑距离，作为带状对齐的参照。"""
+    n, m = len(source), len(target)
+    cost = [[INF] * (m + 1) for _ in range(n + 1)]
+    cost[0][0] = 0.0
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if i:
+                cost[i][j] = min(cost[i][j], cost[i - 1][j] + (SEP_GAP if source[i - 1] == SEP else CHAR_GAP))
+            if j:
+                cost[i][j] = min(cost[i][j], cost[i][j - 1] + (SEP_GAP if target[j - 1] == SEP else CHAR_GAP))
+            if i and j:
+                cost[i][j] = min(cost[i][j], cost[i - 1][j - 1] + _sub_cost(source[i - 1], target[j - 1]))
+    return cost[n][m]
+
+
+def path_cost(source, target, path):
+    total = 0.0
+    for i, j in path:
+        if i < 0:
+            total += SEP_GAP if target[j] == SEP else CHAR_GAP
+        elif j < 0:
+            total += SEP_GAP if source[i] == SEP else CHAR_GAP
+        else:
+            total += _sub_cost(source[i], target[j])
+    return total
+
+
+class AlignTest(unittest.TestCase):
+    def test_tokens(self):
+        self.assertEqual(tokens("1212", [1, 3]), ("12|12", [0, 1, -1, 2, 3]))
+
+    def test_missing_char(self):
+        cost, path = align("12|1", "平仄|仄平", 2)
+        self.assertEqual(cost, CHAR_GAP)
+        self.assertEqual(path, [(0, 0), (1, 1), (2, 2), (-1, 3), (3, 4)])
+
+    def test_band_and_cutoff(self):
+        self.assertEqual(align("1", "平仄平仄", 2), (INF, []))
+        self.assertEqual(align("2222", "平平平平", 1, cutoff=2)[0], INF)
+
+    def test_random_against_full_matrix(self):
+        rnd = random.Random(7)
+        for _ in range(500):
+            n = rnd.randint(0, 20)
+            m = max(0, n + rnd.randint(-3, 3))
+            source = "".join(rnd.choice("0123|") for _ in range(n))
+            target = "".join(rnd.choice("平仄中|") for _ in range(m))
+            # 带宽足够大时与整矩阵的结果相同，路径的代价与返回的代价一致
+            cost, path = align(source, target, max(n, m))
+            self.assertEqual(cost, full_align_cost(source, target))
+            if cost < INF:
+                self.assertEqual(path_cost(source, target, path), cost)
+                self.assertEqual([i for i, _ in path if i >= 0], list(range(n)))
+                self.assertEqual([j for _, j in path if j >= 0], list(range(m)))
+
+
+class FuzzyOptInTest(unittest.TestCase):
+    def _check(self, text, **kwargs):
+        from yun.ci.ci_rhythm import CiRhythm
+        from yun.ci.ci_search import ci_type_extraction, search_ci
+        from yun.common.text_proceed import process_text
+
+        form = ci_type_extraction(search_ci("水调歌头", 1), 1)[0]["origin"]
+        processed, comma_pos = process_text(text(form))
+        return CiRhythm(1, "水调歌头", processed, comma_pos, "", 1, False, **kwargs).check()
+
+    def test_strict_by_default(self):
+        self.assertEqual(self._check(lambda form: form[:3] + form[4:]), 1)
+
+    def test_fuzzy_when_asked(self):
+        result = self._check(lambda form: form[:3] + form[4:], fuzzy_k=2)
+        self.assertNotIsInstance(result, int)
+        self.assertIn("字数不合", result.render())
+
+
+if __name__ == "__main__":
+    unittest.main()
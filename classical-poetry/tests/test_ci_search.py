@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.ci.ci_search import CipaiNameIndex, name_index, search_ci, suggest_cipai
+
+SHUI_DIAO_GE_TOU = 516
+NIAN_NU_JIAO = 614
+HUAN_XI_SHA = 96
+ZHU_ZHI = 0  # 龙谱中没有
+
+
+def _entry(idx, name, pinyins):
+    return {"idx": idx, "names": [name], "names_trad": [name], "pinyins": pinyins, "full": pinyins[0]}
+
+
+class CipaiNameIndexTest(unittest.TestCase):
+    def test_exact_names_and_pinyin(self):
+        index = name_index()
+        for name in ("水调歌头", "水調歌頭", "shuidiaogetou", "sdgt", "SDGT", " Shui Diao Ge Tou "):
+            self.assertEqual(index.exact(name), SHUI_DIAO_GE_TOU, name)
+        # 别名与别名的首字母
+        self.assertEqual(index.exact("大江东去"), NIAN_NU_JIAO)
+        self.assertEqual(index.exact("djdq"), NIAN_NU_JIAO)
+
+    def test_fuzzy(self):
+        index = name_index()
+        self.assertEqual(index.fuzzy("水调哥头"), SHUI_DIAO_GE_TOU)  # 错字
+        self.assertEqual(index.fuzzy("浣沙溪"), HUAN_XI_SHA)  # 两字颠倒
+        self.assertEqual(index.fuzzy("念奴娇娇"), NIAN_NU_JIAO)  # 多字
+        self.assertEqual(index.fuzzy("shuidiaogetuo"), SHUI_DIAO_GE_TOU)  # 拼音差两个字母
+        # 过短的名字与拼音不做容错
+        self.assertIsNone(index.fuzzy("念奴"))
+        self.assertIsNone(index.fuzzy("sdg"))
+
+    def test_fuzzy_ambiguous(self):
+        index = CipaiNameIndex([_entry(0, "甲乙丙", ["jiayibing"]), _entry(1, "甲乙丁", ["jiayiding"])])
+        self.assertIsNone(index.fuzzy("甲乙戊"))
+        self.assertEqual(index.fuzzy("甲乙丙丙"), 0)
+
+    def test_search_ci(self):
+        self.assertEqual(search_ci("sdgt", 2), SHUI_DIAO_GE_TOU)
+        self.assertEqual(search_ci("水调哥头", 1), SHUI_DIAO_GE_TOU)
+        self.assertEqual(search_ci("水调哥头", 1, fuzzy=False), "err1")
+        self.assertEqual(search_ci("zz", 1), ZHU_ZHI)
+        self.assertEqual(search_ci("zz", 2), "err2")
+        self.assertEqual(search_ci("不存在的词牌", 1), "err1")
+
+    def test_suggest(self):
+        self.assertEqual(suggest_cipai("nnj")[0], "念奴娇")
+        self.assertEqual(suggest_cipai("水调", 3, is_trad=True)[0], "水調歌頭")
+        self.assertEqual(suggest_cipai("  "), [])
+        self.assertLessEqual(len(suggest_cipai("s", 5)), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.ci.ci_search import ci_idx, ci_type_extraction, form_store, name_index
+from yun.ci.cipai_db import load_cipai_db, punctuation_positions
+
+
+@unittest.skipIf(load_cipai_db() is None, "没有预编译词谱")
+class CipaiDBTest(unittest.TestCase):
+    def setUp(self):
+        self.db = load_cipai_db()
+
+    def test_search_matches_name_index(self):
+        index = name_index()
+        for item in ci_idx[::25]:
+            for name in item["names"] + item["names_trad"] + item["pinyins"] + [item["full"]]:
+                idx = index.exact(name)
+                self.assertEqual(self.db.search(name, 1), idx)
+                self.assertEqual(self.db.search(name, 2), idx if ci_idx[idx]["long_exist"] else "err2")
+        self.assertEqual(self.db.search(" Shui Diao Ge Tou ", 1), index.exact("水调歌头"))
+        self.assertEqual(self.db.search("不存在的词牌", 1), "err1")
+
+    def test_punctuation_and_rhyme_indexes(self):
+        for ci_number in ("516", "1"):
+            for fmt, form in enumerate(ci_type_extraction(ci_number, 1)):
+                length = len(form["ge_lyu_str"])
+                positions = punctuation_positions("　".join(form["ci_sep"]))
+                self.assertIn((int(ci_number), fmt), self.db.forms_by_punctuation(positions, 1, length))
+                self.assertIn((int(ci_number), fmt), self.db.forms_by_rhyme_pos(form["rhyme_pos"], 1, length))
+                self.assertIn((ci_number, fmt, form_store.masks(ci_number, 1)[fmt]),
+                              self.db.masks_by_length(length, 1))
+
+    def test_masks_by_length_order(self):
+        rows = self.db.masks_by_length(95, 1)
+        numbers = list(dict.fromkeys(n for n, _, _ in rows))
+        self.assertEqual(numbers, self.db.cipai_by_length(95, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
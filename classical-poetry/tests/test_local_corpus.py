@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from local_corpus import LocalCorpus, build_corpus
+
+POEMS = [
+    {"title": "静夜思", "author": "李白", "dynasty": "Tang", "text": "床前明月光，疑是地上霜。举头望明月，低头思故乡。"},
+    {"title": "春晓", "author": "孟浩然", "dynasty": "Tang", "text": "春眠不觉晓，处处闻啼鸟。夜来风雨声，花落知多少。"},
+    {"title": "月夜", "author": "杜甫", "dynasty": "Tang", "type": "WuLv", "rhyme": "寒",
+     "text": "今夜鄜州月，闺中只独看。遥怜小儿女，未解忆长安。香雾云鬟湿，清辉玉臂寒。何时倚虚幌，双照泪痕干。"},
+    {"title": "水调歌头", "author": "苏轼", "dynasty": "Song", "text": "明月几时有，把酒问青天。"},
+]
+
+
+class LocalCorpusTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        source = os.path.join(cls.tmp.name, "poems.jsonl")
+        with open(source, "w", encoding="utf-8") as handle:
+            for poem in POEMS:
+                handle.write(json.dumps(poem, ensure_ascii=False) + "\n")
+            handle.write("{bad\n")
+        cls.path = os.path.join(cls.tmp.name, "corpus.db")
+        cls.counts = build_corpus([source], cls.path)
+        cls.corpus = LocalCorpus(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.corpus._conn.close()
+        cls.tmp.cleanup()
+
+    def test_build(self):
+        poems, clauses, skipped = self.counts
+        self.assertEqual((poems, clauses, len(skipped)), (4, 18, 1))
+
+    def test_scopes(self):
+        self.assertEqual(self.corpus.clauses("明月", "Sentence"), ["床前明月光", "举头望明月", "明月几时有"])
+        self.assertEqual(self.corpus.clauses("李白", "Author"), ["床前明月光", "疑是地上霜", "举头望明月", "低头思故乡"])
+        self.assertEqual(self.corpus.clauses("月夜", "Title")[0], "今夜鄜州月")
+        self.assertEqual(self.corpus.clauses("月", "Title", dynasty="song"), [])
+        # All 合并句中、题目、作者三者的结果，按语料顺序排列
+        self.assertEqual(self.corpus.clauses("春", "All"), ["春眠不觉晓", "处处闻啼鸟", "夜来风雨声", "花落知多少"])
+
+    def test_facets(self):
+        self.assertEqual(self.corpus.clauses("明月", dynasty="SONG"), ["明月几时有"])
+        self.assertEqual(self.corpus.clauses("月", poem_type="WuJue"), ["床前明月光", "举头望明月"])
+        self.assertEqual(self.corpus.clauses("月", rhyme="寒"), self.corpus.clauses("月夜", "Title"))
+        self.assertEqual(self.corpus.clauses("月", dynasty="Tang", poem_type="WuLv", rhyme="阳"), [])
+        self.assertEqual(self.corpus.clauses("月", dynasty="Yuan"), [])
+
+    def test_threads(self):
+        expected = self.corpus.clauses("明月")
+        results = []
+
+        def worker():
+            for _ in range(50):
+                results.append(self.corpus.clauses("明月"))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(result == expected for result in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
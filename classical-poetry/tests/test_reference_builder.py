@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import souyun_api
+from reference_builder import DEFAULT_WORKERS, build_reference
+from souyun_stub import start_stub
+
+LATENCY = 0.2
+PAGES = 8
+
+
+class ParallelPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.server = start_stub(latency=LATENCY)
+        # 默认的限速与令牌桶容量，不缓存
+        souyun_api.configure(base_url=self.server.base_url, cache_mode="off",
+                             rate=souyun_api.DEFAULT_RATE, burst=souyun_api.DEFAULT_BURST)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        souyun_api.configure(cache_mode="off")
+
+    def _build(self, workers):
+        start = time.perf_counter()
+        result = build_reference("秋", PAGES, "All", None, None, None, 30, workers=workers)
+        return result, time.perf_counter() - start
+
+    def test_default_workers_overlap_under_default_rate(self):
+        serial, serial_time = self._build(1)
+        parallel, parallel_time = self._build(DEFAULT_WORKERS)
+        self.assertEqual(parallel, serial)
+        self.assertGreaterEqual(serial_time, PAGES * LATENCY)
+        # 默认设置下四页同时在途，八页约为两页的耗时
+        self.assertLess(parallel_time, serial_time / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.common.common import hanzi_to_yun
+from yun.rhythm.rhyme_index import YUN_SHU_BOOKS, render_rhyme_list, rhyme_groups, rhyme_index, rhyme_list
+
+
+class RhymeIndexTest(unittest.TestCase):
+    def test_group_counts(self):
+        self.assertEqual(len(rhyme_groups("pingshui")), 106)
+        self.assertEqual(len(rhyme_groups("cilin")), 19)
+        self.assertEqual(len(rhyme_groups("xin")), 14)
+
+    def test_parse_group(self):
+        pingshui = rhyme_index("pingshui")
+        for query in ("东", "一东", "上平一东", "平水韵·一东", 1):
+            self.assertEqual(pingshui.parse_group(query), 1, query)
+        self.assertEqual(pingshui.parse_group("下平一先"), 16)
+        self.assertEqual(pingshui.group_name(16, is_trad=True)[-1], "先")
+        self.assertEqual(rhyme_index("cilin").parse_group("第七部"), 7)
+        self.assertEqual(rhyme_index("xin").parse_group("新韵十一庚"), 11)
+        with self.assertRaises(ValueError):
+            pingshui.parse_group("第二百部")
+        with self.assertRaises(ValueError):
+            rhyme_index("unknown")
+
+    def test_reverse_lookup_matches_hanzi_to_yun(self):
+        # 反查索引中的每个字，hanzi_to_yun 都给出它所在的韵部
+        for yun_shu, book in YUN_SHU_BOOKS.items():
+            index = rhyme_index(book)
+            for group, tones in index.groups.items():
+                for tone, hanzis in tones.items():
+                    for hanzi in hanzis[:5]:
+                        nums = hanzi_to_yun(hanzi, yun_shu, False)
+                        code = group if book == "pingshui" or tone == "平" else -group
+                        self.assertIn(code, nums, (book, group, tone, hanzi))
+
+    def test_yun_chars_by_code(self):
+        xin = rhyme_index("xin")
+        self.assertIn("东", xin.yun_chars(hanzi_to_yun("东", 2, False)[0]))
+        self.assertIn("动", xin.yun_chars(hanzi_to_yun("动", 2, False)[0]))
+        self.assertNotIn("动", xin.yun_chars(11))
+
+    def test_rhyme_list_paging(self):
+        full = rhyme_list("pingshui", "一东", page_size=0)
+        self.assertEqual(full["pages"], 1)
+        self.assertEqual(len(full["hanzi"]), full["total"])
+        pages = []
+        page = 1
+        while True:
+            listing = rhyme_list("pingshui", "一东", page=page, page_size=50)
+            pages.append(listing["hanzi"])
+            if page == listing["pages"]:
+                break
+            page += 1
+        self.assertEqual("".join(pages), full["hanzi"])
+        self.assertEqual(rhyme_list("pingshui", 1, page=999, page_size=50)["page"], len(pages))
+        self.assertEqual(rhyme_list("pingshui", 1, tone="平")["total"], full["total"])
+        with self.assertRaises(ValueError):
+            rhyme_list("pingshui", 1, tone="上")
+        self.assertTrue(render_rhyme_list(rhyme_list("pingshui", 1, page_size=5)).startswith("平水韵·上平一东：共"))
+
+
+if __name__ == "__main__":
+    unittest.main()
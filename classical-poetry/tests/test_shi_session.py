@@ -0,0 +1,70 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.common.text_proceed import process_text
+from yun.shi.shi_rhythm import ShiRhythm
+from yun.shi.shi_session import ShiSession
+
+POEMS = [
+    "国破山河在，城春草木深。感时花溅泪，恨别鸟惊心。烽火连三月，家书抵万金。白头搔更短，浑欲不胜簪。",
+    "风急天高猿啸哀，渚清沙白鸟飞回。无边落木萧萧下，不尽长江滚滚来。",
+    "（题）朝辞白帝彩云间，千里江陵一日还。两岸猿声啼不住，轻舟已过万重山。",
+]
+HANZI = "东风夜放花千树更吹落星如雨宝马雕车香满路凤箫声动玉壶光转一夜鱼龙舞山水月天人心秋春江"
+SYMBOLS = "，。？！ \n（）"
+
+
+def full_check(text, yun_shu, is_trad):
+    poem, comma_pos = process_text(text)
+    return _comparable(ShiRhythm(yun_shu, poem, comma_pos, is_trad).check())
+
+
+def _comparable(result):
+    return result if isinstance(result, int) else result.to_dict()
+
+
+def _checkable(poem):
+    length = len(poem)
+    return (length % 10 == 0 or length % 14 == 0) and length >= 20
+
+
+class ShiSessionTest(unittest.TestCase):
+    def _random_edit(self, rnd, session):
+        pos = rnd.randrange(len(session.text))
+        op = rnd.random()
+        if op < 0.6:
+            session.replace(pos, rnd.choice(HANZI))
+        elif op < 0.75:
+            # 增删一字后再补回，字数不变而句读位置要重新推算
+            session.delete(pos)
+            session.insert(rnd.randrange(len(session.text) + 1), rnd.choice(HANZI))
+        elif op < 0.9:
+            session.replace(pos, rnd.choice(SYMBOLS))
+        else:
+            session.insert(pos, rnd.choice(SYMBOLS))
+
+    def test_random_edits_match_full_check(self):
+        rnd = random.Random(17)
+        compared = 0
+        for text in POEMS:
+            for yun_shu in (1, 2, 3):
+                for is_trad in (False, True):
+                    session = ShiSession(text, yun_shu, is_trad)
+                    for _ in range(40):
+                        self._random_edit(rnd, session)
+                        if rnd.random() < 0.1:
+                            session.set_text(text)
+                        self.assertEqual((session.poem, session.comma_pos), process_text(session.text))
+                        if _checkable(session.poem):
+                            self.assertEqual(_comparable(session.check()),
+                                             full_check(session.text, yun_shu, is_trad), session.text)
+                            compared += 1
+        self.assertGreater(compared, 300)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+import souyun_api
+from souyun_api import SouyunError
+from souyun_cache import ResponseCache, cache_key
+from souyun_stub import start_stub
+
+
+def _files(directory):
+    return sorted(os.path.join(root, name) for root, _, names in os.walk(directory) for name in names)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(cache_key("poem", {"key": "秋", "pageno": 1}), cache_key("poem", {"pageno": "1", "key": "秋"}))
+        self.assertNotEqual(cache_key("poem", {"key": "秋"}), cache_key("poem", {"key": "春"}))
+
+    def test_ttl(self):
+        cache = ResponseCache(self.directory, ttl=60)
+        cache.put("poem", {"key": "秋"}, {"n": 1})
+        self.assertEqual(cache.get("poem", {"key": "秋"}), (True, {"n": 1}))
+        later = time.time() + 61
+        with mock.patch("souyun_cache.time.time", return_value=later):
+            self.assertEqual(cache.get("poem", {"key": "秋"}), (False, None))
+            # 离线时过期的条目仍可用
+            self.assertEqual(cache.get("poem", {"key": "秋"}, allow_stale=True), (True, {"n": 1}))
+        forever = ResponseCache(self.directory, ttl=0)
+        with mock.patch("souyun_cache.time.time", return_value=later + 10 ** 6):
+            self.assertEqual(forever.get("poem", {"key": "秋"}), (True, {"n": 1}))
+
+    def test_lru_eviction(self):
+        body = "字" * 300
+        probe = ResponseCache(self.directory, max_bytes=0)
+        probe.put("poem", {"key": "probe"}, body)
+        size = os.path.getsize(_files(self.directory)[0])
+        probe.clear()
+
+        cache = ResponseCache(self.directory, max_bytes=int(size * 3.5))
+        for name in "abc":
+            cache.put("poem", {"key": name}, body)
+        old = time.time() - 100
+        for offset, name in enumerate("abc"):
+            path = cache._file(cache_key("poem", {"key": name}))
+            os.utime(path, (old + offset, old + offset))
+        self.assertTrue(cache.get("poem", {"key": "a"})[0])  # 读取 a 使它成为最近使用的条目
+        cache.put("poem", {"key": "d"}, body)  # 超过上限，淘汰到上限的 80% 以下
+        present = {name for name in "abcd" if cache.get("poem", {"key": name})[0]}
+        self.assertEqual(present, {"a", "d"})
+        self.assertLessEqual(sum(os.path.getsize(path) for path in _files(self.directory)), cache.max_bytes * 0.8)
+
+    def test_atomic_writes(self):
+        cache = ResponseCache(self.directory)
+        errors = []
+
+        def writer(tag):
+            for i in range(30):
+                cache.put("poem", {"key": "same"}, {"writer": tag, "i": i, "pad": "x" * 2000})
+
+        def reader():
+            for _ in range(200):
+                hit, body = cache.get("poem", {"key": "same"})
+                if hit and set(body) != {"writer", "i", "pad"}:
+                    errors.append(body)
+
+        threads = [threading.Thread(target=writer, args=(tag,)) for tag in range(4)]
+        threads.append(threading.Thread(target=reader))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        files = _files(self.directory)
+        self.assertEqual(len(files), 1)
+        with open(files[0], encoding="utf-8") as handle:
+            self.assertEqual(json.load(handle)["body"]["i"], 29)
+
+    def test_failed_write_keeps_old_entry(self):
+        cache = ResponseCache(self.directory)
+        cache.put("poem", {"key": "秋"}, {"n": 1})
+        with mock.patch("souyun_cache.os.replace", side_effect=OSError("disk full")), \
+                self.assertLogs("souyun_cache", "WARNING"):
+            self.assertFalse(cache.put("poem", {"key": "秋"}, {"n": 2}))
+        self.assertEqual(cache.get("poem", {"key": "秋"}), (True, {"n": 1}))
+        self.assertFalse([path for path in _files(self.directory) if path.endswith(".tmp")])
+
+
+class OfflineReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.server = start_stub()
+
+    def tearDown(self):
+        if self.server is not None:
+            self._stop()
+        souyun_api.configure(cache_mode="off")
+        self.tmp.cleanup()
+
+    def _stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = None
+
+    def test_record_then_replay_without_network(self):
+        base_url = self.server.base_url
+        souyun_api.configure(base_url=base_url, cache_mode="record", cache_dir=self.tmp.name, rate=0)
+        recorded = [souyun_api.poem("秋", page=page) for page in range(3)]
+        self.assertEqual(sum(self.server.served.values()), 3)
+        self._stop()
+
+        for mode in ("replay", "offline"):
+            souyun_api.configure(base_url=base_url, cache_mode=mode, cache_dir=self.tmp.name, rate=0,
+                                 cache_ttl=1)
+            with mock.patch("souyun_cache.time.time", return_value=time.time() + 3600):  # 录制的条目已过期
+                self.assertEqual([souyun_api.poem("秋", page=page) for page in range(3)], recorded)
+            with self.assertRaises(SouyunError):
+                souyun_api.poem("春", page=0)
+
+    def test_cache_serves_repeat_requests(self):
+        souyun_api.configure(base_url=self.server.base_url, cache_mode="on", cache_dir=self.tmp.name, rate=0)
+        first = souyun_api.poem("秋", page=0)
+        self.assertEqual(souyun_api.poem("秋", page=0), first)
+        self.assertEqual(sum(self.server.served.values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from yun.common.common import hanzi_to_yun, pingze_string
+from yun.common.suggest import render_suggestions, suggest_line, suggest_replacements
+from yun.common.text_proceed import process_text
+from yun.shi.shi_rhythm import ShiRhythm
+
+# 春望：第二句韵脚改为仄声且不押韵的「浅」，第三句第二字改为应平而仄的「是」
+POEM = "国破山河在，城春草木浅。感是花溅泪，恨别鸟惊心。烽火连三月，家书抵万金。白头搔更短，浑欲不胜簪。"
+
+
+def _check(text, yun_shu=1):
+    poem, comma_pos = process_text(text)
+    return ShiRhythm(yun_shu, poem, comma_pos, False).check()
+
+
+class SuggestTest(unittest.TestCase):
+    def test_marks_tone_and_rhyme(self):
+        items = suggest_replacements(_check(POEM), 1, limit=5)
+        self.assertEqual([(item["line"], item["hanzi"]) for item in items], [(0, "浅"), (1, "是")])
+        rhyme_item, tone_item = items
+        self.assertTrue(rhyme_item["rhyme"])
+        self.assertEqual(tone_item["need"], "平")
+        for item in items:
+            self.assertEqual(len(item["candidates"]), 5)
+            self.assertNotIn(item["hanzi"], item["candidates"])
+            self.assertEqual(pingze_string("".join(item["candidates"]), 1), "1" * 5)
+        # 韵脚处的候选与其他韵脚同韵（心、金属侵韵，簪兼属侵、覃）
+        rhyme_groups = set(hanzi_to_yun("心", 1, False)) | set(hanzi_to_yun("簪", 1, False))
+        for hanzi in rhyme_item["candidates"]:
+            self.assertTrue(set(hanzi_to_yun(hanzi, 1, False)) & rhyme_groups, hanzi)
+
+    def test_render(self):
+        text = render_suggestions(suggest_replacements(_check(POEM), 1, limit=2), False)
+        self.assertEqual(text.splitlines()[0], "替换建议：")
+        self.assertIn("第1行第10字「浅」宜平，须同韵：", text)
+        self.assertEqual(render_suggestions([], False), "")
+
+    def test_frequency_file_orders_candidates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            text_path = os.path.join(tmp, "freq.txt")
+            with open(text_path, "w", encoding="utf-8") as handle:
+                handle.write("今 1000\n禽 900\n")
+            json_path = os.path.join(tmp, "freq.json")
+            with open(json_path, "w", encoding="utf-8") as handle:
+                json.dump({"琴": 1000, "今": 900}, handle, ensure_ascii=False)
+            result = _check(POEM)
+            first = suggest_replacements(result, 1, limit=3, frequency_path=text_path)[0]["candidates"]
+            self.assertEqual(first[:2], ["今", "禽"])
+            first = suggest_replacements(result, 1, limit=3, frequency_path=json_path)[0]["candidates"]
+            self.assertEqual(first[:2], ["琴", "今"])
+
+    def test_unaligned_line(self):
+        self.assertEqual(suggest_line("平平仄仄平", "城春草木", "〇〇〇〇", 1), [])
+
+
+if __name__ == "__main__":
+    unittest.main()